@@ -0,0 +1,261 @@
+"""
+Packing of rendered bloxels into sprite atlases.
+
+Saving every bloxel as its own image produces thousands of tiny files for a
+large texture pack. An `Atlas` instead packs every bloxel, trimmed to its
+visible pixels, onto a few large pages and writes a manifest describing where
+each one ended up and how to put it back into its original canvas.
+"""
+
+__all__ = [
+    'Atlas',
+]
+
+
+import io # Encoding pages to memory
+import json # Manifest
+import struct # Binary manifest
+import numpy as np # Bulk pixel operations
+from pathlib import Path # Output filenames
+from PIL import Image
+from . manifest import * # Leaving unchanged files untouched
+
+
+class Atlas:
+    """
+    Shelf packs sprites onto square pages as they are added.
+
+    Sprites are placed left to right on the current shelf and a new shelf is
+    started below it once a sprite no longer fits. Rendered bloxels are all
+    about the same height, so this wastes little space without having to
+    hold on to every sprite until the end.
+
+    The manifest holds one entry per sprite with these keys:
+
+        name: the name of the block
+        dir: the direction of the bloxel (N, E, S or W)
+        page: the index of the page the sprite is on
+        x, y, w, h: the rectangle of the sprite on its page
+        offset_x, offset_y: where the upper-left corner of the rectangle was
+            in the untrimmed sprite
+        width, height: the size of the untrimmed sprite
+
+    Fully transparent sprites have an empty rectangle on page -1.
+
+    Attributes:
+        MAGIC: the first bytes of a binary manifest.
+        VERSION: the version of the binary manifest layout.
+        page_size: the width and height of every page.
+        padding: the number of clear pixels kept between sprites.
+        pages: the (page_size, page_size, 4) uint8 RGBA array of every page.
+        entries: the manifest entry of every sprite in the order added.
+    """
+    MAGIC = b'BLXA'
+    VERSION = 1
+
+    def __init__(self, page_size=2048, padding=1):
+        """
+        Creates an empty atlas.
+
+        Args:
+            page_size(int): the width and height of every page
+            padding(int): the number of clear pixels kept between sprites
+        """
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+        self.entries = []
+
+        # Position of the next sprite and the height of the current shelf
+        self.x = self.y = self.shelf = 0
+
+    @staticmethod
+    def trim(pixels):
+        """
+        Returns the bounds of the pixels that are not fully transparent.
+
+        Args:
+            pixels(ndarray): (height, width, 4) uint8 RGBA sprite
+
+        Return:
+            The (left, upper, right, lower) box or None if every pixel is
+            clear.
+        """
+        visible = pixels[..., 3] > 0
+        rows = np.flatnonzero(visible.any(axis=1))
+        if not len(rows):
+            return None
+
+        cols = np.flatnonzero(visible.any(axis=0))
+        return cols[0], rows[0], cols[-1] + 1, rows[-1] + 1
+
+    def place(self, width, height):
+        """
+        Reserves room for a sprite of the given size.
+
+        Args:
+            width(int): the width of the sprite
+            height(int): the height of the sprite
+
+        Return:
+            The (page, x, y) position reserved for the sprite.
+        """
+        if width > self.page_size or height > self.page_size:
+            raise Exception(
+                f'Sprite of size {width}x{height} does not fit on an atlas '
+                f'page of size {self.page_size}x{self.page_size}.'
+            )
+
+        # Start a new shelf
+        if self.x + width > self.page_size:
+            self.x = 0
+            self.y += self.shelf + self.padding
+            self.shelf = 0
+
+        # Start a new page
+        if not self.pages or self.y + height > self.page_size:
+            self.pages.append(
+                np.zeros((self.page_size, self.page_size, 4), dtype=np.uint8)
+            )
+            self.x = self.y = self.shelf = 0
+
+        x, y = self.x, self.y
+        self.x += width + self.padding
+        self.shelf = max(self.shelf, height)
+        return len(self.pages) - 1, x, y
+
+    def add(self, name, dir, pixels):
+        """
+        Trims a sprite and packs it onto a page.
+
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the bloxel
+            pixels(ndarray): (height, width, 4) uint8 RGBA sprite
+
+        Return:
+            The manifest entry of the sprite.
+        """
+        box = Atlas.trim(pixels)
+        left, upper, right, lower = box or (0, 0, 0, 0)
+        width, height = right - left, lower - upper
+
+        if box is None:
+            page = -1
+            x = y = 0
+        else:
+            page, x, y = self.place(width, height)
+            self.pages[page][y:y + height, x:x + width] = (
+                pixels[upper:lower, left:right]
+            )
+
+        entry = {
+            'name': name,
+            'dir': 'NESW'[dir],
+            'page': page,
+            'x': int(x),
+            'y': int(y),
+            'w': int(width),
+            'h': int(height),
+            'offset_x': int(left),
+            'offset_y': int(upper),
+            'width': pixels.shape[1],
+            'height': pixels.shape[0],
+        }
+        self.entries.append(entry)
+        return entry
+
+    def get_page(self, page):
+        """
+        Returns a page as an image, cropped below its last shelf.
+
+        Args:
+            page(int): the index of the page
+        """
+        pixels = self.pages[page]
+        used = self.trim(pixels)
+        lower = used[3] if used is not None else 1
+        return Image.fromarray(pixels[:lower])
+
+    def save(self, path, name='Atlas', binary=False):
+        """
+        Saves every page as `{name}-{page}.png` along with the manifest as
+        `{name}.json` and optionally `{name}.bin`.
+
+        Files that already hold exactly the same contents are not rewritten.
+
+        Args:
+            path(Path): the path (not file) to save the atlas in
+            name(str): the name of the atlas
+            binary(bool): whether to also save the binary manifest
+
+        Return:
+            The list of filenames written.
+        """
+        path = Path(path)
+        filenames = []
+
+        for page in range(len(self.pages)):
+            filename = path / f'{name}-{page}.png'
+            buffer = io.BytesIO()
+            self.get_page(page).save(buffer, 'PNG')
+            BuildManifest.write(buffer.getvalue(), filename)
+            filenames.append(filename)
+
+        filename = path / f'{name}.json'
+        data = json.dumps(self.get_manifest(name), indent=1)
+        BuildManifest.write(data.encode(), filename)
+        filenames.append(filename)
+
+        if binary:
+            filename = path / f'{name}.bin'
+            BuildManifest.write(self.get_binary_manifest(), filename)
+            filenames.append(filename)
+
+        return filenames
+
+    def get_manifest(self, name='Atlas'):
+        """
+        Returns the manifest as a JSON serializable dictionary.
+
+        Args:
+            name(str): the name the pages were saved with
+        """
+        return {
+            'pages': [f'{name}-{page}.png' for page in range(len(self.pages))],
+            'sprites': self.entries,
+        }
+
+    def get_binary_manifest(self):
+        """
+        Returns the manifest packed as little-endian binary data.
+
+        The layout is the 4 byte MAGIC, then the version, page count and
+        sprite count as uint32s, then for each sprite its UTF-8 name prefixed
+        by its uint16 length, its direction as a uint8 (0-3 for N, E, S, W),
+        its page as an int16 and x, y, w, h, offset_x, offset_y, width and
+        height as uint16s.
+        """
+        data = bytearray(self.MAGIC)
+        data += struct.pack(
+            '<III', self.VERSION, len(self.pages), len(self.entries)
+        )
+
+        for entry in self.entries:
+            name = entry['name'].encode('utf-8')
+            data += struct.pack('<H', len(name)) + name
+            data += struct.pack(
+                '<Bh8H',
+                'NESW'.index(entry['dir']),
+                entry['page'],
+                entry['x'],
+                entry['y'],
+                entry['w'],
+                entry['h'],
+                entry['offset_x'],
+                entry['offset_y'],
+                entry['width'],
+                entry['height'],
+            )
+
+        return bytes(data)
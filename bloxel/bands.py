@@ -0,0 +1,227 @@
+"""
+Reading texture maps one band of rows at a time.
+
+Decoding an 8192x8192 texture map takes 256MB of RGBA before a single bloxel
+is rendered. The scanlines of a PNG are stored one after the other in a
+single zlib stream, so `TextureBands` inflates only as many rows as a band
+needs and hands each band to Pillow as a small PNG of its own, keeping the
+memory used flat no matter how large the texture map is.
+"""
+
+__all__ = [
+    'TextureBands',
+]
+
+
+import io # Decoding bands from memory
+import zlib # Inflating image data a band at a time
+import struct # PNG chunks
+from PIL import Image
+from . texture import * # Decoded textures
+
+
+class TextureBands:
+    """
+    A texture map that is decoded one band of rows at a time.
+
+    Only 8-bit, non-interlaced PNGs can be streamed. Any other image is
+    decoded at once and split into bands afterwards, which gives the same
+    bands without bounding the memory used.
+
+    Attributes:
+        SIGNATURE: the first bytes of every PNG.
+        CHANNELS: the number of bytes per pixel of each 8-bit PNG color type.
+        filename: the filename of the texture map.
+        band_height: the number of rows in every band but the last.
+        width: the width of the texture map.
+        height: the height of the texture map.
+        streamed: whether bands are decoded one at a time.
+    """
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+    def __init__(self, filename, band_height):
+        """
+        Reads the header of the given texture map.
+
+        Args:
+            filename(str): the filename of the texture map
+            band_height(int): the number of rows in every band
+        """
+        self.filename = filename
+        self.band_height = band_height
+        self.header = None
+        self.chunks = []
+        self.streamed = False
+
+        with open(filename, 'rb') as file:
+            if file.read(8) == self.SIGNATURE:
+                self.read_header(file)
+
+        if self.header is None:
+            with Image.open(filename) as image:
+                self.width, self.height = image.size
+
+    @staticmethod
+    def read_chunk(file):
+        """
+        Returns the type and data of the next chunk in a PNG file.
+
+        Args:
+            file(file): the file positioned at the start of a chunk
+        """
+        length, kind = struct.unpack('>I4s', file.read(8))
+        data = file.read(length)
+        file.read(4)
+        return kind, data
+
+    @staticmethod
+    def make_chunk(kind, data):
+        """
+        Returns the bytes of a PNG chunk with the given type and data.
+
+        Args:
+            kind(bytes): the 4 letter chunk type
+            data(bytes): the contents of the chunk
+        """
+        crc = zlib.crc32(data, zlib.crc32(kind))
+        return struct.pack('>I', len(data)) + kind + data + struct.pack(
+            '>I', crc
+        )
+
+    def read_header(self, file):
+        """
+        Reads the chunks of a PNG up to its image data.
+
+        Args:
+            file(file): the file positioned just after the PNG signature
+        """
+        kind, data = self.read_chunk(file)
+        if kind != b'IHDR':
+            return
+
+        self.header = data
+        self.width, self.height, depth, color, _, _, interlace = (
+            struct.unpack('>IIBBBBB', data)
+        )
+        self.channels = self.CHANNELS.get(color)
+        self.streamed = (
+            depth == 8 and interlace == 0 and self.channels is not None
+        )
+
+        # Keep the palette and transparency needed to decode every band
+        while True:
+            kind, data = self.read_chunk(file)
+            if kind in (b'IDAT', b'IEND'):
+                break
+            if kind in (b'PLTE', b'tRNS'):
+                self.chunks.append((kind, data))
+
+    def __iter__(self):
+        """
+        Yields the top row and the Texture of every band in order.
+        """
+        if self.streamed:
+            yield from self.iter_streamed()
+            return
+
+        texture = Texture.open(self.filename)
+        for top in range(0, self.height, self.band_height):
+            yield top, texture.crop(
+                (0, top, self.width, min(top + self.band_height, self.height))
+            )
+
+    def iter_data(self, size):
+        """
+        Yields the filtered scanlines of the PNG a piece at a time.
+
+        Args:
+            size(int): the most bytes to inflate at once
+        """
+        inflate = zlib.decompressobj()
+
+        with open(self.filename, 'rb') as file:
+            file.read(8)
+
+            while True:
+                kind, data = self.read_chunk(file)
+                if kind == b'IEND':
+                    break
+
+                while kind == b'IDAT' and data:
+                    yield inflate.decompress(data, size)
+                    data = inflate.unconsumed_tail
+
+        yield inflate.flush()
+
+    def iter_streamed(self):
+        """
+        Yields the bands of a streamable PNG, decoding each one on its own.
+
+        The rows of a band are filtered against the rows above them. Each
+        band is therefore decoded with the last (already unfiltered) row of
+        the previous band prepended with the "None" filter so that the band
+        decodes exactly as it would as part of the whole image.
+        """
+        stride = 1 + self.width * self.channels
+        band_size = self.band_height * stride
+        buffer = bytearray()
+        previous = None
+        top = 0
+
+        for data in self.iter_data(band_size):
+            buffer += data
+
+            while top < self.height:
+                rows = min(self.band_height, self.height - top)
+                if len(buffer) < rows * stride:
+                    break
+
+                band = bytes(buffer[:rows * stride])
+                del buffer[:rows * stride]
+
+                image = self.decode_band(band, rows, previous)
+                previous = image.crop(
+                    (0, rows - 1, self.width, rows)
+                ).tobytes()
+
+                yield top, Texture.from_image(image)
+                top += rows
+
+        if top < self.height:
+            raise Exception(
+                f'Image data of "{self.filename}" ends after {top} of '
+                f'{self.height} rows.'
+            )
+
+    def decode_band(self, band, rows, previous):
+        """
+        Decodes a band of filtered scanlines as a PNG of its own.
+
+        Args:
+            band(bytes): the filtered scanlines of the band
+            rows(int): the number of rows in the band
+            previous(bytes): the unfiltered row above the band, if any
+
+        Return:
+            The Image of the band.
+        """
+        if previous is not None:
+            band = b'\0' + previous + band
+            rows += 1
+
+        header = struct.pack('>II', self.width, rows) + self.header[8:]
+        png = bytearray(self.SIGNATURE)
+        png += self.make_chunk(b'IHDR', header)
+        for kind, data in self.chunks:
+            png += self.make_chunk(kind, data)
+        png += self.make_chunk(b'IDAT', zlib.compress(band, 0))
+        png += self.make_chunk(b'IEND', b'')
+
+        image = Image.open(io.BytesIO(bytes(png)))
+        image.load()
+
+        if previous is not None:
+            image = image.crop((0, 1, self.width, rows))
+
+        return image
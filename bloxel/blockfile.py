@@ -1,4 +1,12 @@
+__all__ = [
+    'BlockFile',
+    'ExecutionPlan',
+]
+
+
 import random
+import itertools # Planning instructions a window at a time
+import numpy as np # Bulk pixel operations
 
 class BlockFile:
     """
@@ -6,83 +14,234 @@ class BlockFile:
     
     Not to be confused with a way to store the individual cornerstones that
     make up a given composite block.
+
+    Instructions are parsed lazily every time the blockfile is iterated, so
+    rendering can start as soon as the first line is read and the memory used
+    does not grow with the size of the blockfile. Only the name and line of
+    each named block are remembered, so that a block name used by two
+    instructions is reported with both of their lines.
     """
 
-    def __init__(self, filename, num_across, num_down):
+    characters = (
+        'abcdefghijklmnopqrstuvwxyz'
+        'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        '1234567890'
+    )
+    invalid = '^%$#@!~`()[]\{\}*&+=?><,\'\"'
+
+    def __init__(self, filename, num_across, num_down, rng=random):
+        self.filename = filename
+        self.rng = rng
         self.num_across = num_across
         self.num_down = num_down
         self.total = num_across * num_down
-        self.coordinates = dict()
-        self.num_instructions = self.load(filename)
+        self.count = None
+
+    def __iter__(self):
+        return self.get_all()
+
+    @property
+    def num_instructions(self):
+        """
+        The number of instructions in the blockfile, counted without parsing
+        them the first time it is needed.
+        """
+        if self.count is None:
+            with open(self.filename, 'rb') as file:
+                self.count = sum(1 for line in file if line.strip())
+        return self.count
 
     def get_all(self):
-        for name in self.coordinates:
-            yield name, self.coordinates[name]
+        """
+        Yields the (name, coordinates) pair of every instruction in order.
+        """
+        lines = {}
+        with open(self.filename) as file:
+            for count, line in enumerate(file, 1):
+                instruction = self.parse(line, count, lines)
+                if instruction is not None:
+                    yield instruction
 
-    def load(self, filename):
+    def compile(self, window=256):
         """
-        Obtain the texture index and name from each line in the blockfile.
+        Returns the ExecutionPlan of every instruction in the blockfile.
+
+        Args:
+            window(int): the number of instructions planned at a time
         """
+        return ExecutionPlan(self, window)
 
-        characters = (
-            'abcdefghijklmnopqrstuvwxyz'
-            'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-            '1234567890'
+    def error(self, count, message):
+        """
+        Returns the exception for an invalid instruction.
+
+        Args:
+            count(int): the line number of the instruction
+            message(str): what is wrong with the instruction
+        """
+        return Exception(
+            f'Instruction on line {count} in "{self.filename}" {message}'
         )
-        invalid = '^%$#@!~`()[]\{\}*&+=?><,\'\"'
 
-        # TODO: Validate based on texture index (is it inside 16x16?)
-        # TODO: Validate 1-6 numbers, but not more
-        # TODO: Validate index has to be less than across * down
+    def parse(self, line, count, lines=None):
+        """
+        Obtain the texture index and name from a line in the blockfile.
+
+        Args:
+            line(str): the line to parse
+            count(int): the line number, for error messages
+            lines(dict): the line number of every block name used so far,
+                which the name of this instruction is added to
+
+        Return:
+            The (name, coordinates) pair of the instruction or None for a
+            blank line.
+        """
+
         # TODO: Everything minus one space after the # is the filename
         # TODO: Trello comment parser?
 
         #parser = parse.OneOrMore(parse.nums) + parse.Keyword('#') + parse.Word(parse.alphanums + '_-.') + parse.lineEnd
-        
-        with open(filename) as file:
-            count = 0
-            for line in file:
-                count += 1
-
-                # Named bloxel
-                if '#' in line:
-                    indexes, name = line.split('#')
-                    name = name.strip()
-
-                # Unnamed bloxel
-                else:
-                    indexes, name = line, ''
-
-                # Parse out indexes
-                indexes = [int(i.strip()) for i in indexes.split(' ') if i]
-
-                # Validate here
-
-                if name != '':
-                    if any(i in name for i in invalid):
-                        raise Exception(
-                            f'Instruction on line {count} in "{filename}" '
-                            f'has an invalid block name that contains one of: '
-                            f'{invalid}'
-                        )
-                else:
-                    name = ''.join(
-                        [random.choice(characters) for i in range(8)]
+
+        if not line.strip():
+            return None
+
+        # Named bloxel
+        if '#' in line:
+            indexes, name = line.split('#', 1)
+            name = name.strip()
+
+        # Unnamed bloxel
+        else:
+            indexes, name = line, ''
+
+        # Parse out indexes
+        try:
+            indexes = [int(i) for i in indexes.split()]
+        except ValueError:
+            raise self.error(count, 'contains an index that is not a number.')
+
+        if not 1 <= len(indexes) <= 6:
+            raise self.error(count, 'must contain between 1 and 6 indexes.')
+
+        if name != '':
+            if any(i in name for i in self.invalid):
+                raise self.error(
+                    count,
+                    f'has an invalid block name that contains one of: '
+                    f'{self.invalid}'
+                )
+
+            if lines is not None:
+                if name in lines:
+                    raise self.error(
+                        count,
+                        f'reuses the block name "{name}" of line '
+                        f'{lines[name]}.'
                     )
+                lines[name] = count
+        else:
+            name = ''.join(
+                [self.rng.choice(self.characters) for i in range(8)]
+            )
+
+        for coor in indexes:
+            if not 0 <= coor < self.total:
+                raise self.error(
+                    count, 'contains index that lies outside texture bounds.'
+                )
+
+        # Now identify the X/Y texture that they are
+        indexes = [
+            (i % self.num_across, i // self.num_across)
+            for i in indexes
+        ]
+
+        return name, indexes
+
+
+class ExecutionPlan:
+    """
+    The work needed to render every instruction of a blockfile.
+
+    Blockfiles often define several blocks with exactly the same sides. A plan
+    reads the instructions a window at a time and renders each unique
+    combination of sides (face) in a window only once, for every block in the
+    window that uses it. Only one window of instructions is held at a time.
+
+    Attributes:
+        instructions: the (name, coordinates) pairs to plan.
+        window: the number of instructions planned at a time.
+    """
+
+    def __init__(self, instructions, window=256):
+        """
+        Plans the given instructions.
+
+        Args:
+            instructions(iterable): (name, coordinates) pairs where
+                coordinates are the (x, y) tiles of 1 to 6 sides. The last
+                tile is used for every side that is left unspecified.
+            window(int): the number of instructions planned at a time
+        """
+        self.instructions = instructions
+        self.window = window
+
+    def __iter__(self):
+        """
+        Yields the names of the blocks using every unique face of each window
+        along with the six (x, y) tiles of the face.
+
+        A name is repeated as many times as the instructions using it.
+        """
+        instructions = iter(self.instructions)
+
+        while True:
+            window = list(itertools.islice(instructions, self.window))
+            if not window:
+                break
+
+            faces = {}
+            for name, coordinates in window:
+
+                # Fill in the rest of the sides for the bloxel creation
+                less = 6 - len(coordinates)
+                if less > 0:
+                    coordinates = coordinates + [coordinates[-1]] * less
+
+                faces.setdefault(tuple(coordinates), []).append(name)
+
+            for face, names in faces.items():
+                yield names, list(face)
+
+    @staticmethod
+    def get_map(bands, size, num_across, num_down):
+        """
+        Assembles the tiles a blockfile can use out of a texture map.
+
+        Args:
+            bands(iterable): (top, pixels) pairs of horizontal bands of the
+                texture map in order, where pixels is the (height, width, 4)
+                uint8 RGBA array of the band starting at row top. A whole
+                texture map is a single band at the top.
+            size(int): the width and height of every tile
+            num_across(int): the number of tiles across the texture map
+            num_down(int): the number of tiles down the texture map
+
+        Return:
+            A (num_down * size, num_across * size, 4) array of the tiles.
+            Bands past the last row of tiles are not read, and any part of
+            the tiles outside of the texture map is clear.
+        """
+        height, width = num_down * size, num_across * size
+        tiles = np.zeros((height, width, 4), dtype=np.uint8)
+
+        for top, pixels in bands:
+            pixels = pixels[:height - top, :width]
+            tiles[top:top + len(pixels), :pixels.shape[1]] = pixels
+
+            # Stop before decoding the bands below the last row of tiles
+            if top + len(pixels) >= height:
+                break
 
-                for coor in indexes:
-                    if coor >= self.total:
-                        raise Exception(
-                            f'Instruction on line {count} in "{filename}" '
-                            'contains index that lies outside texture bounds.'
-                        )
-
-                # Now identify the X/Y texture that they are
-                
-                indexes = [
-                    (i % self.num_across, i // self.num_down)
-                    for i in indexes
-                ]
-                
-                self.coordinates[name] = indexes
-        return count
+        return tiles
@@ -0,0 +1,247 @@
+"""
+Bounded, observable in-memory caches.
+
+The renderer memoizes colors, cornerstones and coordinates everywhere. An
+unbounded cache in a process that renders millions of textures only ever
+grows, so every in-memory cache is a `Cache` with a limit on its number of
+entries and/or the size of its values, evicting the least recently used
+entries first. Every cache keeps hit, miss and eviction counts and can be
+inspected and cleared along with every other cache of the process.
+"""
+
+__all__ = [
+    'Cache',
+    'cached',
+]
+
+
+import sys # Default size of cached values
+import weakref # Registry of live caches
+import functools # Wrapping cached functions
+import threading # Caches shared by writer threads
+import collections # Recency order
+
+
+class Cache:
+    """
+    A mapping that forgets its least recently used entries once it grows past
+    its limits.
+
+    Every cache (and anything else with `stats` and `clear` methods added
+    with `register`) is tracked in a registry, so `get_stats` and `clear_all`
+    cover every cache of the process.
+
+    Attributes:
+        MISSING: returned by `get` when no default is given and the key is
+            not cached.
+        registry: every live registered cache.
+        name: the name the cache is reported under.
+        max_size: the most entries kept, or None for no limit.
+        max_bytes: the most bytes of values kept, or None for no limit.
+        sizeof: the function returning the size in bytes of a value.
+        bytes: the total size of every value in bytes, if `max_bytes` is set.
+        hits: the number of lookups that found their key.
+        misses: the number of lookups that did not.
+        evictions: the number of entries forgotten to stay within limits.
+    """
+    MISSING = object()
+    registry = weakref.WeakSet()
+
+    def __init__(self, name, max_size=4096, max_bytes=None, sizeof=None):
+        """
+        Creates an empty cache.
+
+        Args:
+            name(str): the name the cache is reported under
+            max_size(int): the most entries to keep, or None for no limit
+            max_bytes(int): the most bytes of values to keep, or None for no
+                limit
+            sizeof(callable): returns the size in bytes of a value. Defaults
+                to `sys.getsizeof`.
+        """
+        self.name = name
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or sys.getsizeof
+        self.entries = collections.OrderedDict()
+        self.sizes = dict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+        Cache.register(self)
+
+    @staticmethod
+    def register(cache):
+        """
+        Adds a cache to the registry of every cache of the process.
+
+        Args:
+            cache(object): anything with `stats` and `clear` methods
+        """
+        Cache.registry.add(cache)
+
+    @staticmethod
+    def get_stats():
+        """
+        Returns the statistics of every registered cache, sorted by name.
+        """
+        return sorted(
+            (cache.stats() for cache in list(Cache.registry)),
+            key=lambda stats: stats['name']
+        )
+
+    @staticmethod
+    def clear_all():
+        """
+        Empties every registered cache.
+        """
+        for cache in list(Cache.registry):
+            cache.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __repr__(self):
+        return (
+            f'Cache({self.name!r}, size={len(self)}, hits={self.hits}, '
+            f'misses={self.misses})'
+        )
+
+    def stats(self):
+        """
+        Returns the name, limits, current size and counters of the cache.
+        """
+        return {
+            'name': self.name,
+            'size': len(self.entries),
+            'bytes': self.bytes,
+            'max_size': self.max_size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the value cached under a key and marks it as recently used.
+
+        Args:
+            key(hashable): the key to look up
+            default(object): returned if the key is not cached
+        """
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Caches a value under a key, evicting the least recently used entries
+        if the cache grows past its limits.
+
+        Args:
+            key(hashable): the key to cache the value under
+            value(object): the value to cache
+        """
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+
+            self.entries[key] = value
+            if self.max_bytes is not None:
+                self.sizes[key] = self.sizeof(value)
+                self.bytes += self.sizes[key]
+
+            while self.entries and (
+                (self.max_size is not None and len(self) > self.max_size)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove(self, key):
+        """
+        Forgets the entry of a key. The lock must be held.
+
+        Args:
+            key(hashable): the key of the entry
+        """
+        del self.entries[key]
+        self.bytes -= self.sizes.pop(key, 0)
+
+    def lookup(self, key, create, *args):
+        """
+        Returns the value cached under a key, creating and caching it first
+        if needed.
+
+        Args:
+            key(hashable): the key to look up
+            create(callable): called with args to create a missing value
+            args(tuple): the arguments to create the value with
+        """
+        value = self.get(key)
+        if value is Cache.MISSING:
+            value = create(*args)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Forgets every entry. The counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes = 0
+
+
+def cached(max_size=4096, max_bytes=None, sizeof=None, name=None):
+    """
+    Decorator memoizing a function in a bounded `Cache`, in place of
+    `functools.lru_cache`.
+
+    The arguments of the function must be hashable. Do not decorate methods,
+    as the cache would keep every instance alive; give each instance a cache
+    of its own instead.
+
+    Args:
+        max_size(int): the most results to keep, or None for no limit
+        max_bytes(int): the most bytes of results to keep, or None
+        sizeof(callable): returns the size in bytes of a result
+        name(str): the name of the cache, defaults to the function's name
+
+    Return:
+        The decorator. The cache of a decorated function is its `cache`
+        attribute.
+    """
+    def decorator(function):
+        cache = Cache(
+            name or function.__qualname__, max_size, max_bytes, sizeof
+        )
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = args
+            if kwargs:
+                key = args + (Cache.MISSING,) + tuple(sorted(kwargs.items()))
+
+            value = cache.get(key)
+            if value is Cache.MISSING:
+                value = function(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
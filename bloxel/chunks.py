@@ -0,0 +1,246 @@
+"""
+Sparse spatial index of the voxels of multipart bloxels.
+
+Large voxel models are mostly empty space around a solid shell, so positions
+are indexed in cubic chunks (see `VoxelIndex.SIZE`) that only exist where
+there are voxels. Each chunk holds the flags of every position in it, which
+answers whether whole arrays of positions (or their neighbors) are occupied
+with a single gather.
+"""
+
+__all__ = [
+    'VoxelIndex',
+]
+
+
+import itertools # Neighbor offsets
+import numpy as np # Flag arrays
+
+
+class VoxelIndex:
+    """
+    The occupied positions of a voxel model, stored in sparse chunks.
+
+    Positions are sets: adding several voxels at the same position marks it
+    once, and a position is opaque if any voxel added there is fully opaque.
+
+    Attributes:
+        SIZE: the width, height and depth of every chunk.
+        LIMIT: positions must lie within +-LIMIT chunks on every axis to be
+            packed into keys (see `pack`).
+        OCCUPIED: the flag of positions holding a voxel.
+        OPAQUE: the flag of positions holding a fully opaque voxel.
+        OFFSETS: the (26, 3) offsets of every neighbor of a position.
+        cells: the (capacity, SIZE, SIZE, SIZE) flags of every chunk slot,
+            indexed by x, y and z within the chunk.
+        slots: the slot in `cells` of every chunk by packed chunk position.
+        free: the slots of removed chunks that can be reused.
+    """
+    SIZE = 16
+    LIMIT = 2 ** 20
+    OCCUPIED = 1
+    OPAQUE = 2
+    OFFSETS = np.array([
+        offset for offset in itertools.product((-1, 0, 1), repeat=3)
+        if any(offset)
+    ])
+
+    def __init__(self, voxels=None):
+        """
+        Creates an index, optionally filled with the given voxels.
+
+        Args:
+            voxels(ndarray): array of VoxelFile.VOXEL to add
+        """
+        size = self.SIZE
+        self.cells = np.zeros((0, size, size, size), dtype=np.uint8)
+        self.slots = dict()
+        self.free = []
+
+        if voxels is not None:
+            self.add(voxels)
+
+    def __len__(self):
+        """
+        Returns the number of occupied positions.
+        """
+        slots = list(self.slots.values())
+        return int(np.count_nonzero(self.cells[slots] & self.OCCUPIED))
+
+    def __contains__(self, xyz):
+        return bool(self.get([xyz])[0])
+
+    @staticmethod
+    def pack(chunks):
+        """
+        Packs chunk positions into single integers usable as keys.
+
+        Args:
+            chunks(ndarray): (N, 3) chunk positions, each at least -LIMIT
+                and below LIMIT
+
+        Return:
+            An int64 array with the key of each chunk.
+        """
+        chunks = np.asarray(chunks, dtype=np.int64) + VoxelIndex.LIMIT
+        return chunks[:, 0] << 42 | chunks[:, 1] << 21 | chunks[:, 2]
+
+    def get_chunks(self):
+        """
+        Returns the (N, 3) positions of every chunk, in voxels.
+        """
+        keys = np.array(sorted(self.slots), dtype=np.int64)
+        mask = 2 ** 21 - 1
+        chunks = np.stack([keys >> 42, keys >> 21 & mask, keys & mask], 1)
+        return (chunks.reshape(-1, 3) - self.LIMIT) * self.SIZE
+
+    def get_slots(self, xyz, create=False):
+        """
+        Returns the chunk slot of every position.
+
+        Args:
+            xyz(ndarray): (N, 3) int64 positions
+            create(bool): allocate the chunks that do not exist yet
+
+        Return:
+            An int64 array with the slot of each position, or -1 where its
+            chunk does not exist. Positions too far out to be indexed never
+            have a chunk, and creating them raises an exception.
+        """
+        xyz = np.asarray(xyz, dtype=np.int64).reshape(-1, 3)
+        chunks = xyz // self.SIZE
+        inside = (
+            (chunks >= -self.LIMIT) & (chunks < self.LIMIT)
+        ).all(axis=1)
+        if create and not inside.all():
+            position = xyz[int(np.argmin(inside))].tolist()
+            raise Exception(
+                f'Voxel position {position} lies outside of the '
+                f'+-{self.LIMIT * self.SIZE} that can be indexed.'
+            )
+
+        keys, inverse = np.unique(
+            self.pack(chunks[inside]), return_inverse=True
+        )
+
+        found = []
+        for key in keys.tolist():
+            slot = self.slots.get(key, -1)
+            if slot < 0 and create:
+                slot = self.allocate()
+                self.slots[key] = slot
+            found.append(slot)
+
+        slots = np.full(len(chunks), -1, dtype=np.int64)
+        slots[inside] = np.array(found, dtype=np.int64)[inverse.reshape(-1)]
+        return slots
+
+    def allocate(self):
+        """
+        Returns an empty chunk slot, growing `cells` if needed.
+        """
+        if self.free:
+            return self.free.pop()
+
+        slot = len(self.slots)
+        if slot == len(self.cells):
+            grown = np.zeros(
+                (max(1, 2 * len(self.cells)),) + self.cells.shape[1:],
+                dtype=np.uint8
+            )
+            grown[:len(self.cells)] = self.cells
+            self.cells = grown
+
+        return slot
+
+    def add(self, voxels):
+        """
+        Marks the positions of voxels as occupied.
+
+        Args:
+            voxels(ndarray): array of VoxelFile.VOXEL
+        """
+        xyz = voxels['xyz'].astype(np.int64).reshape(-1, 3)
+        if not len(xyz):
+            return
+
+        flags = np.where(
+            voxels['color'][:, 3] == 255,
+            self.OCCUPIED | self.OPAQUE,
+            self.OCCUPIED
+        ).astype(np.uint8)
+
+        slots = self.get_slots(xyz, create=True)
+        x, y, z = (xyz % self.SIZE).T
+        np.bitwise_or.at(self.cells, (slots, x, y, z), flags)
+
+    def remove(self, xyz):
+        """
+        Clears positions, releasing the chunks left empty.
+
+        Args:
+            xyz(ndarray): (N, 3) positions to clear
+        """
+        xyz = np.asarray(xyz, dtype=np.int64).reshape(-1, 3)
+        slots = self.get_slots(xyz)
+        found = slots >= 0
+        x, y, z = (xyz[found] % self.SIZE).T
+        self.cells[slots[found], x, y, z] = 0
+
+        touched = set(np.unique(slots[found]).tolist())
+        for key, slot in list(self.slots.items()):
+            if slot in touched and not self.cells[slot].any():
+                del self.slots[key]
+                self.free.append(slot)
+
+    def get_flags(self, xyz):
+        """
+        Returns the flags of whole arrays of positions at once.
+
+        Args:
+            xyz(ndarray): (..., 3) positions
+
+        Return:
+            A uint8 array of the flags (OCCUPIED and OPAQUE) of each position.
+        """
+        xyz = np.asarray(xyz, dtype=np.int64)
+        shape = xyz.shape[:-1]
+        xyz = xyz.reshape(-1, 3)
+
+        flags = np.zeros(len(xyz), dtype=np.uint8)
+        if len(xyz) and self.slots:
+            slots = self.get_slots(xyz)
+            found = slots >= 0
+            x, y, z = (xyz[found] % self.SIZE).T
+            flags[found] = self.cells[slots[found], x, y, z]
+
+        return flags.reshape(shape)
+
+    def get(self, xyz, opaque=False):
+        """
+        Returns whether positions are occupied.
+
+        Args:
+            xyz(ndarray): (..., 3) positions
+            opaque(bool): only count fully opaque voxels
+
+        Return:
+            A bool array for each position.
+        """
+        flag = self.OPAQUE if opaque else self.OCCUPIED
+        return (self.get_flags(xyz) & flag) > 0
+
+    def get_neighbors(self, xyz, offsets=OFFSETS, opaque=False):
+        """
+        Returns whether the neighbors of positions are occupied.
+
+        Args:
+            xyz(ndarray): (N, 3) positions
+            offsets(ndarray): (M, 3) offsets of the neighbors to check
+            opaque(bool): only count fully opaque voxels
+
+        Return:
+            An (N, M) bool array for each neighbor of each position.
+        """
+        xyz = np.asarray(xyz, dtype=np.int64).reshape(-1, 1, 3)
+        return self.get(xyz + np.asarray(offsets, dtype=np.int64), opaque)
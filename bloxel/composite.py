@@ -0,0 +1,251 @@
+"""
+Compositing of RGBA pixel arrays.
+
+Every array handled here is uint8 with the color channels last, so a canvas is
+a (height, width, 4) array and a list of colors is an (N, 4) array. Draws are
+always applied in the order they are given, even when several of them land on
+the same pixel, which is what makes layered bloxel drawing work.
+"""
+
+__all__ = [
+    'Blend',
+    'blend',
+    'premultiply',
+    'unpremultiply',
+    'layers',
+    'draw',
+    'blit',
+    'blit_many',
+]
+
+
+import numpy as np # Bulk pixel operations
+
+
+class Blend:
+    """
+    Enum specifying the ways a color can be drawn over another color.
+
+    LEGACY reproduces the original bloxel `blend_color` function so that
+    rendered bloxels stay identical. STRAIGHT and PREMULTIPLIED are the
+    Porter-Duff "over" operator for straight and premultiplied alpha.
+    """
+    LEGACY = 0
+    STRAIGHT = 1
+    PREMULTIPLIED = 2
+
+
+def blend(dst, src, mode=Blend.LEGACY):
+    """
+    Blends an array of colors on top of another.
+
+    Args:
+        dst(ndarray): (..., 4) uint8 colors underneath src
+        src(ndarray): (..., 4) uint8 colors to draw on top of dst
+        mode(Blend): the blending operation to use
+
+    Return:
+        The (..., 4) uint8 array of blended colors.
+    """
+    out = np.empty_like(dst)
+    src_alpha = src[..., 3:].astype(np.int64)
+    dst_alpha = dst[..., 3:].astype(np.int64)
+
+    if mode == Blend.LEGACY:
+        # Opaque colors replace the color underneath and clear colors leave it
+        # untouched, so only partially transparent colors need blending
+        out[:] = np.where(src[..., 3:] == 255, src, dst)
+        partial = (src[..., 3] > 0) & (src[..., 3] < 255)
+
+        if partial.any():
+            below = dst[partial]
+            above = src[partial]
+            alpha = above[:, 3:].astype(np.int64)
+            barf = alpha / 255
+            brem = (255 - alpha) / 255
+
+            mixed = np.empty_like(above)
+            mixed[:, :3] = above[:, :3] * barf + below[:, :3] * brem
+            mixed[:, 3:] = np.minimum(below[:, 3:] + alpha, 255)
+            out[partial] = mixed
+
+    elif mode == Blend.STRAIGHT:
+        # Weight of the destination color that shows through the source
+        below = dst_alpha * (255 - src_alpha)
+        alpha = src_alpha * 255 + below
+        color = src[..., :3] * (src_alpha * 255) + dst[..., :3] * below
+        out[..., :3] = np.where(
+            alpha > 0, color / np.maximum(alpha, 1) + 0.5, 0
+        )
+        out[..., 3:] = (alpha + 127) // 255
+
+    elif mode == Blend.PREMULTIPLIED:
+        below = dst.astype(np.int64) * (255 - src_alpha)
+        out[:] = np.minimum(src + (below + 127) // 255, 255)
+
+    else:
+        raise Exception(f'Invalid blend mode supplied: {mode}')
+
+    return out
+
+
+def premultiply(pixels):
+    """
+    Returns a copy of the given straight alpha colors with the color channels
+    multiplied by alpha.
+
+    Args:
+        pixels(ndarray): uint8 array with the RGBA channels last
+    """
+    out = pixels.copy()
+    alpha = pixels[..., 3:].astype(np.int64)
+    out[..., :3] = (pixels[..., :3] * alpha + 127) // 255
+    return out
+
+
+def unpremultiply(pixels):
+    """
+    Returns a copy of the given premultiplied colors with the color channels
+    divided by alpha.
+
+    Args:
+        pixels(ndarray): uint8 array with the RGBA channels last
+    """
+    out = pixels.copy()
+    alpha = pixels[..., 3:].astype(np.int64)
+    color = pixels[..., :3].astype(np.int64) * 255 + alpha // 2
+    color //= np.maximum(alpha, 1)
+    out[..., :3] = np.where(alpha > 0, np.minimum(color, 255), 0)
+    return out
+
+
+def layers(pixels):
+    """
+    Splits a sequence of draws into layers that can each be applied at once.
+
+    The n-th layer holds every draw that is the n-th one to land on its pixel,
+    so no pixel appears twice within a layer and applying the layers in order
+    is the same as applying every draw one after the other.
+
+    Args:
+        pixels(ndarray): the flat pixel index of each draw in drawing order
+
+    Return:
+        A list of index arrays into `pixels`, each in drawing order.
+    """
+    pixels = np.asarray(pixels)
+    count = len(pixels)
+    if not count:
+        return []
+
+    # Stable sort groups the draws of each pixel while keeping their order
+    order = np.argsort(pixels, kind='stable')
+    ordered = pixels[order]
+    starts = np.ones(count, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    first = np.maximum.accumulate(np.where(starts, np.arange(count), 0))
+
+    rank = np.empty(count, dtype=np.int64)
+    rank[order] = np.arange(count) - first
+
+    by_rank = np.argsort(rank, kind='stable')
+    bounds = np.cumsum(np.bincount(rank))
+    return np.split(by_rank, bounds[:-1])
+
+
+def draw(canvas, pixels, colors, mode=Blend.LEGACY, order=None):
+    """
+    Draws colors onto the given pixels of a canvas in order.
+
+    A batch of canvases can be drawn onto at once by giving both the canvas
+    and the colors the same leading dimensions.
+
+    Args:
+        canvas(ndarray): (..., height, width, 4) uint8 canvas to draw onto
+        pixels(ndarray): the flat pixel index (y * width + x) of each draw
+        colors(ndarray): (..., N, 4) uint8 color of each draw
+        mode(Blend): the blending operation to use
+        order(list): precomputed `layers` of `pixels`, if available
+    """
+    flat = canvas.reshape(*canvas.shape[:-3], -1, 4)
+    if not np.may_share_memory(flat, canvas):
+        raise Exception('Canvas pixels must be contiguous to be drawn onto.')
+
+    for layer in layers(pixels) if order is None else order:
+        where = pixels[layer]
+        flat[..., where, :] = blend(
+            flat[..., where, :], colors[..., layer, :], mode
+        )
+
+
+def blit(canvas, sprite, x, y, mode=Blend.LEGACY):
+    """
+    Draws a sprite onto a canvas with its upper-left corner at (x, y).
+
+    Parts of the sprite that fall outside of the canvas are clipped. The
+    sprite is blended straight into the area of the canvas it covers, which
+    is much cheaper than `blit_many` when drawing sprites one at a time.
+
+    Args:
+        canvas(ndarray): (height, width, 4) uint8 canvas to draw onto
+        sprite(ndarray): (height, width, 4) uint8 sprite to draw
+        x(int): the x coordinate to place the upper-left corner of sprite at
+        y(int): the y coordinate to place the upper-left corner of sprite at
+        mode(Blend): the blending operation to use
+    """
+    height, width = sprite.shape[:2]
+    left, upper = max(x, 0), max(y, 0)
+    right = min(x + width, canvas.shape[1])
+    lower = min(y + height, canvas.shape[0])
+    if left >= right or upper >= lower:
+        return
+
+    area = canvas[upper:lower, left:right]
+    sprite = sprite[upper - y:lower - y, left - x:right - x]
+    alpha = sprite[..., 3]
+
+    if mode == Blend.LEGACY:
+        # Opaque pixels simply replace the pixels underneath
+        np.copyto(area, sprite, where=(alpha == 255)[..., None])
+        visible = (alpha > 0) & (alpha < 255)
+    else:
+        visible = alpha > 0
+
+    if visible.any():
+        area[visible] = blend(area[visible], sprite[visible], mode)
+
+
+def blit_many(canvas, sprites, offsets, mode=Blend.LEGACY):
+    """
+    Draws a batch of equally sized sprites onto a canvas one after the other.
+
+    Fully transparent sprite pixels are skipped and parts of sprites that fall
+    outside of the canvas are clipped.
+
+    Args:
+        canvas(ndarray): (height, width, 4) uint8 canvas to draw onto
+        sprites(ndarray): (N, height, width, 4) uint8 sprites to draw
+        offsets(ndarray): (N, 2) x and y coordinates of each sprite's
+            upper-left corner
+        mode(Blend): the blending operation to use
+    """
+    sprites = np.asarray(sprites)
+    offsets = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+    count, height, width = sprites.shape[:3]
+
+    ys, xs = np.mgrid[:height, :width]
+    xs = xs[None] + offsets[:, 0, None, None]
+    ys = ys[None] + offsets[:, 1, None, None]
+
+    visible = (
+        (sprites[..., 3] > 0)
+        & (xs >= 0) & (xs < canvas.shape[1])
+        & (ys >= 0) & (ys < canvas.shape[0])
+    )
+
+    draw(
+        canvas,
+        ys[visible] * canvas.shape[1] + xs[visible],
+        sprites[visible],
+        mode
+    )
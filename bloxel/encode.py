@@ -0,0 +1,309 @@
+"""
+Encoding of rendered bloxels into files.
+
+Bloxels are small and usually only have a few dozen colors, so how they are
+encoded matters more for the size of a texture pack (and the time it takes to
+write it) than how they are rendered. An `Encoder` decides the format, the
+extension and the compression of every saved bloxel.
+"""
+
+__all__ = [
+    'Encoder',
+    'PNGEncoder',
+    'RawEncoder',
+    'QOIEncoder',
+]
+
+
+import io # Encoding to memory
+import abc # Encoders must implement `encode`
+import struct # File headers
+import numpy as np # Bulk pixel operations
+from PIL import Image
+
+
+class Encoder(abc.ABC):
+    """
+    Base class of every encoder, which only has to implement `encode`.
+
+    Attributes:
+        EXTENSION: the file extension of the encoded files.
+        FORMATS: the name of every encoder that can be selected by `get`.
+    """
+    EXTENSION = ''
+    FORMATS = ['png', 'palette', 'raw', 'qoi']
+
+    @staticmethod
+    def get(format='png', compress_level=6):
+        """
+        Returns the encoder with the given name.
+
+        Args:
+            format(str): one of the names in FORMATS
+            compress_level(int): the zlib compression level (0-9) of PNGs
+        """
+        if format == 'png':
+            return PNGEncoder(compress_level)
+
+        elif format == 'palette':
+            return PNGEncoder(compress_level, palette=True)
+
+        elif format == 'raw':
+            return RawEncoder()
+
+        elif format == 'qoi':
+            return QOIEncoder()
+
+        raise Exception(
+            f'Invalid format supplied: {format}. Expected one of: '
+            f'{", ".join(Encoder.FORMATS)}'
+        )
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+    @abc.abstractmethod
+    def encode(self, image):
+        """
+        Returns the encoded bytes of the given image.
+
+        Args:
+            image(Image): the RGBA image to encode
+        """
+
+    def save(self, image, filename):
+        """
+        Encodes the given image and saves it with the given filename.
+
+        Args:
+            image(Image): the RGBA image to save
+            filename(str): the filename to save the image as
+        """
+        with open(filename, 'wb') as file:
+            file.write(self.encode(image))
+
+
+class PNGEncoder(Encoder):
+    """
+    Encodes PNG files.
+
+    When `palette` is set, images with at most 256 colors (counting alpha) are
+    saved as palette images with a tRNS chunk, which decode to exactly the
+    same RGBA pixels but are usually a fraction of the size.
+
+    Attributes:
+        compress_level: the zlib compression level (0-9).
+        palette: whether to save images with few colors as palette images.
+    """
+    EXTENSION = '.png'
+
+    def __init__(self, compress_level=6, palette=False):
+        """
+        Args:
+            compress_level(int): the zlib compression level (0-9)
+            palette(bool): save images with few colors as palette images
+        """
+        self.compress_level = compress_level
+        self.palette = palette
+
+    def __repr__(self):
+        return f'PNGEncoder({self.compress_level}, palette={self.palette})'
+
+    def get_palette_image(self, image):
+        """
+        Returns the given image as a palette image along with the alpha of
+        every palette entry, or None if it has more than 256 colors.
+
+        Args:
+            image(Image): the RGBA image to convert
+        """
+        pixels = np.ascontiguousarray(np.asarray(image.convert('RGBA')))
+        packed = pixels.view(np.uint32)[..., 0]
+        colors, indexes = np.unique(packed, return_inverse=True)
+        if len(colors) > 256:
+            return None
+
+        colors = colors.view(np.uint8).reshape(-1, 4)
+        out = Image.fromarray(
+            indexes.reshape(packed.shape).astype(np.uint8), 'P'
+        )
+        out.putpalette(colors[:, :3].tobytes())
+        return out, colors[:, 3].tobytes()
+
+    def get_options(self, image):
+        """
+        Returns the image to save along with the options to save it with.
+
+        Args:
+            image(Image): the RGBA image to save
+        """
+        options = {'compress_level': self.compress_level}
+
+        converted = self.get_palette_image(image) if self.palette else None
+        if converted is not None:
+            image, options['transparency'] = converted
+
+        return image, options
+
+    def encode(self, image):
+        image, options = self.get_options(image)
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', **options)
+        return buffer.getvalue()
+
+    def save(self, image, filename):
+        image, options = self.get_options(image)
+        image.save(str(filename), 'PNG', **options)
+
+
+class RawEncoder(Encoder):
+    """
+    Dumps the RGBA pixels of images without any compression.
+
+    Meant for intermediate builds where encoding time matters far more than
+    size. Files start with the 4 byte MAGIC followed by the width and height
+    as little-endian uint32s, followed by the rows of RGBA pixels.
+
+    Attributes:
+        MAGIC: the first bytes of every raw file.
+    """
+    EXTENSION = '.rgba'
+    MAGIC = b'BLXR'
+
+    @staticmethod
+    def decode(data):
+        """
+        Returns the image stored in the given raw file bytes.
+
+        Args:
+            data(bytes): the contents of a raw file
+        """
+        if data[:4] != RawEncoder.MAGIC:
+            raise Exception('Data is not a raw bloxel image.')
+
+        width, height = struct.unpack('<II', data[4:12])
+        return Image.frombytes('RGBA', (width, height), data[12:])
+
+    def encode(self, image):
+        image = image.convert('RGBA')
+        header = self.MAGIC + struct.pack('<II', *image.size)
+        return header + image.tobytes()
+
+
+class QOIEncoder(Encoder):
+    """
+    Encodes images in the QOI ("Quite OK Image") format.
+
+    QOI is lossless, decodable by Pillow and many engines, and needs no zlib
+    pass, which makes it cheaper to encode than PNG for intermediate builds.
+    Every pixel is classified at once with array operations instead of one at
+    a time.
+
+    Attributes:
+        END: the bytes that end every QOI file.
+    """
+    EXTENSION = '.qoi'
+    END = b'\0' * 7 + b'\1'
+
+    # Operations and their tags
+    INDEX = 0x00
+    DIFF = 0x40
+    LUMA = 0x80
+    RUN = 0xC0
+    RGB = 0xFE
+    RGBA = 0xFF
+
+    def encode(self, image):
+        image = image.convert('RGBA')
+        width, height = image.size
+        header = b'qoif' + struct.pack('>IIBB', width, height, 4, 0)
+        return header + self.encode_pixels(np.asarray(image)) + self.END
+
+    @staticmethod
+    def encode_pixels(pixels):
+        """
+        Returns the QOI operations encoding the given pixels.
+
+        The index a pixel is checked against holds the last pixel with the
+        same hash (or zero), exactly as the decoder sees it.
+
+        Args:
+            pixels(ndarray): (..., 4) uint8 RGBA pixels in order
+        """
+        pixels = np.ascontiguousarray(pixels).reshape(-1, 4)
+        count = len(pixels)
+        if not count:
+            return b''
+
+        # Channels first so that each channel is a contiguous array
+        colors = np.empty((4, count + 1), dtype=np.int32)
+        colors[:, 0] = 0, 0, 0, 255
+        colors[:, 1:] = pixels.T
+        previous, colors = colors[:, :-1], colors[:, 1:]
+
+        packed = pixels.view(np.uint32)[:, 0]
+        before = np.empty_like(packed)
+        before[0] = np.array([0, 0, 0, 255], np.uint8).view(np.uint32)[0]
+        before[1:] = packed[:-1]
+        run = packed == before
+
+        # The value the index holds for each pixel's hash. Decoders disagree
+        # on whether runs update the index, so only other pixels are counted.
+        r, g, b, a = colors
+        hashes = ((r * 3 + g * 5 + b * 7 + a * 11) & 63).astype(np.uint8)
+        order = np.flatnonzero(~run)
+        order = order[np.argsort(hashes[order], kind='stable')]
+        last = np.zeros_like(packed)
+        same = hashes[order[1:]] == hashes[order[:-1]]
+        last[order[1:]] = np.where(same, packed[order[:-1]], 0)
+        index = ~run & (last == packed)
+
+        # Wrapped channel differences from the previous pixel
+        dr, dg, db, da = ((colors - previous + 128) & 255) - 128
+        dr_dg = dr - dg
+        db_dg = db - dg
+        rest = ~run & ~index
+        same_alpha = rest & (da == 0)
+        small = same_alpha & (
+            (dr >= -2) & (dr <= 1)
+            & (dg >= -2) & (dg <= 1)
+            & (db >= -2) & (db <= 1)
+        )
+        luma = same_alpha & ~small & (
+            (dg >= -32) & (dg <= 31)
+            & (dr_dg >= -8) & (dr_dg <= 7)
+            & (db_dg >= -8) & (db_dg <= 7)
+        )
+        rgb = same_alpha & ~small & ~luma
+        rgba = rest & (da != 0)
+
+        # Runs are emitted every 62 pixels and at the end of each run
+        positions = np.arange(count)
+        starts = run & ~np.concatenate([[False], run[:-1]])
+        start = np.maximum.accumulate(np.where(starts, positions, 0))
+        length = positions - start + 1
+        ends = run & ~np.concatenate([run[1:], [False]])
+        emit = run & ((length % 62 == 0) | ends)
+
+        # Every pixel gets a row with the bytes of its operation, of which
+        # only the first `sizes` are kept
+        ops = np.empty((count, 5), dtype=np.uint8)
+        ops[:, 0] = np.select(
+            [emit, index, small, luma, rgb, rgba],
+            [
+                QOIEncoder.RUN | ((length - 1) % 62),
+                QOIEncoder.INDEX | hashes,
+                QOIEncoder.DIFF | (dr + 2) << 4 | (dg + 2) << 2 | (db + 2),
+                QOIEncoder.LUMA | (dg + 32),
+                QOIEncoder.RGB,
+                QOIEncoder.RGBA
+            ]
+        )
+        ops[:, 1] = np.where(luma, (dr_dg + 8) << 4 | (db_dg + 8), r)
+        ops[:, 2:] = pixels[:, 1:]
+
+        sizes = np.select(
+            [emit | index | small, luma, rgb, rgba], [1, 2, 4, 5], 0
+        )
+        out = ops[np.arange(5) < sizes[:, None]]
+        return out.tobytes()
@@ -22,10 +22,17 @@ Usage:
     {0} [-o <out-path>] [-a | ([-nsew])] -b <blockname> <up> <down> <left>
         <right> <front> <back>
     {0} [-o <out-path>] [-a | ([-nsew])] -t <tex> <num-wide> <num-long>
-        [<block-file>]
+        [<block-file>] [--cache=<dir> [--cache-size=<mb>]]
+        [--atlas [--atlas-size=<px>] [--binary-manifest]] [-j <jobs>]
+        [--format=<format>] [--compress=<level>] [--incremental]
+        [--watch [--interval=<seconds>]]
     {0} -c <filename> <red> <green> <blue> [<alpha>]
         [--width=<width> --height=<height>]
     {0} [-o <out-path>] [-a | ([-nsew])] -b <blockname> -B <blox-file>
+        [--tile-size=<px> [--stitch]] [-j <jobs>]
+    {0} -B <blox-file> --convert=<voxel-file>
+    {0} [-o <out-path>] [-a | ([-nsew])] -b <blockname> --scene=<scene-file>
+        [--sprites=<path>] [--format=<format>] [--compress=<level>]
     {0} -h | --help | -v | --version
 
 Options:
@@ -39,7 +46,8 @@ Options:
     -b <blockname> --block=<blockname>
                     The name of the output file with no extension
     -B <blox-file> --bloxel=<blox-file>
-                    The filename of the bloxel file to render
+                    The filename of the bloxel file to render, either text
+                    or a binary voxel file
     -c <filename> --create-texture=<filename>
                     Use the provided color to generate a plain texture filled
                     with said color
@@ -52,6 +60,54 @@ Options:
                     Specify created texture width [default: 16]
     --height=<height>
                     Specify created texture height [default: 16]
+    --cache=<dir>   Reuse bloxels rendered by previous batches from the
+                    render cache stored in this directory
+    --cache-size=<mb>
+                    Size limit of the render cache in megabytes
+                    [default: 1024]
+    --atlas         Pack the bloxels of a batch into Atlas-<page>.png images
+                    with an Atlas.json manifest instead of separate images
+    --atlas-size=<px>
+                    The width and height of each atlas page [default: 2048]
+    --binary-manifest
+                    Also write the atlas manifest as Atlas.bin
+    -j <jobs> --jobs=<jobs>
+                    The number of processes to render batches with
+                    [default: 1]
+    --format=<format>
+                    The format to save batch and scene bloxels in, which is
+                    also the format scene sprites are read in: png, palette
+                    (PNG with a palette when there are at most 256 colors),
+                    raw (uncompressed RGBA) or qoi [default: png]
+    --compress=<level>
+                    The zlib compression level (0-9) of PNGs [default: 6]
+    --incremental   Only render the bloxels whose tiles, instruction or
+                    settings changed since the previous build in the output
+                    path (recorded in its Build.json), leave files with
+                    unchanged contents untouched and remove files that are no
+                    longer produced
+    --watch         Keep running, incrementally rebuilding the batch every
+                    time the texture map or blockfile is saved
+    --interval=<seconds>
+                    How often watched files are checked for changes
+                    [default: 0.5]
+    --tile-size=<px>
+                    Render the whole projected area of a bloxel file in tiles
+                    of this size instead of clipping it to the canvas, saving
+                    each tile as Bloxel-<blockname>-<column>-<row>-<dir> along
+                    with a Bloxel-<blockname>-<dir>.json layout
+    --stitch        Save the tiles stitched together as a single image
+    --convert=<voxel-file>
+                    Convert a text bloxel file into a binary voxel file
+                    (.blxv), which loads without parsing
+    --scene=<scene-file>
+                    Compose a structure of blocks from their bloxels. The
+                    JSON scene file holds a "grid" of block names indexed by
+                    x, y (up) and z with null for empty positions and/or a
+                    list of "blocks" given as [x, y, z, name]
+    --sprites=<path>
+                    The path holding the Bloxel-<name>-<dir> bloxel of every
+                    block of a scene [default: .]
 
 Arguments:
     <all-sides>     Image to use for every side of block
@@ -84,16 +140,38 @@ __all__ = [
     'Shade',
     'ColorTable',
     'IsoCoors',
+    'RenderPlan',
+    'Scene',
 ]
 
 
 import sys # Command line arguments
+import time # Polling watched files
 import random # Filenames
+import json # Layouts of tiled bloxels
+import shutil # Copying bloxels shared by several blocks
+import itertools # Splitting batches into chunks
+import collections # Chunks in flight
+from contextlib import nullcontext # Batches that are not saved
+import multiprocessing # Rendering batches with several processes
+from multiprocessing import shared_memory # Sharing texture maps with workers
+from multiprocessing import resource_tracker # Cleaning up shared memory
 from pathlib import Path # For outputting images and naming ambiguous outputs
-from functools import lru_cache # Cache inputs/outputs of functions
+import numpy as np # Bulk pixel operations
 from docopt import docopt # CLI creation tool
 from PIL import Image, ImageDraw, ImageOps
 from . blockfile import *
+from . cache import * # Bounded caches
+from . composite import * # Bulk compositing of pixel arrays
+from . texture import * # Decoded textures
+from . rendercache import * # Reusing previous renders
+from . atlas import * # Packing bloxels into sprite atlases
+from . writer import * # Saving bloxels in the background
+from . encode import * # Encoding saved bloxels
+from . bands import * # Decoding texture maps a band at a time
+from . manifest import * # Incremental builds
+from . voxels import * # Binary voxel files
+from . chunks import * # Culling hidden voxels
 from . terminal_colors import * # Terminal color constants
 
 
@@ -110,7 +188,19 @@ class CLI:
     """
     Convenience class for creating bloxels based on certain command line
     arguments.
+
+    Attributes:
+        BATCH_SIZE: the number of bloxels rendered at once by batch processing.
+        CHUNK_SIZE: the number of bloxels sent to a worker process at once.
+        WRITE_THREADS: the number of threads saving the bloxels of a batch.
+        worker: the state of the current process if it is a batch worker.
+        renderers: the renderer of every encoder batches were saved with.
     """
+    BATCH_SIZE = 256
+    CHUNK_SIZE = 64
+    WRITE_THREADS = 4
+    worker = None
+    renderers = {}
 
     @staticmethod
     def create_texture(filename, r, g, b, a, width, height):
@@ -131,9 +221,607 @@ class CLI:
         fill_image(tex, (r, g, b, a))
         tex.save(filename)
 
+    @staticmethod
+    def iter_instances(iso, instances, dirs, out_path=None, cache=None,
+        manifest=None):
+        """
+        Lazily render scalar bloxels for every (name, sides) pair in
+        `instances`, BATCH_SIZE bloxels at a time.
+
+        Only one batch is held in memory at once, so the first sprites are
+        available long before a large batch is done. Saving happens on
+        WRITE_THREADS background threads, and every file is complete once
+        the generator is exhausted or closed.
+
+        Args:
+            iso(Iso): the renderer to use
+            instances(iterable): (name, sides) pairs where sides is a (6,
+                TEX_WIDTH, TEX_WIDTH, 4) uint8 array of RGBA sides in up,
+                down, left, right, front, back order. The name can also be a
+                list of the names of every block with the same sides, which
+                is rendered once and yielded for each name.
+            dirs(list): booleans representing: [North, East, South, West]
+            out_path(str): the path (not filename) to save the textures in,
+                if any
+            cache(RenderCache): the cache to reuse previous renders from, if
+                any. Only used when saving to out_path.
+            manifest(BuildManifest): the manifest to reuse the bloxels of the
+                previous build from and to record every bloxel in, if any
+
+        Return:
+            A generator of (name, direction, sprite) tuples in the order of
+            `instances` where sprite is an RGBA Image or None if it was
+            copied to out_path from the cache or is up to date.
+        """
+        width = Iso.CANVAS_WIDTH
+        directions = [dir for dir in Directions.ALL if dirs[dir]]
+        out = np.empty(
+            (CLI.BATCH_SIZE, len(directions), width, width, 4), dtype=np.uint8
+        )
+        instances = iter(instances)
+
+        writer = Writer(CLI.WRITE_THREADS) if out_path else nullcontext()
+        with writer:
+            yield from CLI.iter_batches(iso, instances, directions, out_path,
+                cache, out, writer, manifest)
+
+    @staticmethod
+    def iter_batches(iso, instances, directions, out_path, cache, out, writer,
+        manifest=None):
+        """
+        Renders `instances` for `iter_instances` one batch at a time.
+
+        Args:
+            iso(Iso): the renderer to use
+            instances(iterator): (name, sides) pairs
+            directions(list): the directions to render
+            out_path(str): the path (not filename) to save the textures in,
+                if any
+            cache(RenderCache): the cache to reuse previous renders from
+            out(ndarray): the buffer to render each batch into
+            writer(Writer): the writer to save the textures with
+            manifest(BuildManifest): the manifest of the build, if any
+        """
+        while True:
+            batch = list(itertools.islice(instances, CLI.BATCH_SIZE))
+            if not batch:
+                break
+
+            names = [
+                [name] if isinstance(name, str) else name
+                for name, sides in batch
+            ]
+            sides = np.stack([sides for name, sides in batch])
+            cached = np.zeros((len(batch), len(directions)), dtype=bool)
+            reused = {}
+
+            keys = None
+            if manifest is not None or (cache is not None and out_path):
+                keys = [
+                    iso.get_render_keys(directions, *instance)
+                    for instance in sides
+                ]
+
+            if manifest is not None:
+                CLI.reuse_outputs(iso, manifest, names, directions, keys,
+                    out_path, cached, reused)
+
+            # Copy bloxels that were rendered before straight from the cache
+            if cache is not None and out_path:
+                for i, aliases in enumerate(names):
+                    for d, dir in enumerate(directions):
+                        cached[i, d] = cached[i, d] or all(
+                            cache.fetch(
+                                keys[i][d],
+                                iso.get_filename(dir, name, out_path)
+                            )
+                            for name in aliases
+                        )
+
+            done = cached.copy()
+            for i, d in reused:
+                done[i, d] = True
+
+            todo = ~done.all(axis=1)
+            bloxels = iter(
+                iso.render_batch(sides[todo], directions, out=out)
+                if todo.any() else []
+            )
+
+            for i, aliases in enumerate(names):
+                bloxel = next(bloxels) if todo[i] else None
+
+                for d, dir in enumerate(directions):
+                    if cached[i, d]:
+                        for name in aliases:
+                            yield name, dir, None
+                        continue
+
+                    if (i, d) in reused:
+                        for name in aliases:
+                            yield name, dir, reused[i, d]
+                        continue
+
+                    # The batch buffer is reused, so every sprite gets a copy
+                    sprite = Image.fromarray(bloxel[d].copy())
+
+                    if out_path:
+                        writer.submit(
+                            CLI.save_sprite, iso, sprite, dir, aliases,
+                            out_path, cache, keys[i][d] if keys else None,
+                            manifest is not None
+                        )
+
+                    for name in aliases:
+                        yield name, dir, sprite
+
+    @staticmethod
+    def reuse_outputs(iso, manifest, names, directions, keys, out_path,
+        cached, reused):
+        """
+        Finds the bloxels of a batch that are up to date according to the
+        manifest of the previous build, and records every bloxel of the batch
+        in the manifest of this one.
+
+        Args:
+            iso(Iso): the renderer of the batch
+            manifest(BuildManifest): the manifest of the build
+            names(list): the names of the blocks of every instance
+            directions(list): the directions rendered
+            keys(list): the render keys of every instance in each direction
+            out_path(str): the path the bloxels are saved in, if any
+            cached(ndarray): set for every saved bloxel that is up to date
+            reused(dict): filled with the bloxel restored from the previous
+                atlas for every (instance, direction) that is up to date
+        """
+        for i, aliases in enumerate(names):
+            for d, dir in enumerate(directions):
+                key = keys[i][d]
+                filenames = [
+                    iso.get_filename(dir, name, out_path) if out_path else None
+                    for name in aliases
+                ]
+
+                if out_path:
+                    cached[i, d] = all(
+                        manifest.is_current(name, dir, key, filename)
+                        for name, filename in zip(aliases, filenames)
+                    )
+
+                elif manifest.atlas is not None:
+                    sprites = [
+                        manifest.get_sprite(name, dir, key) for name in aliases
+                    ]
+                    if all(sprite is not None for sprite in sprites):
+                        reused[i, d] = sprites[0]
+
+                for name, filename in zip(aliases, filenames):
+                    manifest.record(name, dir, key, filename)
+
+    @staticmethod
+    def save_sprite(iso, sprite, dir, names, out_path, cache=None, key=None,
+        compare=False):
+        """
+        Saves a rendered sprite under every one of its names and stores it in
+        the render cache.
+
+        The sprite is only encoded once and copied for every other name.
+
+        Args:
+            iso(Iso): the renderer that rendered the sprite
+            sprite(Image): the sprite to save
+            dir(Direction): the direction of the sprite
+            names(list): the names of the blocks that look like the sprite
+            out_path(str): the path (not filename) to save the sprite in
+            cache(RenderCache): the cache to store the sprite in, if any
+            key(str): the cache key of the sprite
+            compare(bool): leave files that already hold the same bytes
+                untouched
+        """
+        if compare:
+            data = iso.encoder.encode(sprite)
+            for name in set(names):
+                filename = iso.get_filename(dir, name, out_path)
+                BuildManifest.write(data, filename)
+
+            if cache is not None:
+                cache.put(key, iso.get_filename(dir, names[0], out_path))
+            return
+
+        filename = iso.save(sprite, dir, names[0], out_path)
+        for name in set(names) - {names[0]}:
+            shutil.copyfile(filename, iso.get_filename(dir, name, out_path))
+
+        if cache is not None:
+            cache.put(key, filename)
+
+    @staticmethod
+    def iter_tiles(bands, dirs, out_path=None, cache=None, jobs=1,
+        encoder=None, manifest=None):
+        """
+        Lazily render scalar bloxels whose sides are tiles of a texture map.
+
+        The texture map is given as bands of tiles so that it never has to be
+        decoded all at once. A band is released as soon as its tiles have
+        been read.
+
+        With more than one job, each band is shared with a pool of worker
+        processes through shared memory. Workers render (and save) chunks of
+        instances while the results are yielded in their original order, so
+        the output is the same as when rendering with a single process. Only
+        a few chunks per worker are in flight at once.
+
+        Args:
+            bands(iterable): (texture, instances) pairs where texture is the
+                Texture of a band and instances are the (name, coordinates)
+                pairs to render from it. The coordinates are the six (x, y)
+                tiles of the band to use for the up, down, left, right, front
+                and back sides.
+            dirs(list): booleans representing: [North, East, South, West]
+            out_path(str): the path (not filename) to save the textures in,
+                if any
+            cache(RenderCache): the cache to reuse previous renders from
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest of the build, if any
+
+        Return:
+            A generator of (name, direction, sprite) tuples in the order of
+            the instances. When saving to out_path, sprite may be None.
+        """
+        if jobs <= 1:
+            sides = (
+                instance
+                for texture, instances in bands
+                for instance in CLI.get_sides(texture, instances)
+            )
+            yield from CLI.iter_instances(CLI.get_iso(encoder), sides, dirs,
+                out_path, cache, manifest)
+            return
+
+        memories = []
+        worker = dirs, out_path, cache, encoder, manifest
+
+        # Workers register the bands they attach to with the resource tracker
+        # too, so they must share the tracker of this process
+        resource_tracker.ensure_running()
+
+        try:
+            with multiprocessing.Pool(jobs, CLI.start_worker, worker) as pool:
+                pending = collections.deque()
+                chunks = CLI.get_shared_chunks(bands, memories)
+
+                for chunk in itertools.chain(chunks, [None]):
+                    if chunk is not None:
+                        *args, done = chunk
+                        pending.append(
+                            (pool.apply_async(CLI.run_worker, args), done)
+                        )
+
+                    # Wait for the oldest chunk once enough are in flight
+                    while pending and (
+                        chunk is None or len(pending) >= jobs * 2
+                    ):
+                        result, done = pending.popleft()
+                        sprites, records = result.get()
+                        if manifest is not None:
+                            manifest.add_records(records)
+                        yield from sprites
+
+                        # Release bands whose every chunk is done
+                        if done is not None:
+                            memories.remove(done)
+                            done.close()
+                            done.unlink()
+
+        finally:
+            for memory in memories:
+                memory.close()
+                memory.unlink()
+
+    @staticmethod
+    def get_iso(encoder=None):
+        """
+        Returns the renderer of batches saved with the given encoder.
+
+        Renderers are kept for the life of the process, so the colors and
+        coordinates they have cached carry over from one batch to the next.
+
+        Args:
+            encoder(Encoder): the encoder to save bloxels with
+        """
+        key = repr(encoder)
+        if key not in CLI.renderers:
+            CLI.renderers[key] = Iso(4, encoder)
+        return CLI.renderers[key]
+
+    @staticmethod
+    def get_sides(texture, instances):
+        """
+        Yields the (name, sides) pair of every instance by stacking the tiles
+        of the given texture it uses.
+
+        Args:
+            texture(Texture): the texture map to take the sides from
+            instances(iterable): (name, coordinates) pairs
+        """
+        tex = Iso.TEX_WIDTH
+        pixels = texture.pixels
+
+        for name, coordinates in instances:
+            yield name, np.stack([
+                pixels[y * tex:(y + 1) * tex, x * tex:(x + 1) * tex]
+                for x, y in coordinates
+            ])
+
+    @staticmethod
+    def get_shared_chunks(bands, memories):
+        """
+        Copies every band into shared memory and yields the chunks of its
+        instances for `run_worker`.
+
+        Args:
+            bands(iterable): (texture, instances) pairs
+            memories(list): the list to add the SharedMemory of every band to
+
+        Return:
+            A generator of (name, shape, chunk, done) tuples where name and
+            shape describe the shared band, chunk is a list of instances and
+            done is the SharedMemory of the band if it is its last chunk.
+        """
+        for texture, instances in bands:
+            pixels = np.ascontiguousarray(texture.pixels)
+            memory = shared_memory.SharedMemory(
+                create=True, size=max(pixels.nbytes, 1)
+            )
+            memories.append(memory)
+            np.ndarray(pixels.shape, np.uint8, memory.buf)[:] = pixels
+            shape = pixels.shape
+            del pixels, texture
+
+            instances = iter(instances)
+            chunk = list(itertools.islice(instances, CLI.CHUNK_SIZE))
+
+            # Look one chunk ahead to know which chunk is the last one
+            while chunk:
+                after = list(itertools.islice(instances, CLI.CHUNK_SIZE))
+                last = memory if not after else None
+                yield memory.name, shape, chunk, last
+                chunk = after
+
+    @staticmethod
+    def start_worker(dirs, out_path, cache, encoder, manifest):
+        """
+        Prepares a worker process of `iter_tiles` by creating the renderer it
+        uses for every chunk.
+
+        Args:
+            dirs(list): booleans representing: [North, East, South, West]
+            out_path(str): the path to save the textures in or None to return
+                them
+            cache(RenderCache): the cache to reuse previous renders from
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest of the build, if any
+        """
+        CLI.worker = [
+            CLI.get_iso(encoder), dirs, out_path, cache, manifest, None, None
+        ]
+
+    @staticmethod
+    def run_worker(band, shape, chunk):
+        """
+        Renders a chunk of `iter_tiles` instances in a worker process.
+
+        Args:
+            band(str): the name of the shared memory holding the band
+            shape(tuple): the shape of the band pixels
+            chunk(list): (name, coordinates) pairs to render
+
+        Return:
+            The list of (name, direction, sprite) tuples of the chunk, where
+            sprite is None if it was saved by the worker, along with what the
+            chunk recorded in the build manifest, if any.
+        """
+        iso, dirs, out_path, cache, manifest, memory, texture = CLI.worker
+
+        # Attach to the band unless the previous chunk was from it as well
+        if memory is None or memory.name.lstrip('/') != band.lstrip('/'):
+            attached = shared_memory.SharedMemory(band)
+            texture = Texture(np.ndarray(shape, np.uint8, attached.buf))
+            CLI.worker[5:] = attached, texture
+            if memory is not None:
+                memory.close()
+
+        sides = CLI.get_sides(texture, chunk)
+
+        sprites = [
+            (name, dir, None if out_path else sprite)
+            for name, dir, sprite in CLI.iter_instances(
+                iso, sides, dirs, out_path, cache, manifest
+            )
+        ]
+        return sprites, manifest and manifest.get_records()
+
+    @staticmethod
+    def get_blockfile_bands(texture, blockfile):
+        """
+        Reads the tiles a blockfile can use out of a texture map a band at a
+        time and plans the instructions of the blockfile.
+
+        Args:
+            texture(str): the filename of the texture map
+            blockfile(BlockFile): the blockfile to plan
+
+        Return:
+            A list with the single (texture, instances) pair for `iter_tiles`,
+            where the instances are the unique faces along with every name
+            using them, planned as they are consumed.
+        """
+        tex = Iso.TEX_WIDTH
+        bands = (
+            (top, band.pixels) for top, band in TextureBands(texture, tex)
+        )
+        tiles = ExecutionPlan.get_map(
+            bands, tex, blockfile.num_across, blockfile.num_down
+        )
+        return [(Texture(tiles), iter(blockfile.compile(CLI.BATCH_SIZE)))]
+
+    @staticmethod
+    def get_texture_bands(texture, num_across, num_down, rng=random):
+        """
+        Yields the bands of a texture map along with a (name, coordinates)
+        pair with a random name for every inner texture of the band, using it
+        for every side.
+
+        The texture map is decoded a band at a time, each band holding enough
+        rows of inner textures to fill a worker chunk.
+
+        Args:
+            texture(str): the filename of the texture map
+            num_across(int): the number of inner textures across
+            num_down(int): the number of inner textures down
+            rng(Random): the random number generator to name blocks with
+
+        Return:
+            A generator of (texture, instances) pairs for `iter_tiles`.
+        """
+        characters = (
+            'abcdefghijklmnopqrstuvwxyz'
+            'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+            '1234567890'
+        )
+        tex = Iso.TEX_WIDTH
+        rows = max(1, -(-CLI.CHUNK_SIZE // max(num_across, 1)))
+
+        for top, band in TextureBands(texture, rows * tex):
+            first = top // tex
+            last = min(first + band.height // tex, num_down)
+            if first >= num_down:
+                break
+
+            instances = []
+            for y in range(last - first):
+                for x in range(num_across):
+                    name = ''.join(
+                        [rng.choice(characters) for i in range(8)]
+                    )
+                    instances.append((name, [(x, y)] * 6))
+
+            yield band, instances
+
+    @staticmethod
+    def get_names(manifest=None):
+        """
+        Returns the random number generator to name unnamed blocks with.
+
+        Incremental builds need every block to keep its name from one build
+        to the next, so they use a generator that always starts the same.
+
+        Args:
+            manifest(BuildManifest): the manifest of the build, if any
+        """
+        return random if manifest is None else random.Random(0)
+
+    @staticmethod
+    def iter_blockfile_batch(dirs, filename, texture, num_across, num_down,
+        out_path=None, cache=None, jobs=1, encoder=None, manifest=None):
+        """
+        Streaming counterpart of `process_blockfile_batch` that yields every
+        sprite as soon as it is rendered instead of returning them all at the
+        end.
+
+        Args:
+            dirs(list): booleans representing: [North, East, South, West]
+            filename(str): the blockfile to open and process
+            texture(str): the filename of the input texture
+            num_across(int): the number of inner textures across
+            num_down(int): the number of inner textures down
+            out_path(str): the path (not filename) to also save the textures
+                in, if any
+            cache(RenderCache): the cache to reuse previous renders from
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest to build incrementally
+                with, if any. Unnamed blocks are then named the same way on
+                every build.
+
+        Return:
+            A generator of (name, direction, sprite) tuples. When saving to
+            out_path, sprite may be None.
+        """
+        blockfile = BlockFile(
+            filename, num_across, num_down, CLI.get_names(manifest)
+        )
+        bands = CLI.get_blockfile_bands(texture, blockfile)
+
+        yield from CLI.iter_tiles(bands, dirs, out_path, cache, jobs, encoder,
+            manifest)
+
+    @staticmethod
+    def iter_texture_batch(dirs, texture, num_across, num_down, out_path=None,
+        cache=None, jobs=1, encoder=None, manifest=None):
+        """
+        Streaming counterpart of `process_texture_batch` that yields every
+        sprite as soon as it is rendered instead of returning them all at the
+        end.
+
+        Args:
+            dirs(list): booleans representing: [North, East, South, West]
+            texture(str): the filename of the input texture
+            num_across(int): the number of inner textures across
+            num_down(int): the number of inner textures down
+            out_path(str): the path (not filename) to also save the textures
+                in, if any
+            cache(RenderCache): the cache to reuse previous renders from
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest to build incrementally
+                with, if any. Unnamed blocks are then named the same way on
+                every build.
+
+        Return:
+            A generator of (name, direction, sprite) tuples. When saving to
+            out_path, sprite may be None.
+        """
+        bands = CLI.get_texture_bands(
+            texture, num_across, num_down, CLI.get_names(manifest)
+        )
+
+        yield from CLI.iter_tiles(bands, dirs, out_path, cache, jobs, encoder,
+            manifest)
+
+    @staticmethod
+    def finish_batch(sprites, num_textures, out_path, atlas=None):
+        """
+        Reports the progress of a stream of rendered sprites and collects them.
+
+        Args:
+            sprites(iterable): (name, direction, sprite) tuples
+            num_textures(int): the number of sprites, for progress reporting
+            out_path(str): the path the sprites were saved in, if any
+            atlas(Atlas): the atlas to pack the sprites onto, if any
+
+        Return:
+            None if an output path or atlas is specified and the list of
+            sprites otherwise.
+        """
+        textures = []
+
+        for count, (name, dir, sprite) in enumerate(sprites, 1):
+            if atlas is not None:
+                atlas.add(name, dir, np.asarray(sprite))
+
+            elif not out_path:
+                textures.append(sprite)
+
+            print(f'Bloxel {count} of {num_textures} done...')
+
+        if not out_path and atlas is None:
+            return textures
+
     @staticmethod
     def process_blockfile_batch(out_path, dirs, filename, texture, num_across,
-        num_down):
+        num_down, cache=None, atlas=None, jobs=1, encoder=None, manifest=None):
         """
         Take a supplied input texture and generate a scalar bloxel from the
         instructions in the given blockfile.
@@ -151,58 +839,35 @@ class CLI:
             texture(str): the filename of the input texture
             num_across(int): the number of inner textures across
             num_down(int): the number of inner textures down
+            cache(RenderCache): the cache to reuse previous renders from
+            atlas(Atlas): the atlas to pack the bloxels onto instead of saving
+                them separately
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest to build incrementally
+                with, if any
 
         Return:
             None if no output path is specified and the list of generated 
             textures if a path was supplied.
         """
-        iso = Iso(4)
-        texture = iso.get_texture(Path(texture), Directions.ALL)
-        textures = []
-        count = 0
-        blockfile = BlockFile(filename, num_across, num_down)
-        num_textures = blockfile.num_instructions * sum(dirs)
+        blockfile = BlockFile(
+            filename, num_across, num_down, CLI.get_names(manifest)
+        )
+        num_textures = blockfile.num_instructions * sum(map(bool, dirs))
 
         print('-' * 30, '\n', 'Starting next side...', '\n', '-' * 30)
 
-        for name, coordinates in blockfile.get_all():
-
-            the_textures = []
-
-            for indexes in coordinates:
-                xx, yy = indexes
-                x_start = xx * Iso.TEX_WIDTH
-                y_start = yy * Iso.TEX_WIDTH
-                x_end = x_start + Iso.TEX_WIDTH
-                y_end = y_start + Iso.TEX_WIDTH
-                tex = texture.crop((x_start, y_start, x_end, y_end))
-                the_textures.append(tex)
-
-            for dir in Directions.ALL:
-                if not dirs[dir]:
-                    continue
-
-                count += 1
-
-                # Fill in the rest of the sides for the bloxel creation
-                less = 6 - len(the_textures)
-                if less > 0:
-                    the_textures.extend([the_textures[-1]] * less)
-
-                bloxel = iso.get_scalar_bloxel(dir, *the_textures)
-
-                if not out_path:
-                    textures.append(bloxel)
-                else:
-                    iso.save(bloxel, dir, name, out_path)
-
-                print(f'Bloxel {count} of {num_textures} done...')
-
-        if not out_path:
-            return textures
+        bands = CLI.get_blockfile_bands(texture, blockfile)
+        sprites = CLI.iter_tiles(bands, dirs,
+            None if atlas is not None else out_path, cache, jobs, encoder,
+            manifest
+        )
+        return CLI.finish_batch(sprites, num_textures, out_path, atlas)
 
     @staticmethod
-    def process_texture_batch(out_path, dirs, texture, num_across, num_down):
+    def process_texture_batch(out_path, dirs, texture, num_across, num_down,
+        cache=None, atlas=None, jobs=1, encoder=None, manifest=None):
         """
         Create a scalar block with a random name from each texture in the
         texture map.
@@ -216,52 +881,167 @@ class CLI:
             texture(str): the filename of the input texture
             num_across(int): the number of inner textures across
             num_down(int): the number of inner textures down
+            cache(RenderCache): the cache to reuse previous renders from
+            atlas(Atlas): the atlas to pack the bloxels onto instead of saving
+                them separately
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            manifest(BuildManifest): the manifest to build incrementally
+                with, if any
 
         Return:
             None if no output path is specified and the list of generated 
             textures if a path was supplied.
         """
-        iso = Iso(4)
-        texture = iso.get_texture(Path(texture))
-        textures = []
-        characters = (
-            'abcdefghijklmnopqrstuvwxyz'
-            'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-            '1234567890'
+        num_textures = num_across * num_down * sum(map(bool, dirs))
+
+        sprites = CLI.iter_texture_batch(dirs, texture, num_across, num_down,
+            None if atlas is not None else out_path, cache, jobs, encoder,
+            manifest
         )
+        return CLI.finish_batch(sprites, num_textures, out_path, atlas)
 
-        num_textures = num_across * num_down * sum(dirs)
-        count = 0
+    @staticmethod
+    def process_batch(out_path, dirs, texture, num_across, num_down,
+        filename=None, cache=None, atlas_size=None, binary=False, jobs=1,
+        encoder=None, incremental=False):
+        """
+        Renders a texture map batch, from a blockfile if one is given, into
+        separate files or an atlas.
 
-        for y in range(num_down):
-            for x in range(num_across):
+        Args:
+            out_path(Path): the path (not filename) to save the textures
+            dirs(list): booleans representing: [North, East, South, West]
+            texture(str): the filename of the input texture
+            num_across(int): the number of inner textures across
+            num_down(int): the number of inner textures down
+            filename(str): the blockfile to process, if any
+            cache(RenderCache): the cache to reuse previous renders from
+            atlas_size(int): the size of the atlas pages to pack the bloxels
+                onto instead of saving them separately, if any
+            binary(bool): whether to also save the binary atlas manifest
+            jobs(int): the number of processes to render with
+            encoder(Encoder): the encoder to save bloxels with
+            incremental(bool): whether to only render the bloxels that
+                changed since the previous build
+        """
+        atlas = None
+        if atlas_size is not None:
+            atlas = Atlas(atlas_size)
+
+        manifest = None
+        if incremental:
+            manifest = BuildManifest(
+                out_path, 'Atlas' if atlas is not None else None
+            )
 
-                # In this case, x and y are obtained from the blockfile
-                
-                x_start = x * Iso.TEX_WIDTH
-                y_start = y * Iso.TEX_WIDTH
-                x_end = x_start + (Iso.TEX_WIDTH)
-                y_end = y_start + (Iso.TEX_WIDTH)
+        # Create a scalar block from each and every texture in the texture map
+        if not filename:
+            CLI.process_texture_batch(out_path, dirs, texture, num_across,
+                num_down, cache, atlas, jobs, encoder, manifest
+            )
 
-                tex = texture.crop((x_start, y_start, x_end, y_end))
-                name = ''.join([random.choice(characters) for i in range(8)])
+        # Construct blocks according to the supplied blockfile
+        else:
+            CLI.process_blockfile_batch(out_path, dirs, filename, texture,
+                num_across, num_down, cache, atlas, jobs, encoder, manifest
+            )
 
-                for dir in Directions.ALL:
-                    if not dirs[dir]:
-                        continue
+        if atlas is not None:
+            filenames = atlas.save(out_path, binary=binary)
+            if manifest is not None:
+                manifest.add_files(filenames)
 
-                    count += 1
-                    bloxel = iso.get_scalar_bloxel(dir, *([tex] * 6))
+        if manifest is not None:
+            manifest.remove_orphans()
+            manifest.save()
 
-                    if not out_path:
-                        textures.append(bloxel)
-                    else:
-                        iso.save(bloxel, dir, name, out_path)
+    @staticmethod
+    def get_stamps(filenames):
+        """
+        Returns the modification time and size of every file, or None for
+        files that do not exist.
 
-                    print(f'Bloxel {count} of {num_textures} done...')
+        Args:
+            filenames(list): the files to check
+        """
+        stamps = []
 
-        if not out_path:
-            return textures
+        for filename in filenames:
+            try:
+                stat = Path(filename).stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+
+        return stamps
+
+    @staticmethod
+    def poll(filenames, stamps, build, interval=0.5):
+        """
+        Checks the given files for changes once and calls `build` if they
+        changed since `stamps` were taken.
+
+        A change is only acted on once the files have stopped changing for
+        one interval, so that a file is never read while it is being saved.
+        A failed build is reported instead of raised.
+
+        Args:
+            filenames(list): the files to check
+            stamps(list): the `get_stamps` of the files at the last check
+            build(callable): the function rebuilding the outputs
+            interval(float): the number of seconds to wait for the files to
+                stop changing
+
+        Return:
+            The stamps of the files to compare the next check against.
+        """
+        changed = CLI.get_stamps(filenames)
+        if changed == stamps:
+            return stamps
+
+        # Wait for the files to be completely saved
+        while True:
+            time.sleep(interval)
+            latest = CLI.get_stamps(filenames)
+            if latest == changed:
+                break
+            changed = latest
+
+        if None in changed:
+            return changed
+
+        try:
+            start = time.perf_counter()
+            build()
+            elapsed = time.perf_counter() - start
+            print(f'Rebuilt in {elapsed:.2f}s.')
+        except Exception as error:
+            print(f'Build failed: {error}')
+
+        return changed
+
+    @staticmethod
+    def watch(filenames, build, interval=0.5):
+        """
+        Calls `build` every time one of the given files changes, until
+        interrupted. See `poll` for how changes are handled.
+
+        Args:
+            filenames(list): the files to watch
+            build(callable): the function rebuilding the outputs
+            interval(float): the number of seconds between checks
+        """
+        stamps = CLI.get_stamps(filenames)
+        print(f'Watching {", ".join(map(str, filenames))} for changes...')
+
+        try:
+            while True:
+                time.sleep(interval)
+                stamps = CLI.poll(filenames, stamps, build, interval)
+
+        except KeyboardInterrupt:
+            pass
 
     @staticmethod
     def output_scalar_bloxel_up_down_rest(out_path, blockname, dirs, up, down,
@@ -285,10 +1065,12 @@ class CLI:
         down = iso.get_texture(Path(down))
         rest_sides = iso.get_texture(Path(rest_sides))
 
-        for i in Directions.ALL:
-            if dirs[i]:
-                out = iso.get_scalar_bloxel(i, up, down, *([rest_sides] * 4))
-                iso.save(out, i, blockname, out_path)
+        directions = [i for i in Directions.ALL if dirs[i]]
+        bloxels = iso.get_scalar_bloxels(directions, up, down,
+            *([rest_sides] * 4))
+
+        for i, out in zip(directions, bloxels):
+            iso.save(out, i, blockname, out_path)
 
     @staticmethod
     def output_scalar_bloxel_up_rest(out_path, blockname, dirs, up,
@@ -310,10 +1092,11 @@ class CLI:
         up = iso.get_texture(Path(up))
         rest_sides = iso.get_texture(Path(rest_sides))
 
-        for i in Directions.ALL:
-            if dirs[i]:
-                out = iso.get_scalar_bloxel(i, up, *([rest_sides] * 5))
-                iso.save(out, i, blockname, out_path)
+        directions = [i for i in Directions.ALL if dirs[i]]
+        bloxels = iso.get_scalar_bloxels(directions, up, *([rest_sides] * 5))
+
+        for i, out in zip(directions, bloxels):
+            iso.save(out, i, blockname, out_path)
 
     @staticmethod
     def output_scalar_bloxel_all_sides(out_path, blockname, dirs, up, down,
@@ -343,11 +1126,12 @@ class CLI:
         front = iso.get_texture(Path(front))
         back = iso.get_texture(Path(back))
 
-        for i in Directions.ALL:
-            if dirs[i]:
-                out = iso.get_scalar_bloxel(i, up, down, left, right, front,
-                    back)
-                iso.save(out, i, blockname, out_path)
+        directions = [i for i in Directions.ALL if dirs[i]]
+        bloxels = iso.get_scalar_bloxels(directions, up, down, left, right,
+            front, back)
+
+        for i, out in zip(directions, bloxels):
+            iso.save(out, i, blockname, out_path)
 
     @staticmethod
     def output_scalar_bloxel_same_sides(out_path, blockname, dirs, all_sides):
@@ -366,11 +1150,12 @@ class CLI:
         iso = Iso(4)
         all_sides = iso.get_texture(infile)
 
-        for i in Directions.ALL:
-            if dirs[i]:
-                out = iso.get_scalar_bloxel(i, *([all_sides] * 6))
-                iso.save(out, i, blockname if blockname else infile.stem,
-                    out_path)
+        directions = [i for i in Directions.ALL if dirs[i]]
+        bloxels = iso.get_scalar_bloxels(directions, *([all_sides] * 6))
+
+        for i, out in zip(directions, bloxels):
+            iso.save(out, i, blockname if blockname else infile.stem,
+                out_path)
 
     @staticmethod
     def output_multipart_bloxel(out_path, blockname, dirs, bloxfile):
@@ -379,17 +1164,106 @@ class CLI:
         coordinates and RGBA color values.
         """
         iso = Iso(4)
+        voxels = Iso.read_voxels(bloxfile)
+        index = VoxelIndex(voxels)
 
         for i in Directions.ALL:
             if dirs[i]:
-                with open(bloxfile) as file:
-                    xyzrgba_data = [
-                        tuple(int(float(i)) for i in line.split())
-                        for line in file.readlines()
-                    ]
-                out = iso.get_multipart_bloxel(i, xyzrgba_data)
+                out = iso.get_multipart_bloxel(i, voxels, index)
                 iso.save(out, i, blockname, out_path)
-        
+
+    @staticmethod
+    def output_multipart_tiles(out_path, blockname, dirs, bloxfile,
+        tile_size, stitch=False, jobs=1):
+        """
+        Generate a multipart bloxel of any size by rendering the whole area
+        its voxels project onto in tiles.
+
+        Each tile is saved as soon as it is drawn, along with a JSON layout
+        giving the position of every tile, so that only one tile is held at
+        a time. Stitched images are saved once every tile is drawn.
+
+        Args:
+            out_path(Path): the path (not file) to save the images in
+            blockname(str): the name of the generated block
+            dirs(list): booleans representing: [North, East, South, West]
+            bloxfile(str): the bloxel-file to render
+            tile_size(int): the width and height of every tile
+            stitch(bool): save a single image instead of tiles
+            jobs(int): the number of processes to draw tiles with
+        """
+        iso = CLI.get_iso()
+        voxels = Iso.read_voxels(bloxfile)
+        index = VoxelIndex(voxels)
+
+        for dir in Directions.ALL:
+            bounds = dirs[dir] and iso.get_multipart_bounds(dir, voxels)
+            if not bounds:
+                continue
+
+            left, upper, right, lower = bounds
+            image = None
+            if stitch:
+                image = Image.new('RGBA', (right - left, lower - upper))
+
+            layout = {
+                'left': left,
+                'top': upper,
+                'width': right - left,
+                'height': lower - upper,
+                'tile_size': tile_size,
+                'tiles': [],
+            }
+
+            for column, row, box, tile in iso.iter_multipart_tiles(
+                dir, voxels, tile_size, index, jobs
+            ):
+                if stitch:
+                    image.paste(tile, (box[0] - left, box[1] - upper))
+                    continue
+
+                filename = iso.save(
+                    tile, dir, f'{blockname}-{column}-{row}', out_path
+                )
+                layout['tiles'].append({
+                    'file': filename.name,
+                    'column': column,
+                    'row': row,
+                    'x': box[0] - left,
+                    'y': box[1] - upper,
+                })
+
+            if stitch:
+                iso.save(image, dir, blockname, out_path)
+            else:
+                layout_file = iso.get_filename(dir, blockname, out_path)
+                with open(layout_file.with_suffix('.json'), 'w') as file:
+                    json.dump(layout, file, indent=4)
+
+    @staticmethod
+    def output_scene(out_path, blockname, dirs, scene_file, sprite_path,
+        encoder=None):
+        """
+        Compose a structure of blocks from the bloxels previously generated
+        for each of them.
+
+        Args:
+            out_path(Path): the path (not file) to save the images in
+            blockname(str): the name of the generated structure
+            dirs(list): booleans representing: [North, East, South, West]
+            scene_file(str): the scene file giving the block names
+            sprite_path(Path): the path (not file) holding the bloxels
+            encoder(Encoder): the encoder the bloxels were saved with, which
+                the structure is saved with too
+        """
+        iso = CLI.get_iso(encoder)
+        scene = Scene.from_path(sprite_path, iso)
+        scene.update(Scene.read_blocks(scene_file))
+
+        for dir in Directions.ALL:
+            if dirs[dir]:
+                iso.save(scene.render(dir), dir, blockname, out_path)
+
 
 class Iso:
     """
@@ -404,24 +1278,48 @@ class Iso:
         table_top: the table used for storing colors for this visible side.
         table_left: the table used for storing colors for this visible side.
         table_right: the table used for storing colors for this visible side.
+        CANVAS_WIDTH: the width and height of every generated bloxel.
+        RENDER_VERSION: changed whenever the renderer output changes, so that
+            cached renders from older versions are not reused.
+        encoder: the encoder bloxels are saved with.
+        VOXEL: the structured dtype of the voxels of multipart bloxels.
+        PART_OFFSETS: the offset of the left, right and top part of a
+            voxel's cornerstone from its projected position.
+        occluders: the neighbors hiding each part of a voxel, by direction
+            (see `get_occluders`).
+        renderers: the renderer of worker processes drawing tiles, by tile
+            width (see `draw_tile`).
     """
     TEX_WIDTH = 16
+    CANVAS_WIDTH = 64
+    RENDER_VERSION = 1
+    VOXEL = VoxelFile.VOXEL
+    PART_OFFSETS = ((-1, 1), (1, 1), (0, 0))
+    renderers = {}
 
-    def __init__(self, tile_width):
+    def __init__(self, tile_width, encoder=None):
         """
         Initializes Iso with the given assumed tile width.
+
+        Args:
+            tile_width(int): the assumed tile width
+            encoder(Encoder): the encoder to save bloxels with. PNGs with the
+                default compression are saved if none is given.
         """
         self.coors = IsoCoors(tile_width)
+        self.encoder = encoder or PNGEncoder()
         self.table_top = ColorTable(Sides.TOP)
         self.table_left = ColorTable(Sides.LEFT)
         self.table_right = ColorTable(Sides.RIGHT)
+        self.occluders = dict()
 
     def seed_tables(self, texture, dir):
         """
-        Gets colors from the image's pallet and adds it to the color tables.
+        Gets colors from the texture's palette and adds them to the color
+        tables.
 
         Args:
-            texture(Image): the image to gather colors from
+            texture(Texture): the texture (or Image) to gather colors from
             dir(Directions): the direction to use when seeding the table
         """
         if dir == Directions.ALL:
@@ -429,11 +1327,13 @@ class Iso:
         else:
             dirs = [dir]
 
-        for color in texture.getcolors(100000):
-            for direction in dirs:
-                self.table_top.get(color[1], direction)
-                self.table_left.get(color[1], direction)
-                self.table_right.get(color[1], direction)
+        colors, _ = Texture.of(texture).palette
+        colors = ColorTable.pack(colors)
+
+        for direction in dirs:
+            self.table_top.lookup(colors, direction)
+            self.table_left.lookup(colors, direction)
+            self.table_right.lookup(colors, direction)
 
     def get_texture(self, filename, seed_direction=None):
         """
@@ -445,13 +1345,17 @@ class Iso:
         Args:
             filename(str): the filename of the texture to load
             seed_direction(Directions): the table to seed if any
+
+        Return:
+            The decoded Texture.
         """
-        texture = Image.open(filename)
+        texture = Texture.open(filename)
         if seed_direction:
             self.seed_tables(texture, seed_direction)
         return texture
 
-    def rotate_sides(self, dir, up, down, left, right, front, back):
+    @staticmethod
+    def rotate_sides(dir, up, down, left, right, front, back):
         """
         Uses the direction to choose each logical bloxel side.
 
@@ -492,183 +1396,647 @@ class Iso:
 
     def get_scalar_bloxel(self, dir, up, down, left, right, front, back):
         """
-        Return a bloxel texture from the supplied images.
+        Return a bloxel texture from the supplied textures or images.
 
         Args:
             dir(Directions): the direction to draw the bloxel on
-            up(Image): the image to use for drawing this side
-            down(Image): the image to use for drawing this side
-            left(Image): the image to use for drawing this side
-            right(Image): the image to use for drawing this side
-            front(Image): the image to use for drawing this side
-            back(Image): the image to use for drawing this side
+            up(Texture): the texture to use for drawing this side
+            down(Texture): the texture to use for drawing this side
+            left(Texture): the texture to use for drawing this side
+            right(Texture): the texture to use for drawing this side
+            front(Texture): the texture to use for drawing this side
+            back(Texture): the texture to use for drawing this side
         """
-        
-        up, down, left, right, front, back = self.rotate_sides(
-            dir, up, down, left, right, front, back
-        )
+        return self.get_scalar_bloxels([dir], up, down, left, right, front,
+            back)[0]
 
-        '''
-        Determine if any texture has an alpha channel and if that alpha channel
-        contains any value less than 255 (full alpha).
-        '''
-        draw_all_sides = any([
-            # See if any alpha value is below 255
-            any([i[1][3] < 255 for i in img.getcolors(100000)])
-            
-            # For each texture
-            for img in (up, down, left, right, front, back)
+    def get_scalar_bloxels(self, dirs, up, down, left, right, front, back):
+        """
+        Return a bloxel texture for each of the given directions.
 
-            # Only if that texture has an alpha channel
-            if 'A' in img.mode
-        ])
+        The supplied textures are only read once, no matter how many
+        directions are rendered. Images are accepted as well and are decoded
+        into Textures first.
 
-        canvas = Image.new('RGBA', (64, 64))
+        Args:
+            dirs(list): the directions to draw the bloxel on
+            up(Texture): the texture to use for drawing this side
+            down(Texture): the texture to use for drawing this side
+            left(Texture): the texture to use for drawing this side
+            right(Texture): the texture to use for drawing this side
+            front(Texture): the texture to use for drawing this side
+            back(Texture): the texture to use for drawing this side
 
-        def get_xy(width, height):
-            """
-            Convenience function to obtain a predefined set of coordinates.
+        Return:
+            A list with the bloxel for each direction in the order given.
+        """
+        tex = Iso.TEX_WIDTH
+        textures = [
+            Texture.of(side).crop((0, 0, tex, tex))
+            for side in (up, down, left, right, front, back)
+        ]
+        sides = np.stack([texture.pixels for texture in textures])
+        translucent = [any(texture.translucent for texture in textures)]
+        bloxels = self.render_batch(sides[None], dirs,
+            translucent=translucent)[0]
+        return [Image.fromarray(bloxel) for bloxel in bloxels]
+
+    def render_batch(self, sides, dirs=None, out=None, translucent=None):
+        """
+        Render many scalar bloxels in many directions at once.
 
-            Args:
-                width(int): the width of the texture being iterated through
-                height(int): the height of the texture being iterated through
+        Passing the array returned by a previous call as `out` reuses it so
+        that large batches can be rendered chunk by chunk without allocating.
 
-            Return:
-                A tuple containing: (x, y, (x, y)).
-                The `x` and `y` coordinates are indexes falling withing a 0-
-                width and 0-height range. The inner tuple is provided for
-                convenient iteration.
-            """
-            for x_pixel in range(width):
-                for y_pixel in range(height):
-                    yield x_pixel, y_pixel, (x_pixel, y_pixel)
+        Args:
+            sides(ndarray): (N, 6, TEX_WIDTH, TEX_WIDTH, 4) uint8 RGBA sides
+                of each bloxel in up, down, left, right, front, back order
+            dirs(list): the directions to render each bloxel in, every
+                direction if not given
+            out(ndarray): optional (M, len(dirs), CANVAS_WIDTH, CANVAS_WIDTH,
+                4) uint8 array to render into, where M is at least N
+            translucent(list): whether each bloxel has any translucent side,
+                computed from the sides if not given
 
-        if draw_all_sides:
-            # Draw the back top side
-            for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-                pxd = down.getpixel(coors)
-
-                if dir == Directions.NORTH:
-                    x, y = self.coors.get(x_pixel, y_pixel, -23)
-                elif dir == Directions.EAST:
-                    x, y = self.coors.get(y_pixel, x_pixel, -23)
-                elif dir == Directions.SOUTH:
-                    x, y = self.coors.get(
-                        Iso.TEX_WIDTH - x_pixel - 1,
-                        Iso.TEX_WIDTH - y_pixel - 1,
-                        -23
-                    )
-                elif dir == Directions.WEST:
-                    x, y = self.coors.get(
-                        Iso.TEX_WIDTH - y_pixel - 1,
-                        Iso.TEX_WIDTH - x_pixel - 1,
-                        -23
-                    )
+        Return:
+            The (N, len(dirs), CANVAS_WIDTH, CANVAS_WIDTH, 4) array of bloxels.
+        """
+        tex = Iso.TEX_WIDTH
+        width = Iso.CANVAS_WIDTH
+        dirs = Directions.ALL if dirs is None else dirs
+        sides = np.asarray(sides, dtype=np.uint8)[..., :tex, :tex, :]
+        shape = (len(sides), len(dirs), width, width, 4)
+
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif len(out) < len(sides) or out.shape[1:] != shape[1:]:
+            raise Exception(
+                f'Output array with shape {out.shape} is too small for '
+                f'{shape}.'
+            )
+        out = out[:len(sides)]
 
-                draw_image(x + 1, y + 1, self.table_top.get(pxd, dir), canvas)
+        # Textures with translucency need the back sides drawn as well
+        if translucent is None:
+            translucent = (sides[..., 3] < 255).any(axis=(1, 2, 3))
+        translucent = np.asarray(translucent, dtype=bool)
 
-            # Draw back right side
-            for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-                pxr = right.getpixel(coors)
-                x, y = self.coors.get(16, Iso.TEX_WIDTH - x_pixel - 1,
-                    Iso.TEX_WIDTH - y_pixel - 24)
-                draw_image(x, y, self.table_left.get(pxr, dir), canvas)
+        for draw_all_sides in (False, True):
+            group = translucent == draw_all_sides
+            if not group.any():
+                continue
 
-            # Draw back left side
-            for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-                pxf = front.getpixel(coors)
-                x, y = self.coors.get(Iso.TEX_WIDTH - x_pixel, 0,
-                    Iso.TEX_WIDTH - y_pixel - 1)
-                draw_image(-2 + x, 46 + y, self.table_right.get(pxf, dir),
-                    canvas)
+            for i, dir in enumerate(dirs):
+                plan = RenderPlan.get(
+                    dir, draw_all_sides, self.coors.tile_size
+                )
+                if group.all():
+                    plan.render_batch(sides, out[:, i])
+                else:
+                    out[group, i] = plan.render_batch(sides[group])
 
-        # Draw right side
-        for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-            pxb = back.getpixel(coors)
-            Cornerstone.get_right()
-            x, y = self.coors.get(16 + x_pixel, 0,
-                -Iso.TEX_WIDTH - 7 - y_pixel)
-            draw_image(x, y + 1, self.table_right.get(pxb, dir), canvas)
-            
-        # Draw left side
-        for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-            pxl = left.getpixel(coors)
-            x, y = self.coors.get(0, x_pixel, Iso.TEX_WIDTH - y_pixel - 1)
-            draw_image(x, 46 + y, self.table_left.get(pxl, dir), canvas)
+        return out
 
-        # Draw top side
-        for x_pixel, y_pixel, coors in get_xy(*[Iso.TEX_WIDTH] * 2):
-            pxu = up.getpixel(coors)
-            if dir == Directions.NORTH:
-                x, y = self.coors.get(x_pixel, y_pixel, -8)
-            elif dir == Directions.EAST:
-                x, y = self.coors.get(y_pixel, x_pixel, -8)
-            elif dir == Directions.SOUTH:
-                x, y = self.coors.get(Iso.TEX_WIDTH - x_pixel - 1,
-                    Iso.TEX_WIDTH - y_pixel - 1, -8)
-            elif dir == Directions.WEST:
-                x, y = self.coors.get(Iso.TEX_WIDTH - y_pixel - 1,
-                    Iso.TEX_WIDTH - x_pixel - 1, -8)
-            draw_image(x + 1, y - 1, self.table_top.get(pxu, dir), canvas)
+    @staticmethod
+    def get_voxels(bloxels):
+        """
+        Returns the voxels of a multipart bloxel as a structured array,
+        converting them if needed.
 
-        return canvas
+        Args:
+            bloxels(list): tuples of interleaved x, y, z, r, g, b and a
+                values, an (N, 7) array of them or an array of VOXEL
+
+        Return:
+            An array of VOXEL, which is the given array if it already was one.
+        """
+        if isinstance(bloxels, np.ndarray) and bloxels.dtype == Iso.VOXEL:
+            return bloxels
 
-    def get_multipart_bloxel(self, dir, bloxels):
+        data = np.array(bloxels, dtype=np.int64).reshape(-1, 7)
+        voxels = np.empty(len(data), dtype=Iso.VOXEL)
+        voxels['xyz'] = data[:, :3]
+        voxels['color'] = data[:, 3:]
+        return voxels
+
+    @staticmethod
+    def read_voxels(filename):
         """
-        Return a bloxel texture from the supplied bloxel filename.
+        Reads a bloxel-file, either a binary voxel file (see `VoxelFile`) or
+        text containing one voxel per line as whitespace separated x, y, z,
+        r, g, b and a values.
 
         Args:
-            dir(Direction): the direction to rotate to.
-            xyzrgba_data(list): list of tuples containing interlieved xyz/rgba.
+            filename(str): the bloxel-file to read
 
         Return:
-            An Image that contains the Isometric representation of the bloxel.
+            An array of VOXEL.
+        """
+        return VoxelFile.read_voxels(filename)
+
+    @staticmethod
+    def get_voxel_depths(dir, voxels):
+        """
+        Returns how near to the viewer every voxel is in a direction.
+
+        Voxels nearer to the viewer are drawn over voxels further away. Voxels
+        at the same distance are drawn over each other in the order given.
+
+        Args:
+            dir(Directions): the direction the voxels are viewed from
+            voxels(ndarray): array of VOXEL
+
+        Return:
+            An int64 array with a distinct depth for every voxel, where larger
+            depths are nearer.
+        """
+        depth = Iso.get_distance(dir, voxels['xyz'])
+        if not len(depth):
+            return depth
+
+        return (depth - depth.min()) * len(depth) + np.arange(len(depth))
+
+    @staticmethod
+    def get_distance(dir, xyz):
+        """
+        Returns how near to the viewer positions are in a direction, without
+        telling positions at the same distance apart.
+
+        Args:
+            dir(Directions): the direction the positions are viewed from
+            xyz(ndarray): (N, 3) positions
+
+        Return:
+            An int64 array where larger values are nearer.
         """
-        # Sort bloxels by x + y - z coordinates (for layered drawing)
+        x, y, z = np.asarray(xyz, dtype=np.int64).reshape(-1, 3).T
 
         if dir == Directions.NORTH:
-            bloxels.sort(key=lambda b: b[0] - b[1] - b[2], reverse=True)
+            return -(x - y - z)
 
         elif dir == Directions.EAST:
-            bloxels.sort(key=lambda b: b[2] + b[0] + b[1], reverse=False)
+            return z + x + y
 
         elif dir == Directions.SOUTH:
-            bloxels.sort(key=lambda b: b[0] + b[1] - b[2], reverse=False)
+            return x + y - z
 
-        elif dir == Directions.WEST:
-            bloxels.sort(key=lambda b: b[0] + b[2] - b[1], reverse=True)
+        else: # West
+            return -(x + z - y)
+
+    def project_voxels(self, dir, voxels):
+        """
+        Rotates and projects every voxel at once.
 
-        canvas = Image.new('RGBA', (64, 64))
+        Args:
+            dir(Direction): the direction to rotate to
+            voxels(ndarray): array of VOXEL
 
-        for bloxel in bloxels:
-            x, y, z, r, g, b, a = bloxel
+        Return:
+            A 2-tuple with the int64 arrays of the canvas x and y coordinates
+            of the top part of each voxel's cornerstone. The whole
+            cornerstone covers x - 1 to x + 2 and y to y + 3.
+        """
+        tex = Iso.TEX_WIDTH
+        x, y, z = voxels['xyz'].astype(np.int64).T
 
-            for i in range(dir):
-                # TODO(pebaz): Do this before sorting
-                x, z = Iso.TEX_WIDTH - z, x
+        # Rotate every voxel around the vertical axis in one step
+        x, z = (
+            (x, z),
+            (tex - z, x),
+            (tex - x, tex - z),
+            (z, tex - x),
+        )[dir]
 
-            ix, iy = self.coors.get(x, z, y -23)
+        ix, iy = self.coors.project(x, z, y - 23)
+        return ix + (1, -1, -3, -1)[dir], iy + (-1, 0, -1, -2)[dir]
 
-            if dir == Directions.NORTH:
-                ix += 1; iy -= 1
+    def get_pieces(self, colors, dir):
+        """
+        Returns the left, right and top parts of the cornerstone of colors.
 
-            elif dir == Directions.EAST:
-                ix -= 1; iy -= 0
+        Args:
+            colors(ndarray): (N,) packed RGBA colors (see `ColorTable.pack`)
+            dir(Direction): the direction used in shading calculations
 
-            elif dir == Directions.SOUTH:
-                ix -= 3; iy -= 1
+        Return:
+            The (N, 3, 3, 2, 4) uint8 RGBA parts, each drawn at its offset
+            in PART_OFFSETS.
+        """
+        pieces = np.zeros((len(colors), 3, 3, 2, 4), dtype=np.uint8)
+        for i, table in enumerate((
+            self.table_left, self.table_right, self.table_top
+        )):
+            piece = table.get_sprites(colors, dir)
+            pieces[:, i, :piece.shape[1], :piece.shape[2]] = piece
+        return pieces
+
+    def draw_voxels(self, dir, voxels, box, depths=None, hidden=None):
+        """
+        Draws the voxels of a multipart bloxel that fall within a box of the
+        canvas.
+
+        The cornerstone parts of every voxel are resolved with a depth buffer
+        rather than by drawing the voxels one after the other. Only the
+        nearest opaque part of each pixel and the translucent parts in front
+        of it are drawn.
+
+        Args:
+            dir(Direction): the direction to rotate to
+            voxels(ndarray): array of VOXEL
+            box(tuple): the left, upper, right and lower canvas coordinates
+                of the area to draw
+            depths(ndarray): the depth of each voxel (see
+                `get_voxel_depths`), needed when only some voxels of a model
+                are given
+            hidden(ndarray): the (N, 3) parts of each voxel that are not
+                drawn (see `cull_voxels`), if any
+
+        Return:
+            The (lower - upper, right - left, 4) uint8 array of the area.
+        """
+        left, upper, right, lower = box
+        width, height = right - left, lower - upper
+        canvas = np.zeros((height, width, 4), dtype=np.uint8)
+        if not len(voxels):
+            return canvas
+
+        if depths is None:
+            depths = Iso.get_voxel_depths(dir, voxels)
 
-            elif dir == Directions.WEST:
-                ix -= 1; iy -= 2
+        ix, iy = self.project_voxels(dir, voxels)
+
+        # The left, right and top parts of a cornerstone for each color
+        colors, inverse = np.unique(
+            ColorTable.pack(voxels['color']), return_inverse=True
+        )
+        pieces = self.get_pieces(colors, dir)
+
+        # Every pixel of every part of every voxel, with the parts of a voxel
+        # drawn over each other in order
+        offsets = np.array(Iso.PART_OFFSETS)
+        xs = (ix[:, None] + offsets[:, 0])[..., None, None] - left
+        ys = (iy[:, None] + offsets[:, 1])[..., None, None] - upper
+        rows, cols = np.mgrid[:3, :2]
+        xs, ys = np.broadcast_arrays(xs + cols, ys + rows)
+        depths = np.asarray(depths)[:, None] * 3 + range(3)
+        depths = np.broadcast_to(depths[..., None, None], xs.shape)
+        pixels = pieces[inverse.reshape(-1)]
+
+        visible = (
+            (pixels[..., 3] > 0)
+            & (xs >= 0) & (xs < width)
+            & (ys >= 0) & (ys < height)
+        )
+        if hidden is not None:
+            visible &= ~np.asarray(hidden)[..., None, None]
+        where = ys[visible] * width + xs[visible]
+        depths = depths[visible]
+        pixels = pixels[visible]
 
-            clr = (r, g, b, a)
+        # The depth of the nearest opaque part drawn onto each pixel
+        opaque = pixels[:, 3] == 255
+        nearest = np.full(width * height, -1, dtype=np.int64)
+        np.maximum.at(nearest, where[opaque], depths[opaque])
 
-            draw_image(ix - 1, iy + 1, self.table_left.get(clr, dir), canvas)
-            draw_image(ix + 1, iy + 1, self.table_right.get(clr, dir), canvas)
-            draw_image(ix, iy, self.table_top.get(clr, dir), canvas)
+        shown = depths >= nearest[where]
+        order = np.argsort(depths[shown], kind='stable')
+        draw(canvas, where[shown][order], pixels[shown][order])
 
         return canvas
 
+    def get_occluders(self, dir):
+        """
+        Finds the neighbors whose opaque voxels hide each part of a voxel's
+        cornerstone from a direction.
+
+        A part is hidden when the cornerstones of neighbors nearer to the
+        viewer cover every one of its pixels, since opaque colors replace
+        whatever is underneath them. The covers are found once per direction
+        by projecting a voxel and its neighbors.
+
+        Args:
+            dir(Direction): the direction the voxels are viewed from
+
+        Return:
+            For the left, right and top part, a list of bitmasks of
+            `VoxelIndex.OFFSETS`, any of which hides the part when every
+            neighbor in it is opaque. None if the projection of a voxel
+            depends on its position, in which case nothing is culled.
+        """
+        if dir in self.occluders:
+            return self.occluders[dir]
+
+        tile_size = self.coors.tile_size
+        if tile_size * 0.25 != int(tile_size * 0.25):
+            self.occluders[dir] = None
+            return None
+
+        probes = np.zeros(1 + len(VoxelIndex.OFFSETS), dtype=Iso.VOXEL)
+        probes['xyz'][1:] = VoxelIndex.OFFSETS
+        probes['color'] = Shade.WHITE
+        ix, iy = self.project_voxels(dir, probes)
+        distance = Iso.get_distance(dir, probes['xyz'])
+        masks = self.get_pieces(ColorTable.pack([Shade.WHITE]), dir)[0]
+
+        def footprint(i, parts):
+            return {
+                (ix[i] + x + col, iy[i] + y + row)
+                for part in parts
+                for x, y in [Iso.PART_OFFSETS[part]]
+                for row, col in zip(*np.nonzero(masks[part, ..., 3]))
+            }
+
+        occluders = []
+        for part in range(3):
+            target = footprint(0, [part])
+            coverage = {
+                i: footprint(i, range(3)) & target
+                for i in range(1, len(probes))
+                if distance[i] > distance[0]
+            }
+            coverage = {i: pixels for i, pixels in coverage.items() if pixels}
+
+            # Only the smallest covers matter, so stop after a few neighbors
+            covers = []
+            for size in range(1, 4):
+                for combination in itertools.combinations(coverage, size):
+                    bits = sum(1 << (i - 1) for i in combination)
+                    if any(cover & bits == cover for cover in covers):
+                        continue
+                    if set().union(*map(coverage.get, combination)) >= target:
+                        covers.append(bits)
+
+            occluders.append(covers)
+
+        self.occluders[dir] = occluders
+        return occluders
+
+    def cull_voxels(self, dir, voxels, index=None):
+        """
+        Finds the parts of voxels that are hidden behind opaque neighbors
+        from a direction, so they are never drawn.
+
+        Args:
+            dir(Direction): the direction the voxels are viewed from
+            voxels(ndarray): array of VOXEL
+            index(VoxelIndex): the index of the voxels, which can be shared
+                by every direction. Built if not given.
+
+        Return:
+            The indexes of the voxels with any visible part, the depth of
+            every voxel (see `get_voxel_depths`) and the (N, 3) bool array of
+            the hidden left, right and top parts of every voxel.
+        """
+        depths = Iso.get_voxel_depths(dir, voxels)
+        hidden = np.zeros((len(voxels), 3), dtype=bool)
+        occluders = self.get_occluders(dir)
+
+        if occluders and len(voxels):
+            if index is None:
+                index = VoxelIndex(voxels)
+
+            # Only the neighbors in some cover have to be looked up
+            needed = 0
+            for cover in itertools.chain(*occluders):
+                needed |= cover
+            used = [
+                i for i in range(len(VoxelIndex.OFFSETS)) if needed >> i & 1
+            ]
+            weights = np.left_shift(1, np.array(used, dtype=np.int64))
+
+            for start in range(0, len(voxels), 2 ** 16):
+                xyz = voxels['xyz'][start:start + 2 ** 16]
+                neighbors = index.get_neighbors(
+                    xyz, VoxelIndex.OFFSETS[used], opaque=True
+                )
+                bits = neighbors @ weights
+                for part, covers in enumerate(occluders):
+                    for cover in covers:
+                        hidden[start:start + len(xyz), part] |= (
+                            bits & cover
+                        ) == cover
+
+        return np.flatnonzero(~hidden.all(axis=1)), depths, hidden
+
+    def get_multipart_bloxel(self, dir, bloxels, index=None):
+        """
+        Return a bloxel texture from the supplied voxels.
+
+        Voxels projected outside of the canvas are clipped. See
+        `get_multipart_image` to render models of any size.
+
+        Args:
+            dir(Direction): the direction to rotate to.
+            bloxels(list): the voxels (see `get_voxels`), which are left
+                untouched.
+            index(VoxelIndex): the index of the voxels, if already built
+
+        Return:
+            An Image that contains the Isometric representation of the bloxel.
+        """
+        width = Iso.CANVAS_WIDTH
+        voxels = Iso.get_voxels(bloxels)
+        shown, depths, hidden = self.cull_voxels(dir, voxels, index)
+        return Image.fromarray(
+            self.draw_voxels(
+                dir,
+                voxels[shown],
+                (0, 0, width, width),
+                depths[shown],
+                hidden[shown]
+            )
+        )
+
+    def get_multipart_bounds(self, dir, voxels):
+        """
+        Returns the area of the canvas covered by every voxel of a model.
+
+        Args:
+            dir(Direction): the direction to rotate to
+            voxels(ndarray): array of VOXEL
+
+        Return:
+            The left, upper, right and lower canvas coordinates of the area,
+            which may lie outside of the canvas, or None without voxels.
+        """
+        if not len(voxels):
+            return None
+
+        ix, iy = self.project_voxels(dir, voxels)
+        return (
+            int(ix.min()) - 1, int(iy.min()),
+            int(ix.max()) + 3, int(iy.max()) + 4
+        )
+
+    def get_multipart_tiles(self, dir, voxels, tile_size=256, shown=None):
+        """
+        Splits the projected area of a model into square tiles and finds the
+        voxels whose cornerstone overlaps each tile.
+
+        Each tile can then be drawn on its own with `draw_voxels`, in any
+        order or process, without ever holding the whole image.
+
+        Args:
+            dir(Direction): the direction to rotate to
+            voxels(ndarray): array of VOXEL
+            tile_size(int): the width and height of every tile
+            shown(ndarray): the indexes of the voxels to split into tiles
+                (see `cull_voxels`). The tiles still cover every voxel.
+
+        Return:
+            A list of (column, row, box, indexes) tuples for every tile that
+            any shown voxel overlaps in row-major order, where box is the
+            area of the tile (see `draw_voxels`) and indexes are the
+            positions of its voxels in drawing order.
+        """
+        bounds = self.get_multipart_bounds(dir, voxels)
+        if bounds is None:
+            return []
+
+        if shown is None:
+            shown = np.arange(len(voxels))
+
+        left, upper, right, lower = bounds
+        columns = -(-(right - left) // tile_size)
+        ix, iy = self.project_voxels(dir, voxels[shown])
+
+        first_x = (ix - 1 - left) // tile_size
+        first_y = (iy - upper) // tile_size
+        last_x = (ix + 2 - left) // tile_size
+        last_y = (iy + 3 - upper) // tile_size
+
+        # A cornerstone is 4 pixels wide and high, so it spans at most this
+        # many tiles along each axis
+        span = -(-3 // tile_size) + 1
+        tiles = np.concatenate([
+            np.minimum(first_y + dy, last_y) * columns
+            + np.minimum(first_x + dx, last_x)
+            for dx in range(span)
+            for dy in range(span)
+        ])
+        owners = np.tile(shown, span * span)
+        pairs = np.unique(np.stack([tiles, owners], axis=1), axis=0)
+        tile_ids, starts = np.unique(pairs[:, 0], return_index=True)
+
+        out = []
+        for tile, voxel_indexes in zip(
+            tile_ids.tolist(), np.split(pairs[:, 1], starts[1:])
+        ):
+            column, row = tile % columns, tile // columns
+            x, y = left + column * tile_size, upper + row * tile_size
+            out.append((
+                column,
+                row,
+                (x, y, min(x + tile_size, right), min(y + tile_size, lower)),
+                voxel_indexes
+            ))
+
+        return out
+
+    def iter_multipart_tiles(self, dir, bloxels, tile_size=256, index=None,
+        jobs=1):
+        """
+        Lazily draws the tiles of a model of any size (see
+        `get_multipart_tiles`), so that only one tile is held at a time.
+
+        With more than one job, tiles are drawn by a pool of worker
+        processes, each receiving only the visible voxels of its tile. Only a
+        few tiles per worker are in flight at once.
+
+        Args:
+            dir(Direction): the direction to rotate to
+            bloxels(list): the voxels (see `get_voxels`)
+            tile_size(int): the width and height of every tile
+            index(VoxelIndex): the index of the voxels, if already built
+            jobs(int): the number of processes to draw tiles with
+
+        Return:
+            A generator of (column, row, box, image) tuples for every tile
+            that any visible voxel overlaps, in order.
+        """
+        voxels = Iso.get_voxels(bloxels)
+        shown, depths, hidden = self.cull_voxels(dir, voxels, index)
+        tiles = (
+            (column, row, box, (
+                dir, voxels[indexes], box, depths[indexes], hidden[indexes]
+            ))
+            for column, row, box, indexes in self.get_multipart_tiles(
+                dir, voxels, tile_size, shown
+            )
+        )
+
+        if jobs <= 1:
+            for column, row, box, args in tiles:
+                yield column, row, box, Image.fromarray(
+                    self.draw_voxels(*args)
+                )
+            return
+
+        with multiprocessing.Pool(jobs) as pool:
+            pending = collections.deque()
+
+            for tile in itertools.chain(tiles, [None]):
+                if tile is not None:
+                    *position, args = tile
+                    pending.append((position, pool.apply_async(
+                        Iso.draw_tile, (self.coors.tile_size, *args)
+                    )))
+
+                # Wait for the oldest tile once enough are in flight
+                while pending and (tile is None or len(pending) >= jobs * 2):
+                    position, result = pending.popleft()
+                    yield (*position, Image.fromarray(result.get()))
+
+    @staticmethod
+    def draw_tile(tile_width, dir, voxels, box, depths, hidden):
+        """
+        Draws a tile of a multipart bloxel in a worker process, reusing the
+        renderer of the process for every tile.
+
+        Args:
+            tile_width(int): the assumed tile width of the renderer
+            dir(Direction): the direction to rotate to
+            voxels(ndarray): array of the VOXEL overlapping the tile
+            box(tuple): the area of the tile
+            depths(ndarray): the depth of each voxel in the whole bloxel
+            hidden(ndarray): the hidden parts of each voxel
+        """
+        if tile_width not in Iso.renderers:
+            Iso.renderers[tile_width] = Iso(tile_width)
+
+        return Iso.renderers[tile_width].draw_voxels(
+            dir, voxels, box, depths, hidden
+        )
+
+    def get_multipart_image(self, dir, bloxels, tile_size=256, index=None):
+        """
+        Return the isometric image of a model of any size, stitched together
+        from its tiles.
+
+        Args:
+            dir(Direction): the direction to rotate to
+            bloxels(list): the voxels (see `get_voxels`)
+            tile_size(int): the width and height of the tiles drawn
+            index(VoxelIndex): the index of the voxels, if already built
+
+        Return:
+            An Image covering every voxel of the model, whose upper-left
+            corner is at the upper-left of `get_multipart_bounds`.
+        """
+        voxels = Iso.get_voxels(bloxels)
+        bounds = self.get_multipart_bounds(dir, voxels)
+        if bounds is None:
+            return Image.new('RGBA', (0, 0))
+
+        left, upper, right, lower = bounds
+        image = Image.new('RGBA', (right - left, lower - upper))
+        for column, row, box, tile in self.iter_multipart_tiles(
+            dir, voxels, tile_size, index
+        ):
+            image.paste(tile, (box[0] - left, box[1] - upper))
+
+        return image
+
     def determine_visible_sides(self, dir, up, down, left, right, front, back):
         """
         Meant to save ALOT of time in deciding which of the given textures are
@@ -704,6 +2072,59 @@ class Iso:
         else:
             raise Exception(f'Invalid direction supplied: {dir}')
 
+    def get_render_keys(self, dirs, up, down, left, right, front, back):
+        """
+        Returns the render cache keys for the scalar bloxels of the given
+        textures in each of the given directions.
+
+        The keys cover everything that affects the saved file: the pixels of
+        every side, the direction, the shading constants, the tile size, the
+        version of the renderer and the encoder.
+
+        Args:
+            dirs(list): the directions the bloxel is drawn in
+            up(Texture): the texture to use for drawing this side
+            down(Texture): the texture to use for drawing this side
+            left(Texture): the texture to use for drawing this side
+            right(Texture): the texture to use for drawing this side
+            front(Texture): the texture to use for drawing this side
+            back(Texture): the texture to use for drawing this side
+
+        Return:
+            A list with the key for each direction in the order given.
+        """
+        tex = Iso.TEX_WIDTH
+        hashes = [
+            Texture.of(side).crop((0, 0, tex, tex)).hash
+            for side in (up, down, left, right, front, back)
+        ]
+
+        return [
+            RenderCache.key(
+                Iso.RENDER_VERSION,
+                dir,
+                self.coors.tile_size,
+                Shade.SHADE,
+                Shade.MULTIPLYER,
+                Shade.SIDE_SHADING,
+                self.encoder,
+                *hashes
+            )
+            for dir in dirs
+        ]
+
+    def get_filename(self, dir, blockname, path):
+        """
+        Returns the filename a bloxel is saved with.
+
+        Args:
+            dir(Direction): the direction to tag the image with
+            blockname(str): the name of the generated block
+            path(Path): the path (not file) to save the texture
+        """
+        extension = self.encoder.EXTENSION
+        return Path(path) / f'Bloxel-{blockname}-{"NESW"[dir]}{extension}'
+
     def save(self, texture, dir, blockname, path):
         """
         Saves a texture with a filename constructed from the given parts.
@@ -713,8 +2134,13 @@ class Iso:
             dir(Direction): the direction to tag the image with
             blockname(str): the name of the generated block
             path(Path): the path (not file) to save the texture
+
+        Return:
+            The filename the texture was saved as.
         """
-        texture.save(str(path / f'Bloxel-{blockname}-{"NESW"[dir]}.png'))
+        filename = self.get_filename(dir, blockname, path)
+        self.encoder.save(texture, filename)
+        return filename
 
 
 class Directions:
@@ -755,374 +2181,1280 @@ class Cornerstone:
     Since this is to process a request for a cornerstone, it is not necessary
     to handle the back sides or the bottom. Even when the cornerstone is
     transparent, the primitive is the cornerstone itself, not the back sides.
+
+    Every cornerstone has the same shape, so each part is a fixed mask of the
+    side (see `Sides`) each of its pixels belongs to, or -1 where it is clear.
+    Drawing a cornerstone of a color only fills the mask with the shaded
+    colors of its sides.
+
+    Attributes:
+        MASKS: the mask of the whole cornerstone (Sides.ALL) and of each of
+            its visible sides.
     """
+    MASKS = {
+        Sides.ALL: np.array([
+            [-1, 2, 2, -1],
+            [0, 2, 2, 1],
+            [0, 0, 1, 1],
+            [-1, 0, 1, -1],
+        ]),
+        Sides.LEFT: np.array([
+            [0, -1],
+            [0, 0],
+            [-1, 0],
+        ]),
+        Sides.RIGHT: np.array([
+            [-1, 1],
+            [1, 1],
+            [1, -1],
+        ]),
+        Sides.TOP: np.array([
+            [2, 2],
+            [2, 2],
+        ]),
+    }
+
+    @staticmethod
+    def draw(side, color, dir):
+        """
+        Returns a part of a cornerstone filled with the given color.
+
+        Args:
+            side(Sides): the part of the cornerstone to draw
+            color(tuple): the color to tint the resulting cornerstone image
+            dir(Directions): the direction to use for shading calculations
+
+        Return:
+            Cornerstone image with pixels shaded for the given direction.
+        """
+        mask = Cornerstone.MASKS[side]
+        shaded = Shade.shade_colors([color], Shade.get_levels(dir))[0]
+        pixels = np.where(
+            mask[..., None] >= 0, shaded[np.maximum(mask, 0)], 0
+        )
+        return Image.fromarray(pixels.astype(np.uint8), 'RGBA')
+
+    @staticmethod
+    @cached(max_size=4096)
+    def get(color=(255, 255, 255, 255), dir=Directions.NORTH):
+        """
+        Returns a cornerstone using a given color and direction.
+        . T T .
+        L T T R
+        L L R R
+        . L R .
+
+        Args:
+            color(tuple): the color to tint the resulting cornerstone image
+            dir(Directions): the direction to use for shading calculations
+
+        Return:
+            Cornerstone image with pixels shaded for the given direction.
+        """
+        return Cornerstone.draw(Sides.ALL, color, dir)
+
+    @staticmethod
+    @cached(max_size=4096)
+    def get_left(color=(255, 255, 255, 255), dir=Directions.NORTH):
+        """
+        Returns the left side of a cornerstone using a given color/direction.
+        . . . .
+        # . . .
+        # # . .
+        . # . .
+
+        Remember to add 1 to y when drawing.
+
+        Args:
+            color(tuple): the color to tint the resulting cornerstone image
+            dir(Directions): the direction to use for shading calculations
+
+        Return:
+            Cornerstone image with pixels shaded for the given direction.
+        """
+        return Cornerstone.draw(Sides.LEFT, color, dir)
+
+    @staticmethod
+    @cached(max_size=4096)
+    def get_right(color=(255, 255, 255, 255), dir=Directions.NORTH):
+        """
+        Returns the right side of a cornerstone using a given color/direction.
+        . . . .
+        . . . #
+        . . # #
+        . . # .
+
+        Remember to add 2 to X and 1 to Y when drawing.
+
+        Args:
+            color(tuple): the color to tint the resulting cornerstone image
+            dir(Directions): the direction to use for shading calculations
+
+        Return:
+            Cornerstone image with pixels shaded for the given direction.
+        """
+        return Cornerstone.draw(Sides.RIGHT, color, dir)
+
+    @staticmethod
+    @cached(max_size=4096)
+    def get_top(color=(255, 255, 255, 255), dir=Directions.NORTH):
+        """
+        Returns the top side of a cornerstone using the given color/direction.
+        . # # .
+        . # # .
+        . . . .
+        . . . .
+
+        Remember, when drawing, to add 1 to X.
+
+        Args:
+            color(tuple): the color to tint the resulting cornerstone image
+            dir(Directions): the direction to use for shading calculations
+
+        Return:
+            Cornerstone image with pixels shaded for the given direction.
+        """
+        return Cornerstone.draw(Sides.TOP, color, dir)
+
+
+class Shade:
+    """
+    The shading class, given enough firepower from Rust, could gain feasibility
+    for a real time lighting engine. This was initially the plan, but it was
+    only supposed to be backed upon chunk load. This could revolutionize the
+    engine if rust is able to do this fast enough.
+
+    Sides:
+        U = Up
+        D = Down
+        L = Left
+        R = Right
+        F = Front
+        B = Bottom
+
+    Colors:
+        R = Red
+        B = Blue
+        O = Orange
+        G = Green
+        Y = Yellow
+        P = Purple
+
+    Side Ordering:                         U D L R F B
+    Color Ordering (Per given side order): R B O G Y P
+
+    Coloring per side per direction:
+
+          N      E      S      W
+        --------------------------
+        \ R /  \ R /  \ R /  \ R /
+        O | P  P | G  G | Y  Y | O
+        --------------------------
+
+    Shading levels per side per direction:
+
+          N      E      S      W
+        --------------------------
+        \ 1 /  \ 1 /  \ 1 /  \ 1 /
+        1 | 2  2 | 3  3 | 2  2 | 1
+        --------------------------
+
+    Attributes:
+        WHITE: A 4-tuple used to create a shaded cornerstone.
+        SHADE: The number of levels to decrease each side's colors by.
+        MULTIPLYER: The number to multiply each side's shade by. This keeps the
+            shade level of each side (see next) normalized rather than the
+            actual shading value per side.
+        SIDE_SHADING: A tuple containing the shade levels for: (up, down, left,
+            right, front, back)
+    """
+    WHITE = 255, 255, 255, 255
+    SHADE = 15
+    MULTIPLYER = 1
+    SIDE_SHADING = (0, 4, 1, 3, 2, 2)
+
+    # The bloxel sides seen on the left and right of a cornerstone
+    VISIBLE = {
+        Directions.NORTH: (BloxelSides.left, BloxelSides.back),
+        Directions.EAST: (BloxelSides.back, BloxelSides.right),
+        Directions.SOUTH: (BloxelSides.right, BloxelSides.front),
+        Directions.WEST: (BloxelSides.front, BloxelSides.left),
+    }
+
+    @staticmethod
+    @cached(max_size=64)
+    def get_shade(bloxel_side):
+        """
+        Args:
+            dir(int): the direction obtained from `Directions`
+            bloxel_side(int): the side number obtained from `BloxelSides`
+        """
+        return darken(
+            Shade.WHITE,
+            Shade.SHADE * Shade.SIDE_SHADING[bloxel_side] * Shade.MULTIPLYER
+        )
+
+    @staticmethod
+    def get_levels(dir):
+        """
+        Returns the gray levels (0-255) the left, right and top sides of a
+        cornerstone are tinted with in the given direction, in `Sides` order.
+
+        Args:
+            dir(Directions): the direction used in shading calculations
+        """
+        left, right = Shade.VISIBLE[dir]
+        return np.array([
+            Shade.get_shade(left)[0],
+            Shade.get_shade(right)[0],
+            Shade.get_shade(BloxelSides.up)[0],
+        ], dtype=np.uint16)
+
+    @staticmethod
+    def shade_colors(colors, levels):
+        """
+        Tints every color with every gray level the same way `tint_image`
+        tints a cornerstone.
+
+        Args:
+            colors(ndarray): (N, 3) or (N, 4) RGB or RGBA colors. RGB colors
+                are fully opaque.
+            levels(ndarray): (M,) gray levels (0-255)
+
+        Return:
+            The (N, M, 4) uint8 RGBA shaded colors.
+        """
+        colors = np.asarray(colors, dtype=np.uint8).reshape(
+            -1, np.shape(colors)[-1]
+        )
+        levels = np.asarray(levels, dtype=np.uint16)
+        out = np.empty((len(colors), len(levels), 4), dtype=np.uint8)
+
+        # For x <= 255 * 255, x // 255 == (x + 1 + (x >> 8)) >> 8
+        shaded = colors[:, None, :3] * levels[None, :, None]
+        shaded += 1 + (shaded >> 8)
+        shaded >>= 8
+        out[..., :3] = shaded
+        out[..., 3] = colors[:, None, 3] if colors.shape[1] > 3 else 255
+        return out
+
+    @staticmethod
+    def shade_palette(colors):
+        """
+        Shades every color for every side of a cornerstone in every direction
+        at once.
+
+        Args:
+            colors(ndarray): (N, 3) or (N, 4) RGB or RGBA colors, for instance
+                the palette of a texture
+
+        Return:
+            The (N, 4, 3, 4) uint8 RGBA colors of each color in each direction
+            for the left, right and top sides (in `Sides` order).
+        """
+        levels = np.concatenate([
+            Shade.get_levels(dir) for dir in Directions.ALL
+        ])
+        shaded = Shade.shade_colors(colors, levels)
+        return shaded.reshape(len(shaded), len(Directions.ALL), 3, 4)
+
+
+class ColorTable:
+    """
+    Incrementally stores cornerstones of each requested color and specified
+    direction so that future queries will be faster.
+
+    The shape of a cornerstone is the same for every color (see
+    `Cornerstone.MASKS`), so for each color only the RGBA result of shading it
+    for each side in the shape is stored, in packed arrays sorted by the color
+    packed as a 32-bit integer. Whole arrays of colors can therefore be looked
+    up (and added) at once.
+
+    The colors of a direction are forgotten all at once when adding more would
+    grow the table past `max_colors` for that direction, keeping only the
+    colors being looked up. Lookups of more colors than that are split into
+    parts, so the limit holds for any query.
+
+    Attributes:
+        MAX_COLORS: the default limit of colors stored per direction.
+        side: the side to prefer when caching and returning new cornerstone
+            images.
+        max_colors: the most colors stored per direction.
+        sides: the sides (see `Sides`) drawn by the preferred side.
+        index: the (height, width) array of the position in `sides` of the
+            side drawn by each pixel of the cornerstone, or -1 where clear.
+        keys: for each direction, the sorted packed RGBA colors in the table.
+        values: for each direction, the (len(keys), len(sides)) packed RGBA
+            colors of each side for every color.
+        hits: the number of colors looked up that were in the table.
+        misses: the number of colors looked up that were added.
+        evictions: the number of colors forgotten to stay within the limit.
+    """
+    MAX_COLORS = 2 ** 20
+
+    def __init__(self, side=Sides.ALL, max_colors=MAX_COLORS):
+        """
+        Initializes ColorTable with a preferred side.
+
+        Args:
+            side(Sides): the side to prefer
+            max_colors(int): the most colors to store per direction
+        """
+        self.side = side
+        self.max_colors = max_colors
+        self.hits = self.misses = self.evictions = 0
+        mask = Cornerstone.MASKS[side]
+        self.sides = np.unique(mask[mask >= 0])
+        self.index = np.where(mask >= 0, np.searchsorted(self.sides, mask), -1)
+        self.keys = dict()
+        self.values = dict()
+        Cache.register(self)
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.keys.values())
+
+    def stats(self):
+        """
+        Returns the name, limits, current size and counters of the table in
+        the same form as `Cache.stats`. The size counts the colors of every
+        direction while the limit applies to each direction.
+        """
+        side = ('LEFT', 'RIGHT', 'TOP', 'ALL')[self.side]
+        return {
+            'name': f'ColorTable.{side}',
+            'size': len(self),
+            'bytes': sum(
+                keys.nbytes + self.values[dir].nbytes
+                for dir, keys in self.keys.items()
+            ),
+            'max_size': self.max_colors,
+            'max_bytes': None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        """
+        Forgets every color of every direction. The counters are kept.
+        """
+        self.keys.clear()
+        self.values.clear()
+
+    @staticmethod
+    def pack(colors):
+        """
+        Returns colors packed as 32-bit integers.
+
+        Args:
+            colors(ndarray): (..., 3) or (..., 4) RGB or RGBA colors. RGB
+                colors are fully opaque.
+
+        Return:
+            A flat uint32 array with the packed RGBA bytes of each color.
+        """
+        colors = np.asarray(colors, dtype=np.uint8)
+        if colors.shape[-1] == 3:
+            alpha = np.full(colors.shape[:-1] + (1,), 255, dtype=np.uint8)
+            colors = np.concatenate([colors, alpha], axis=-1)
+
+        return np.ascontiguousarray(colors).reshape(-1, 4).view(np.uint32)[
+            :, 0
+        ]
+
+    def lookup(self, colors, direction):
+        """
+        Retrieves the shaded colors of many colors at once, adding the colors
+        that are not in the table yet.
+
+        Args:
+            colors(ndarray): (N,) packed RGBA colors (see `pack`)
+            direction(Directions): the direction used in shading calculations
+
+        Return:
+            The (N, len(sides)) packed RGBA colors of each side of each color.
+        """
+        colors = np.asarray(colors, dtype=np.uint32).reshape(-1)
+
+        # Every part then has few enough colors to fit after starting over
+        if len(colors) > self.max_colors:
+            return np.concatenate([
+                self.lookup(colors[start:start + self.max_colors], direction)
+                for start in range(0, len(colors), self.max_colors)
+            ])
+
+        keys = self.keys.get(direction, np.empty(0, dtype=np.uint32))
+        values = self.values.get(
+            direction, np.empty((0, len(self.sides)), dtype=np.uint32)
+        )
+
+        found = np.searchsorted(keys, colors)
+        hit = found < len(keys)
+        hit[hit] = keys[found[hit]] == colors[hit]
+        hits = int(np.count_nonzero(hit))
+        self.hits += hits
+        self.misses += len(colors) - hits
+
+        if hits < len(colors):
+            new = np.sort(colors[~hit])
+            new = new[np.concatenate([[True], new[1:] != new[:-1]])]
+
+            # Start over rather than grow past the limit
+            if len(keys) + len(new) > self.max_colors:
+                self.evictions += len(keys)
+                keys, values = keys[:0], values[:0]
+                new = np.sort(colors)
+                new = new[np.concatenate([[True], new[1:] != new[:-1]])]
+
+            levels = Shade.get_levels(direction)[self.sides]
+            shaded = Shade.shade_colors(new.view(np.uint8).reshape(-1, 4),
+                levels)
+
+            at = np.searchsorted(keys, new)
+            keys = np.insert(keys, at, new)
+            values = np.insert(
+                values, at, shaded.view(np.uint32)[..., 0], axis=0
+            )
+            self.keys[direction], self.values[direction] = keys, values
+            found = np.searchsorted(keys, colors)
+
+        return values[found]
+
+    def get_sprites(self, colors, direction):
+        """
+        Returns the cornerstone (or side of one) of many colors at once.
+
+        Args:
+            colors(ndarray): (N,) packed RGBA colors (see `pack`)
+            direction(Directions): the direction used in shading calculations
+
+        Return:
+            The (N, height, width, 4) uint8 RGBA cornerstones.
+        """
+        values = self.lookup(colors, direction)
+        index = self.index
+        sprites = np.where(index >= 0, values[:, np.maximum(index, 0)], 0)
+        sprites = np.ascontiguousarray(sprites, dtype=np.uint32)
+        return sprites.view(np.uint8).reshape(sprites.shape + (4,))
+
+    def get(self, color, direction):
+        """
+        Retrieves a cornerstone's side with the proper shading or the entire
+        cornerstone if every side is specified.
+
+        If the color does not reside within the color table, it is created and
+        cached.
+
+        Args:
+            color(tuple): either an RGB or RGBA color tuple
+            direction(Directions): the direction used in shading calculations
+        """
+        sprite = self.get_sprites(self.pack(color), direction)[0]
+        return Image.fromarray(sprite)
+
+
+class IsoCoors:
+    """
+    Instead of calculating isometric screen coordinates each time, either:
+     * Calculate them all once and then cache them
+     * Calculate them as needed and then hope some overlap
+     * Project whole arrays of coordinates at once with `project`
+
+    The renderer draws every face of a bloxel from the same 16x16 layout of
+    coordinates, so the projection of each face layout (see `FACES`) is
+    computed once per direction by `get_face`.
+
+    Attributes:
+        MAX_SIZE: the most coordinates cached by each generator.
+        FACES: the name of every face layout the renderer draws.
+        coors: the bounded cache of computed coordinates.
+        faces: the projected grid of each face layout and direction.
+        tile_size: the assumed tile size.
+    """
+    MAX_SIZE = 65536
+    FACES = ('top', 'back_top', 'back_right', 'back_left', 'right', 'left')
+
+    def __init__(self, tile_size, max_size=MAX_SIZE):
+        """
+        Initializes the coordinate generator assuming the given tile size.
+
+        Args:
+            tile_size(int): the assumed tile size
+            max_size(int): the most coordinates to cache
+        """
+        self.coors = Cache('IsoCoors', max_size)
+        self.faces = dict()
+        self.tile_size = tile_size
+
+    def __getitem__(self, xyz):
+        """
+        Convenience method to retrieve isometric screen coordinates.
+
+        Args:
+            xyz(tuple): the key used to obtain coordinates from the coors cache
+        """
+        return self.coors.lookup(xyz, self.__get_pos_from_vec3, *xyz)
+
+    def get(self, x, y, z):
+        """
+        Retrieve isometric screen coodinates from the given 3D coordinates.
+
+        Args:
+            x(int): the integer value of the given coordinate axis
+            y(int): the integer value of the given coordinate axis
+            z(int): the integer value of the given coordinate axis
+
+        Return:
+            A 2-tuple with the x and y coordinate in isometric screenspace.
+        """
+        return self[(x, y, z)]
+
+    def project(self, x, y, z):
+        """
+        Projects whole arrays of 3D coordinates of any range at once, giving
+        exactly the coordinates `get` gives for each point.
+
+        Args:
+            x(ndarray): the integer values of the given coordinate axis
+            y(ndarray): the integer values of the given coordinate axis
+            z(ndarray): the integer values of the given coordinate axis
+
+        Return:
+            A 2-tuple with the int64 arrays of the x and y coordinates in
+            isometric screenspace, broadcast together.
+        """
+        x, y, z = np.broadcast_arrays(
+            *(np.asarray(axis, dtype=np.int64) for axis in (x, y, z))
+        )
+        p25 = self.tile_size * 0.25
+        p50 = self.tile_size * 0.50
+        isox = x * p50 + y * p50
+        isoy = -x * p25 + y * p25 - z * p50
+
+        # Converting to integers truncates toward zero just like `int`
+        return isox.astype(np.int64), isoy.astype(np.int64)
+
+    @staticmethod
+    def get_face_coordinates(face, dir, x_pixel, y_pixel):
+        """
+        Returns the 3D coordinates the texels of a face layout are drawn at.
+
+        Args:
+            face(str): one of the names in FACES
+            dir(Directions): the direction the bloxel is drawn in
+            x_pixel(ndarray): the x coordinates of the texels in the face
+            y_pixel(ndarray): the y coordinates of the texels in the face
+
+        Return:
+            A 3-tuple with the x, y and z coordinates.
+        """
+        tex = Iso.TEX_WIDTH
+
+        if face in ('top', 'back_top'):
+            z = -8 if face == 'top' else -23
+
+            if dir == Directions.NORTH:
+                return x_pixel, y_pixel, z
+            elif dir == Directions.EAST:
+                return y_pixel, x_pixel, z
+            elif dir == Directions.SOUTH:
+                return tex - x_pixel - 1, tex - y_pixel - 1, z
+            else: # West
+                return tex - y_pixel - 1, tex - x_pixel - 1, z
+
+        elif face == 'back_right':
+            return 16, tex - x_pixel - 1, tex - y_pixel - 24
+
+        elif face == 'back_left':
+            return tex - x_pixel, 0, tex - y_pixel - 1
+
+        elif face == 'right':
+            return 16 + x_pixel, 0, -tex - 7 - y_pixel
+
+        elif face == 'left':
+            return 0, x_pixel, tex - y_pixel - 1
+
+        raise Exception(
+            f'Invalid face supplied: {face}. Expected one of: '
+            f'{", ".join(IsoCoors.FACES)}'
+        )
+
+    def get_face(self, face, dir=Directions.NORTH):
+        """
+        Returns the projected coordinates of every texel of a face layout,
+        computing them the first time they are requested.
+
+        Args:
+            face(str): one of the names in FACES
+            dir(Directions): the direction the bloxel is drawn in
+
+        Return:
+            A 2-tuple with the read-only (TEX_WIDTH, TEX_WIDTH) arrays of the
+            x and y coordinates of the texel at [x_pixel, y_pixel].
+        """
+        if (face, dir) not in self.faces:
+            tex = Iso.TEX_WIDTH
+            x_pixel, y_pixel = np.meshgrid(
+                np.arange(tex), np.arange(tex), indexing='ij'
+            )
+            grid = self.project(
+                *self.get_face_coordinates(face, dir, x_pixel, y_pixel)
+            )
+            for axis in grid:
+                axis.flags.writeable = False
+            self.faces[face, dir] = grid
+
+        return self.faces[face, dir]
+
+    def seed_coordinates(self, grid=16, start=0):
+        """
+        Calculates every isometric screen coodinate for a given grid size.
+
+        Vastly faster if used on a large enough dataset. Overwrites any
+        previously computed values. Only the most recent coordinates are kept
+        if the grid holds more than the cache does.
+
+        Args:
+            grid(int): the cubic size of the grid (grid ** 3)
+            start(int): the lowest coordinate of every axis of the grid
+        """
+        axis = np.arange(start, start + grid)
+        x, y, z = np.meshgrid(axis, axis, axis, indexing='ij')
+        isox, isoy = self.project(x, y, z)
+
+        points = zip(
+            x.ravel().tolist(), y.ravel().tolist(), z.ravel().tolist()
+        )
+        for xyz, ixy in zip(
+            points, zip(isox.ravel().tolist(), isoy.ravel().tolist())
+        ):
+            self.coors.put(xyz, ixy)
+
+    def __get_pos_from_vec3(self, x, y, z):
+        """
+        Gets 2D screen coordinates from a vector3.
+
+        Args:
+            x(int): the integer value of the given coordinate axis
+            y(int): the integer value of the given coordinate axis
+            z(int): the integer value of the given coordinate axis
+
+        Return:
+            A 2-tuple with the x and y coordinate in isometric screenspace.
+        """ 
+        p25 = self.tile_size * 0.25
+        p50 = self.tile_size * 0.50
+        isox = x * p50 + y * p50
+        isoy = -x * p25 + y * p25 - z * p50
+        return int(isox), int(isoy)
+
+
+class RenderPlan:
+    """
+    The complete mapping from the texels of a scalar bloxel's six sides to the
+    canvas pixels they are drawn onto.
+
+    The geometry of a scalar bloxel never changes for a given direction, so
+    instead of walking every texel and drawing a cornerstone for each one on
+    every render, the draw operations are recorded once into flat index
+    arrays. Rendering a bloxel then only requires a gather from the sides, a
+    shade multiply and a scatter onto the canvas.
+
+    Attributes:
+        texels: the flat index (side * TEX_WIDTH ** 2 + y * TEX_WIDTH + x) of
+            the texel read for each drawn cornerstone part.
+        shades: the gray level (0-255) each of those texels is tinted with.
+        draws: the index into `texels` of the color drawn onto each pixel.
+        pixels: the flat canvas index (y * CANVAS_WIDTH + x) of each pixel
+            drawn.
+        layers: a list of slices into `draws` and `pixels`. No pixel appears
+            twice within a layer and layers must be blended in order.
+        opaque: whether the plan assumes every texel is fully opaque, in
+            which case each pixel is drawn exactly once.
+    """
+
+    @staticmethod
+    @cached(max_size=64)
+    def get(dir, draw_all_sides, tile_size):
+        """
+        Returns the plan for the given direction and tile size, compiling it
+        the first time it is requested.
+
+        Args:
+            dir(Directions): the direction the bloxel is drawn in
+            draw_all_sides(bool): whether the back sides are drawn as well
+            tile_size(int): the tile size of the isometric coordinates
+        """
+        return RenderPlan(dir, draw_all_sides, IsoCoors(tile_size))
+
+    def __init__(self, dir, draw_all_sides, coors):
+        """
+        Compiles the plan by replaying every draw of a scalar bloxel.
+
+        Args:
+            dir(Directions): the direction the bloxel is drawn in
+            draw_all_sides(bool): whether the back sides are drawn as well
+            coors(IsoCoors): the isometric coordinate generator
+        """
+        tex = Iso.TEX_WIDTH
+        width = Iso.CANVAS_WIDTH
+        up, down, left, right, front, back = Iso.rotate_sides(dir, *range(6))
+
+        self.opaque = not draw_all_sides
+
+        # Only the opaque pixels of each cornerstone part are ever drawn
+        pieces = dict()
+        for side, get_piece in (
+            (Sides.TOP, Cornerstone.get_top),
+            (Sides.LEFT, Cornerstone.get_left),
+            (Sides.RIGHT, Cornerstone.get_right)
+        ):
+            piece = get_piece(Shade.WHITE, dir)
+            pieces[side] = [
+                (x, y, piece.getpixel((x, y))[0])
+                for y in range(piece.height)
+                for x in range(piece.width)
+                if piece.getpixel((x, y))[3] > 0
+            ]
+
+        texels = []
+        ops = []
+
+        def record(side, x_pixel, y_pixel, piece, x, y):
+            for x_piece, y_piece, shade in pieces[piece]:
+                new_x, new_y = x + x_piece, y + y_piece
+                if 0 <= new_x < width and 0 <= new_y < width:
+                    ops.append((len(texels), new_y * width + new_x))
+            texels.append((side * tex * tex + y_pixel * tex + x_pixel, shade))
+
+        coordinates = [(x, y) for x in range(tex) for y in range(tex)]
+
+        def record_face(face, side, piece, x_offset, y_offset):
+            xs, ys = coors.get_face(face, dir)
+            for (x_pixel, y_pixel), x, y in zip(
+                coordinates, xs.ravel().tolist(), ys.ravel().tolist()
+            ):
+                record(
+                    side, x_pixel, y_pixel, piece, x + x_offset, y + y_offset
+                )
+
+        if draw_all_sides:
+            # Draw the back top side
+            record_face('back_top', down, Sides.TOP, 1, 1)
+
+            # Draw back right side
+            record_face('back_right', right, Sides.LEFT, 0, 0)
+
+            # Draw back left side
+            record_face('back_left', front, Sides.RIGHT, -2, 46)
+
+        # Draw right side
+        record_face('right', back, Sides.RIGHT, 0, 1)
+
+        # Draw left side
+        record_face('left', left, Sides.LEFT, 0, 46)
+
+        # Draw top side
+        record_face('top', up, Sides.TOP, 1, -1)
+
+        # Opaque sides simply overwrite each other, so only the last draw of
+        # each pixel matters
+        if not draw_all_sides:
+            ops = list({op[1]: op for op in ops}.values())
+
+        ops = np.array(ops, dtype=np.int64).reshape(-1, 2)
+        texels = np.array(texels, dtype=np.int64).reshape(-1, 2)
+
+        # Drop the texels that ended up completely hidden
+        used, ops[:, 0] = np.unique(ops[:, 0], return_inverse=True)
+        self.texels = texels[used, 0]
+        self.shades = texels[used, 1].astype(np.uint16)
+
+        # Store the draws layer by layer so that each layer is a plain slice
+        order = layers(ops[:, 1])
+        ops = ops[np.concatenate(order)] if order else ops
+        self.draws = ops[:, 0]
+        self.pixels = ops[:, 1]
+
+        self.layers = []
+        start = 0
+        for layer in order:
+            self.layers.append(slice(start, start + len(layer)))
+            start += len(layer)
+
+    def render(self, sides):
+        """
+        Return a bloxel texture drawn from the supplied textures.
+
+        Args:
+            sides(list): the up, down, left, right, front and back textures
+
+        Return:
+            A new RGBA Image containing the bloxel.
+        """
+        sides = np.stack([texture_array(side) for side in sides])
+        return Image.fromarray(self.render_batch(sides[None])[0])
+
+    def render_batch(self, sides, out=None):
+        """
+        Draws a whole batch of bloxels at once.
+
+        Args:
+            sides(ndarray): (N, 6, TEX_WIDTH, TEX_WIDTH, 4) uint8 RGBA sides
+                in up, down, left, right, front and back order
+            out(ndarray): optional (N, CANVAS_WIDTH, CANVAS_WIDTH, 4) uint8
+                array to draw the bloxels into
+
+        Return:
+            The (N, CANVAS_WIDTH, CANVAS_WIDTH, 4) array of bloxels.
+        """
+        width = Iso.CANVAS_WIDTH
+        count = len(sides)
+
+        if out is None:
+            out = np.empty((count, width, width, 4), dtype=np.uint8)
+
+        # Gather whole RGBA texels at once by viewing them as 32-bit integers
+        sides = np.ascontiguousarray(sides).reshape(count, -1)
+        texels = np.take(sides.view(np.uint32), self.texels, axis=1)
+        texels = texels.view(np.uint8).reshape(count, -1, 4)
+
+        # Tint each texel the same way `tint_image` does. For x <= 255 * 255,
+        # x // 255 == (x + 1 + (x >> 8)) >> 8.
+        shaded = texels[..., :3] * self.shades[:, None]
+        shaded += 1 + (shaded >> 8)
+        shaded >>= 8
+        texels[..., :3] = shaded
+
+        out[:] = 0
+
+        # Opaque texels replace whatever is underneath them
+        if self.opaque:
+            packed = texels.view(np.uint32)[..., 0]
+            colors = np.take(packed, self.draws, axis=1)
+            # `out` may be a strided slice of a larger batch, but each of its
+            # canvases is contiguous and can be viewed as 32-bit pixels
+            for canvas, color in zip(out, colors):
+                canvas.view(np.uint32).reshape(-1)[self.pixels] = color
+        else:
+            draw(out, self.pixels, texels[:, self.draws], order=self.layers)
+
+        return out
+
+
+class Scene:
+    """
+    A structure of blocks composed from the scalar bloxel of every block.
+
+    Blocks sit on a grid where y is up, just like the voxels of multipart
+    bloxels, with every block as wide as a bloxel's texture. The sprite of a
+    block in a direction is only loaded (or rendered) once, however many
+    blocks use it. The image composed for every direction is kept, so that
+    changing blocks only redraws the areas of the chunks they are in.
+
+    Attributes:
+        CHUNK: the width, height and depth in blocks of every chunk.
+        iso: the renderer blocks are projected with.
+        load: returns the sprite Image of a block name in a direction.
+        sprites: the cache of the pixels of every sprite by name and
+            direction.
+        chunks: the name of every block by position, in chunks by chunk
+            position.
+        views: the bounds and pixels of the image composed for every
+            direction.
+        dirty: the chunks changed since each view was composed.
+    """
+    CHUNK = 16
+
+    def __init__(self, load, iso=None, max_sprites=1024):
+        """
+        Creates an empty scene.
+
+        Args:
+            load(callable): returns the sprite Image of a block name in a
+                direction, called as `load(name, dir)`
+            iso(Iso): the renderer to project blocks with, which must be the
+                one sprites are drawn for
+            max_sprites(int): the most sprites to keep in memory
+        """
+        self.iso = iso or Iso(4)
+        self.load = load
+        self.sprites = Cache('Scene.sprites', max_sprites)
+        self.chunks = dict()
+        self.views = dict()
+        self.dirty = dict()
+
+    def __len__(self):
+        return sum(len(blocks) for blocks in self.chunks.values())
+
+    def __contains__(self, xyz):
+        return self.get(*xyz) is not None
 
     @staticmethod
-    @lru_cache(maxsize=None)
-    def get(color=(255, 255, 255, 255), dir=Directions.NORTH):
+    def from_textures(textures, iso=None):
         """
-        Returns a cornerstone using a given color and direction.
-        . T T .
-        L T T R
-        L L R R
-        . L R .
+        Creates a scene rendering the sprite of every block from textures.
 
         Args:
-            color(tuple): the color to tint the resulting cornerstone image
-            dir(Directions): the direction to use for shading calculations
+            textures(dict): the up, down, left, right, front and back
+                textures (or images) of every block name
+            iso(Iso): the renderer to draw and project blocks with
 
         Return:
-            Cornerstone image with pixels shaded for the given direction.
+            An empty Scene.
         """
-        
-        if dir == Directions.NORTH:
-            clr_left = Shade.get_shade(BloxelSides.left)
-            clr_top = Shade.get_shade(BloxelSides.up)
-            clr_right = Shade.get_shade(BloxelSides.back)
-
-        elif dir == Directions.EAST:
-            clr_left = Shade.get_shade(BloxelSides.back)
-            clr_top = Shade.get_shade(BloxelSides.up)
-            clr_right = Shade.get_shade(BloxelSides.right)
-
-        elif dir == Directions.SOUTH:
-            clr_left = Shade.get_shade(BloxelSides.right)
-            clr_top = Shade.get_shade(BloxelSides.up)
-            clr_right = Shade.get_shade(BloxelSides.front)
-
-        elif dir == Directions.WEST:
-            clr_left = Shade.get_shade(BloxelSides.front)
-            clr_top = Shade.get_shade(BloxelSides.up)
-            clr_right = Shade.get_shade(BloxelSides.left)
-
-        img = Image.new('RGBA', (4, 4))
-
-        # Left Side
-        img.putpixel((0, 1), clr_left)
-        img.putpixel((0, 2), clr_left)
-        img.putpixel((1, 2), clr_left)
-        img.putpixel((1, 3), clr_left)
-
-        # Right Side
-        img.putpixel((3, 1), clr_right)
-        img.putpixel((3, 2), clr_right)
-        img.putpixel((2, 2), clr_right)
-        img.putpixel((2, 3), clr_right)
-
-        # Top
-        img.putpixel((1, 0), clr_top)
-        img.putpixel((2, 0), clr_top)
-        img.putpixel((1, 1), clr_top)
-        img.putpixel((2, 1), clr_top)
-        return tint_image(img, color)
+        iso = iso or Iso(4)
+        return Scene(
+            lambda name, dir: iso.get_scalar_bloxel(dir, *textures[name]),
+            iso
+        )
 
     @staticmethod
-    @lru_cache(maxsize=None)
-    def get_left(color=(255, 255, 255, 255), dir=Directions.NORTH):
+    def from_path(path, iso=None):
         """
-        Returns the left side of a cornerstone using a given color/direction.
-        . . . .
-        # . . .
-        # # . .
-        . # . .
-
-        Remember to add 1 to y when drawing.
+        Creates a scene loading the sprite of every block from the bloxels
+        previously saved in a path.
 
         Args:
-            color(tuple): the color to tint the resulting cornerstone image
-            dir(Directions): the direction to use for shading calculations
+            path(Path): the path (not file) the bloxels were saved in
+            iso(Iso): the renderer to project blocks with, whose encoder
+                gives the extension of the saved bloxels
 
         Return:
-            Cornerstone image with pixels shaded for the given direction.
+            An empty Scene.
         """
+        iso = iso or Iso(4)
+        return Scene(
+            lambda name, dir: Scene.read_sprite(
+                iso.get_filename(dir, name, path)
+            ),
+            iso
+        )
 
-        if dir == Directions.NORTH:
-            clr_left = Shade.get_shade(BloxelSides.left)
+    @staticmethod
+    def read_sprite(filename):
+        """
+        Reads a saved bloxel, decoding raw bloxels (see `RawEncoder`) too.
 
-        elif dir == Directions.EAST:
-            clr_left = Shade.get_shade(BloxelSides.back)
+        Args:
+            filename(Path): the file of the bloxel
 
-        elif dir == Directions.SOUTH:
-            clr_left = Shade.get_shade(BloxelSides.right)
+        Return:
+            The RGBA Image of the bloxel.
+        """
+        filename = Path(filename)
+        if not filename.exists():
+            raise Exception(f'Bloxel "{filename}" does not exist.')
 
-        elif dir == Directions.WEST:
-            clr_left = Shade.get_shade(BloxelSides.front)
+        if filename.suffix == RawEncoder.EXTENSION:
+            return RawEncoder.decode(filename.read_bytes())
 
-        img = Image.new('RGBA', (2, 3))
-        img.putpixel((0, 0), clr_left)
-        img.putpixel((0, 1), clr_left)
-        img.putpixel((1, 1), clr_left)
-        img.putpixel((1, 2), clr_left)
-        return tint_image(img, color)
+        with Image.open(filename) as image:
+            return image.convert('RGBA')
 
     @staticmethod
-    @lru_cache(maxsize=None)
-    def get_right(color=(255, 255, 255, 255), dir=Directions.NORTH):
+    def read_blocks(filename):
         """
-        Returns the right side of a cornerstone using a given color/direction.
-        . . . .
-        . . . #
-        . . # #
-        . . # .
+        Reads the blocks of a scene file.
 
-        Remember to add 2 to X and 1 to Y when drawing.
+        Scene files are JSON objects with a "grid" of block names indexed by
+        x, y and z, where empty positions are null, and/or a list of
+        "blocks" given as [x, y, z, name].
 
         Args:
-            color(tuple): the color to tint the resulting cornerstone image
-            dir(Directions): the direction to use for shading calculations
+            filename(str): the scene file to read
 
         Return:
-            Cornerstone image with pixels shaded for the given direction.
+            A dictionary of the name of every block by position.
         """
+        with open(filename) as file:
+            data = json.load(file)
 
-        if dir == Directions.NORTH:
-            clr_right = Shade.get_shade(BloxelSides.back)
-
-        elif dir == Directions.EAST:
-            clr_right = Shade.get_shade(BloxelSides.right)
-
-        elif dir == Directions.SOUTH:
-            clr_right = Shade.get_shade(BloxelSides.front)
-
-        elif dir == Directions.WEST:
-            clr_right = Shade.get_shade(BloxelSides.left)
+        blocks = Scene.get_grid_blocks(data.get('grid', []))
+        for x, y, z, name in data.get('blocks', []):
+            blocks[int(x), int(y), int(z)] = name
 
-        img = Image.new('RGBA', (2, 3))
-        img.putpixel((1, 0), clr_right)
-        img.putpixel((1, 1), clr_right)
-        img.putpixel((0, 1), clr_right)
-        img.putpixel((0, 2), clr_right)
-        return tint_image(img, color)
+        return blocks
 
     @staticmethod
-    @lru_cache(maxsize=None)
-    def get_top(color=(255, 255, 255, 255), dir=Directions.NORTH):
+    def get_grid_blocks(grid, origin=(0, 0, 0)):
         """
-        Returns the top side of a cornerstone using the given color/direction.
-        . # # .
-        . # # .
-        . . . .
-        . . . .
-
-        Remember, when drawing, to add 1 to X.
+        Returns the blocks of a 3D grid of block names.
 
         Args:
+            grid(list): nested lists (or an array) of names indexed by x, y
+                and z, where empty positions are None or ''
+            origin(tuple): the position of the first block of the grid
 
         Return:
-            Cornerstone image with pixels shaded for the given direction.
+            A dictionary of the name of every block by position.
         """
+        grid = np.array(grid, dtype=object)
+        if grid.size and grid.ndim != 3:
+            raise Exception(f'Scene grid has {grid.ndim} dimensions, not 3.')
 
-        if dir == Directions.NORTH:
-            clr_left, clr_top, clr_right = (240,) * 3, (255,) * 3, (225,) * 3
-
-        elif dir == Directions.EAST:
-            clr_left, clr_top, clr_right = (225,) * 3, (255,) * 3, (200,) * 3
+        return {
+            tuple(int(a + b) for a, b in zip(origin, xyz)): name
+            for xyz, name in np.ndenumerate(grid) if name
+        }
 
-        elif dir == Directions.SOUTH:
-            clr_left, clr_top, clr_right = (200,) * 3, (255,) * 3, (215,) * 3
+    @staticmethod
+    def get_chunk(x, y, z):
+        """
+        Returns the position of the chunk containing a block.
+        """
+        size = Scene.CHUNK
+        return x // size, y // size, z // size
 
-        elif dir == Directions.WEST:
-            clr_left, clr_top, clr_right = (215,) * 3, (255,) * 3, (240,) * 3
+    def get(self, x, y, z):
+        """
+        Returns the name of the block at a position, or None.
+        """
+        blocks = self.chunks.get(self.get_chunk(x, y, z), {})
+        return blocks.get((x, y, z))
 
-        clr_top   = (255, 255, 255)
-        img = Image.new('RGBA', (2, 2))
-        img.putpixel((0, 0), clr_top)
-        img.putpixel((1, 0), clr_top)
-        img.putpixel((0, 1), clr_top)
-        img.putpixel((1, 1), clr_top)
-        return tint_image(img, color)
+    def set(self, x, y, z, name):
+        """
+        Places a block, marking its chunk to be redrawn.
 
+        Args:
+            x(int): the position of the block
+            y(int): the position of the block, where y is up
+            z(int): the position of the block
+            name(str): the name of the block, or None to remove it
+        """
+        xyz = x, y, z
+        chunk = self.get_chunk(*xyz)
+        blocks = self.chunks.setdefault(chunk, {})
 
-class Shade:
-    """
-    The shading class, given enough firepower from Rust, could gain feasibility
-    for a real time lighting engine. This was initially the plan, but it was
-    only supposed to be backed upon chunk load. This could revolutionize the
-    engine if rust is able to do this fast enough.
+        if name:
+            blocks[xyz] = name
+        else:
+            blocks.pop(xyz, None)
+            if not blocks:
+                del self.chunks[chunk]
 
-    Sides:
-        U = Up
-        D = Down
-        L = Left
-        R = Right
-        F = Front
-        B = Bottom
+        for dirty in self.dirty.values():
+            dirty.add(chunk)
 
-    Colors:
-        R = Red
-        B = Blue
-        O = Orange
-        G = Green
-        Y = Yellow
-        P = Purple
+    def update(self, blocks):
+        """
+        Places many blocks at once.
 
-    Side Ordering:                         U D L R F B
-    Color Ordering (Per given side order): R B O G Y P
+        Args:
+            blocks(dict): the name of every block by position, where names
+                of None remove blocks
+        """
+        for xyz, name in blocks.items():
+            self.set(*xyz, name)
 
-    Coloring per side per direction:
+    def get_sprite(self, name, dir):
+        """
+        Returns the pixels of the sprite of a block, loading it only once.
 
-          N      E      S      W
-        --------------------------
-        \ R /  \ R /  \ R /  \ R /
-        O | P  P | G  G | Y  Y | O
-        --------------------------
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the sprite
 
-    Shading levels per side per direction:
+        Return:
+            The read-only (CANVAS_WIDTH, CANVAS_WIDTH, 4) uint8 pixels.
+        """
+        def load(name, dir):
+            pixels = np.array(self.load(name, dir).convert('RGBA'))
+            width = Iso.CANVAS_WIDTH
+            if pixels.shape != (width, width, 4):
+                raise Exception(
+                    f'The sprite of block "{name}" is not {width}x{width}.'
+                )
 
-          N      E      S      W
-        --------------------------
-        \ 1 /  \ 1 /  \ 1 /  \ 1 /
-        1 | 2  2 | 3  3 | 2  2 | 1
-        --------------------------
+            pixels.flags.writeable = False
+            return pixels
 
-    Attributes:
-        WHITE: A 4-tuple used to create a shaded cornerstone.
-        SHADE: The number of levels to decrease each side's colors by.
-        MULTIPLYER: The number to multiply each side's shade by. This keeps the
-            shade level of each side (see next) normalized rather than the
-            actual shading value per side.
-        SIDE_SHADING: A tuple containing the shade levels for: (up, down, left,
-            right, front, back)
-    """
-    WHITE = 255, 255, 255, 255
-    SHADE = 15
-    MULTIPLYER = 1
-    SIDE_SHADING = (0, 4, 1, 3, 2, 2)
+        return self.sprites.lookup((name, dir), load, name, dir)
 
-    @staticmethod
-    @lru_cache(maxsize=None)
-    def get_shade(bloxel_side):
+    def project(self, dir, xyz):
         """
+        Rotates and projects the positions of blocks.
+
         Args:
-            dir(int): the direction obtained from `Directions`
-            bloxel_side(int): the side number obtained from `BloxelSides`
+            dir(Direction): the direction to rotate to
+            xyz(ndarray): (N, 3) block positions
+
+        Return:
+            A 2-tuple with the int64 arrays of the canvas x and y coordinates
+            of the upper-left corner of each block's sprite.
         """
-        return darken(
-            Shade.WHITE,
-            Shade.SHADE * Shade.SIDE_SHADING[bloxel_side] * Shade.MULTIPLYER
+        x, y, z = np.asarray(xyz, dtype=np.int64).reshape(-1, 3).T * (
+            Iso.TEX_WIDTH
         )
 
+        # Rotate every block around the vertical axis like voxels
+        x, z = ((x, z), (-z, x), (-x, -z), (z, -x))[dir]
+        return self.iso.coors.project(x, z, y)
 
-class ColorTable:
-    """
-    Incrementally stores cornerstones of each requested color and specified
-    direction so that future queries will be faster.
-
-    Attributes:
-        side: the side to prefer when caching and returning new cornerstone
-            images.
-        colors: a dictionary of cornerstone images mapped to RGBA color values.
-    """
-    def __init__(self, side=Sides.ALL):
-        """
-        Initializes ColorTable with a preferred side.
+    def get_box(self, dir, xyz):
         """
-        self.side = side
-        self.colors = dict()
+        Returns the area the sprites of blocks cover.
 
-    def get(self, color, direction):
+        Args:
+            dir(Direction): the direction to rotate to
+            xyz(ndarray): (N, 3) block positions, at least one
+
+        Return:
+            The left, upper, right and lower canvas coordinates.
         """
-        Retrieves a cornerstone's side with the proper shading or the entire
-        cornerstone if every side is specified.
+        ix, iy = self.project(dir, xyz)
+        width = Iso.CANVAS_WIDTH
+        return (
+            int(ix.min()), int(iy.min()),
+            int(ix.max()) + width, int(iy.max()) + width
+        )
 
-        If the color does not reside within the color table, it is created and
-        cached.
+    def get_chunk_box(self, dir, chunk):
+        """
+        Returns the area the sprites of any block of a chunk would cover.
 
         Args:
-            color(tuple): either an RGB or RGBA color tuple
-            direction(Directions): the direction used in shading calculations
+            dir(Direction): the direction to rotate to
+            chunk(tuple): the position of the chunk
         """
-        index = (color, direction)
+        corners = np.array(list(itertools.product((0, self.CHUNK - 1),
+            repeat=3)))
+        return self.get_box(dir, corners + np.multiply(chunk, self.CHUNK))
 
-        if index not in self.colors:
-            if self.side == Sides.TOP:
-                self.colors[index] = Cornerstone.get_top(color, direction)
-            elif self.side == Sides.LEFT:
-                self.colors[index] = Cornerstone.get_left(color, direction)
-            elif self.side == Sides.RIGHT:
-                self.colors[index] = Cornerstone.get_right(color, direction)
-            else:
-                self.colors[index] = Cornerstone.get(color, direction)
+    def get_bounds(self, dir):
+        """
+        Returns the area the sprites of every block cover, or None if the
+        scene is empty.
 
-        return self.colors[index]
+        Args:
+            dir(Direction): the direction to rotate to
+        """
+        if not self.chunks:
+            return None
 
+        return self.get_box(dir, [
+            xyz for blocks in self.chunks.values() for xyz in blocks
+        ])
 
-class IsoCoors:
-    """
-    Instead of calculating isometric screen coordinates each time, either:
-     * Calculate them all once and then cache them
-     * Calculate them as needed and then hope some overlap
-    """
-    def __init__(self, tile_size):
+    @staticmethod
+    def is_inside(box, bounds):
         """
-        Initializes the coordinate generator assuming the given tile size.
+        Returns whether a box lies within bounds.
+
+        Args:
+            box(tuple): the left, upper, right and lower coordinates
+            bounds(tuple): the left, upper, right and lower coordinates
         """
-        self.coors = dict()
-        self.tile_size = tile_size
+        return (
+            box[0] >= bounds[0] and box[1] >= bounds[1]
+            and box[2] <= bounds[2] and box[3] <= bounds[3]
+        )
 
-    def __getitem__(self, xyz):
+    @staticmethod
+    def overlaps(box, other):
         """
-        Convenience method to retrieve isometric screen coordinates.
+        Returns whether two boxes overlap.
 
         Args:
-            xyz(tuple): the key used to obtain coordinates from the coors dict
+            box(tuple): the left, upper, right and lower coordinates
+            other(tuple): the left, upper, right and lower coordinates
         """
-        if xyz not in self.coors:
-            self.coors[xyz] = self.__get_pos_from_vec3(*xyz)
-
-        return self.coors[xyz]
+        return (
+            box[0] < other[2] and other[0] < box[2]
+            and box[1] < other[3] and other[1] < box[3]
+        )
 
-    @lru_cache(maxsize=None)
-    def get(self, x, y, z):
+    def draw(self, dir, box):
         """
-        Retrieve isometric screen coodinates from the given 3D coordinates.
+        Draws the blocks whose sprites overlap a box of the canvas.
+
+        Sprites are drawn from the furthest block to the nearest one, and
+        blocks at the same distance in order of their position, so any area
+        is drawn exactly as it is in the whole image.
 
         Args:
-            x(int): the integer value of the given coordinate axis
-            y(int): the integer value of the given coordinate axis
-            z(int): the integer value of the given coordinate axis
+            dir(Direction): the direction to rotate to
+            box(tuple): the left, upper, right and lower canvas coordinates
+                of the area to draw
 
         Return:
-            A 2-tuple with the x and y coordinate in isometric screenspace.
+            The (lower - upper, right - left, 4) uint8 array of the area.
         """
-        return self[(x, y, z)]
+        left, upper, right, lower = box
+        canvas = np.zeros((lower - upper, right - left, 4), dtype=np.uint8)
+
+        blocks = [
+            block for chunk, blocks in self.chunks.items()
+            if Scene.overlaps(self.get_chunk_box(dir, chunk), box)
+            for block in blocks.items()
+        ]
+        if not blocks:
+            return canvas
+
+        xyz = np.array([xyz for xyz, _ in blocks], dtype=np.int64)
+        ix, iy = self.project(dir, xyz)
+        width = Iso.CANVAS_WIDTH
+        shown = (
+            (ix < right) & (ix + width > left)
+            & (iy < lower) & (iy + width > upper)
+        )
 
-    def seed_coordinates(self, grid=16):
-        """
-        Calculates every isometric screen coodinate for a given grid size.
+        x, y, z = xyz.T
+        order = np.lexsort((z, y, x, Iso.get_distance(dir, xyz)))
+        order = order[shown[order]]
 
-        Vastly faster if used on a large enough dataset. Overwrites any
-        previously computed values but does not clear coordinates outside the
-        given grid size.
+        for i in order.tolist():
+            sprite = self.get_sprite(blocks[i][1], dir)
+            blit(canvas, sprite, int(ix[i]) - left, int(iy[i]) - upper)
 
-        Args:
-            grid(int): the cubic size of the grid (grid ** 3)
-        """
-        tmp = dict()
-        for x in range(grid):
-            for y in range(grid):
-                for z in range(grid):
-                    tmp[(x, y, z)] = self.__get_pos_from_vec3(x, y, z)
-        self.coors = tmp
+        return canvas
 
-    @lru_cache(maxsize=None)
-    def __get_pos_from_vec3(self, x, y, z):
+    def render(self, dir):
         """
-        Gets 2D screen coordinates from a vector3.
+        Returns the image of the whole scene in a direction.
+
+        The first render of a direction draws every block. Later renders only
+        redraw the areas of the chunks changed since, unless the scene grew
+        past the image.
 
         Args:
-            x(int): the integer value of the given coordinate axis
-            y(int): the integer value of the given coordinate axis
-            z(int): the integer value of the given coordinate axis
+            dir(Direction): the direction to rotate to
 
         Return:
-            A 2-tuple with the x and y coordinate in isometric screenspace.
-        """ 
-        p25 = self.tile_size * 0.25
-        p50 = self.tile_size * 0.50
-        isox = x * p50 + y * p50
-        isoy = -x * p25 + y * p25 - z * p50
-        return int(isox), int(isoy)
+            The RGBA Image of the scene, cropped to its blocks.
+        """
+        bounds = self.get_bounds(dir)
+        if bounds is None:
+            raise Exception('Scene does not contain any blocks.')
+
+        view = self.views.get(dir)
+        if view is None or not Scene.is_inside(bounds, view[0]):
+            view = bounds, self.draw(dir, bounds)
+
+        else:
+            (left, upper, right, lower), pixels = view
+            for chunk in self.dirty[dir]:
+                box = self.get_chunk_box(dir, chunk)
+                box = (
+                    max(box[0], left), max(box[1], upper),
+                    min(box[2], right), min(box[3], lower)
+                )
+                if box[0] < box[2] and box[1] < box[3]:
+                    pixels[
+                        box[1] - upper:box[3] - upper,
+                        box[0] - left:box[2] - left
+                    ] = self.draw(dir, box)
+
+            # Blocks removed from the edges shrink the image
+            view = bounds, pixels[
+                bounds[1] - upper:bounds[3] - upper,
+                bounds[0] - left:bounds[2] - left
+            ]
+
+        self.views[dir] = view
+        self.dirty[dir] = set()
+        return Image.fromarray(view[1].copy())
 
 
 def tint_image(src, color):
@@ -1135,18 +3467,31 @@ def tint_image(src, color):
     Return:
         The tinted image.
     """
-    _, _, _, alpha = src.split()
-    gray = ImageOps.grayscale(src)
-    result = ImageOps.colorize(gray, (0, 0, 0, 0), color)
+    alpha = np.asarray(src.getchannel('A'))
+    gray = np.asarray(ImageOps.grayscale(src))
+    shaded = Shade.shade_colors([color], np.arange(256))[0]
 
+    pixels = shaded[gray]
     if len(color) > 3:
-        for x in range(alpha.width):
-             for y in range(alpha.height):
-                apxl = color[3] if alpha.getpixel((x, y)) > 0 else 0
-                alpha.putpixel((x, y), apxl)
+        pixels[..., 3] = np.where(alpha > 0, color[3], 0)
+    else:
+        pixels[..., 3] = alpha
+
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def texture_array(texture):
+    """
+    Returns the RGBA pixels of the upper-left TEX_WIDTH square of a texture.
+
+    Args:
+        texture(Texture): the texture (or Image) to read
 
-    result.putalpha(alpha)
-    return result
+    Return:
+        A (TEX_WIDTH, TEX_WIDTH, 4) uint8 array.
+    """
+    tex = Iso.TEX_WIDTH
+    return Texture.of(texture).pixels[:tex, :tex]
 
 
 def fill_image(image, color):
@@ -1192,7 +3537,7 @@ def draw_image(x, y, img1, img2):
                         img2.putpixel((new_x, new_y), px)
 
 
-@lru_cache(maxsize=None)
+@cached(max_size=4096)
 def lighten(color, shades=1):
     """
     Lightens a given color by a number of shades.
@@ -1208,7 +3553,7 @@ def lighten(color, shades=1):
     return min(r + shades, 255), min(g + shades, 255), min(b + shades, 255), a
 
 
-@lru_cache(maxsize=None)
+@cached(max_size=4096)
 def darken(color, shades=1):
     """
     Darkens a given color by a number of shades.
@@ -1224,7 +3569,7 @@ def darken(color, shades=1):
     return max(r - shades, 0), max(g - shades, 0), max(b - shades, 0), a
 
 
-@lru_cache(maxsize=None)
+@cached(max_size=65536)
 def blend_color(a, b):
     """
     Blends two colors together by their alpha values.
@@ -1254,6 +3599,7 @@ def blend_color(a, b):
     return (fred, fgreen, fblue, falpha)
 
 
+
 def draw_pixel(x, y, pixel, img):
     """
     Draw `pixel` onto `img` at the specified coordinates.
@@ -1321,7 +3667,31 @@ def main(args=None):
         print(__doc__[:LOGO_ISO_BLOCK_END_INDEX])
         print('\nIsometric Bloxel Generator\nVersion 0.0.1')
 
+    # Binary voxel file converted from a text bloxel file
+    elif result['--bloxel'] and result['--convert']:
+        count = VoxelFile.convert(result['--bloxel'], result['--convert'])
+        print(f'Converted {count} voxels to {result["--convert"]}.')
+
     # Bloxel File with colors/positions of every bloxel in chunk
+    elif result['--bloxel'] and result['--tile-size']:
+        tile_size = result['--tile-size']
+        if not tile_size.isdigit() or int(tile_size) < 1:
+            raise Exception(
+                f'Invalid tile size supplied: {tile_size}\n'
+                'The tile size must be a whole number of pixels of at '
+                'least 1.'
+            )
+
+        CLI.output_multipart_tiles(
+            out_path,
+            result['--block'],
+            dirs,
+            result['--bloxel'],
+            int(tile_size),
+            result['--stitch'],
+            int(result['--jobs'])
+        )
+
     elif result['--bloxel']:
         CLI.output_multipart_bloxel(
             out_path,
@@ -1330,6 +3700,17 @@ def main(args=None):
             result['--bloxel']
         )
 
+    # Structure composed from the bloxels of its blocks
+    elif result['--scene']:
+        CLI.output_scene(
+            out_path,
+            result['--block'],
+            dirs,
+            result['--scene'],
+            Path(result['--sprites']),
+            Encoder.get(result['--format'], int(result['--compress']))
+        )
+
     # Create texture filled with specified color
     elif result['--create-texture']:
         if not result['<alpha>']:
@@ -1351,18 +3732,36 @@ def main(args=None):
 
     # Texture map with possible blockfile
     elif result['--texture']:
-
-        # Create a scalar block from each and every texture in the texture map
-        if not result['<block-file>']:
-            CLI.process_texture_batch(out_path, dirs, result['--texture'],
-                int(result['<num-wide>']), int(result['<num-long>'])
+        cache = None
+        if result['--cache']:
+            cache = RenderCache(
+                result['--cache'], int(result['--cache-size']) * 2 ** 20
             )
 
-        # Construct blocks according to the supplied blockfile
-        else:
-            CLI.process_blockfile_batch(out_path, dirs, result['<block-file>'],
-                result['--texture'], int(result['<num-wide>']),
-                int(result['<num-long>'])
+        encoder = Encoder.get(result['--format'], int(result['--compress']))
+
+        atlas_size = None
+        if result['--atlas']:
+            atlas_size = int(result['--atlas-size'])
+
+        # Watching always rebuilds incrementally
+        batch = (
+            out_path, dirs, result['--texture'], int(result['<num-wide>']),
+            int(result['<num-long>']), result['<block-file>'], cache,
+            atlas_size, result['--binary-manifest'], int(result['--jobs']),
+            encoder, result['--incremental'] or result['--watch']
+        )
+        CLI.process_batch(*batch)
+
+        if result['--watch']:
+            filenames = [result['--texture']]
+            if result['<block-file>']:
+                filenames.append(result['<block-file>'])
+
+            CLI.watch(
+                filenames,
+                lambda: CLI.process_batch(*batch),
+                float(result['--interval'])
             )
 
     # All sides have same image
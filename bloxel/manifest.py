@@ -0,0 +1,265 @@
+"""
+Incremental rebuilds of batches.
+
+Rebuilding a texture pack after changing a single tile should only render the
+bloxels that use that tile. A `BuildManifest` records the render key of every
+bloxel a batch produced (which covers the pixels of its tiles, its direction
+and every renderer setting) along with every file the batch wrote, so that the
+next build of the same output path can tell which bloxels are up to date,
+which need to be rendered again and which files are no longer produced.
+"""
+
+__all__ = [
+    'BuildManifest',
+]
+
+
+import os # Atomic replacement
+import json # Manifest
+import threading # Files written by writer threads
+import numpy as np # Restoring sprites from an atlas
+from pathlib import Path # Output filenames
+from PIL import Image
+
+
+class BuildManifest:
+    """
+    The outputs of the previous and current build of an output path.
+
+    Bloxels saved as files of their own are up to date when their key is
+    unchanged and the file still exists. Bloxels packed into an atlas are
+    restored from the pages of the previous atlas instead of being rendered
+    again.
+
+    Attributes:
+        NAME: the filename of the manifest in the output path.
+        VERSION: the version of the manifest layout.
+        path: the output path of the build.
+        atlas: the name of the atlas the build packs bloxels into, if any.
+        previous: the key of every bloxel of the previous build.
+        previous_files: every file written by the previous build.
+        outputs: the key of every bloxel of the current build so far.
+        files: every file written by the current build so far.
+    """
+    NAME = 'Build.json'
+    VERSION = 1
+
+    def __init__(self, path, atlas=None):
+        """
+        Reads the manifest of the previous build in the given path, if any.
+
+        Args:
+            path(Path): the path (not file) the build is saved in
+            atlas(str): the name of the atlas the build packs bloxels into
+        """
+        self.path = Path(path)
+        self.atlas = atlas
+        self.previous = {}
+        self.previous_files = set()
+        self.outputs = {}
+        self.files = set()
+        self.sprites = None
+
+        try:
+            with open(self.path / self.NAME) as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            data = {}
+
+        if data.get('version') != self.VERSION:
+            return
+
+        # Bloxels saved differently last time have to be saved again
+        self.previous_files = set(data['files'])
+        if data['atlas'] == atlas:
+            self.previous = data['outputs']
+
+    @staticmethod
+    def get_output(name, dir):
+        """
+        Returns the identifier of the bloxel of a block in a direction.
+
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the bloxel
+        """
+        return f'{name}-{"NESW"[dir]}'
+
+    @staticmethod
+    def write(data, filename):
+        """
+        Writes data to a file unless the file already holds exactly that data,
+        so that tools watching modification times only see real changes.
+
+        Args:
+            data(bytes): the new contents of the file
+            filename(str): the file to write
+
+        Return:
+            True if the file was written, False if it was left untouched.
+        """
+        filename = Path(filename)
+
+        try:
+            if filename.stat().st_size == len(data):
+                if filename.read_bytes() == data:
+                    return False
+        except FileNotFoundError:
+            pass
+
+        # Unique across processes and threads writing the same file at once
+        temp = filename.with_name(
+            f'{filename.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+        temp.write_bytes(data)
+        os.replace(temp, filename)
+        return True
+
+    def is_current(self, name, dir, key, filename=None):
+        """
+        Returns whether the previous build made a bloxel from the same inputs.
+
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the bloxel
+            key(str): the render key of the bloxel
+            filename(str): the file the bloxel is saved in, which must still
+                exist, if any
+        """
+        if self.previous.get(self.get_output(name, dir)) != key:
+            return False
+
+        return filename is None or Path(filename).exists()
+
+    def get_sprite(self, name, dir, key):
+        """
+        Returns a bloxel of the previous build as packed in its atlas.
+
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the bloxel
+            key(str): the render key of the bloxel
+
+        Return:
+            The RGBA Image of the bloxel or None if it is not up to date.
+        """
+        if self.atlas is None or not self.is_current(name, dir, key):
+            return None
+
+        if self.sprites is None:
+            self.sprites = self.read_atlas()
+
+        entry, pages = self.sprites.get(self.get_output(name, dir), (None,))
+        if entry is None:
+            return None
+
+        pixels = np.zeros((entry['height'], entry['width'], 4), np.uint8)
+        if entry['page'] >= 0:
+            x, y, w, h = entry['x'], entry['y'], entry['w'], entry['h']
+            left, upper = entry['offset_x'], entry['offset_y']
+            pixels[upper:upper + h, left:left + w] = (
+                pages[entry['page']][y:y + h, x:x + w]
+            )
+
+        return Image.fromarray(pixels)
+
+    def read_atlas(self):
+        """
+        Reads the manifest and pages of the previous atlas.
+
+        Return:
+            A dictionary of the (entry, pages) pair of every bloxel, where
+            pages are the pixels of every page of the atlas.
+        """
+        try:
+            with open(self.path / f'{self.atlas}.json') as file:
+                data = json.load(file)
+
+            pages = []
+            for page in data['pages']:
+                with Image.open(self.path / page) as image:
+                    pages.append(np.asarray(image.convert('RGBA')))
+
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        return {
+            f'{entry["name"]}-{entry["dir"]}': (entry, pages)
+            for entry in data['sprites']
+        }
+
+    def record(self, name, dir, key, filename=None):
+        """
+        Records a bloxel of the current build.
+
+        Args:
+            name(str): the name of the block
+            dir(Direction): the direction of the bloxel
+            key(str): the render key of the bloxel
+            filename(str): the file the bloxel is saved in, if any
+        """
+        self.outputs[self.get_output(name, dir)] = key
+        if filename is not None:
+            self.files.add(Path(filename).name)
+
+    def get_records(self):
+        """
+        Returns and forgets everything recorded so far, so that records made
+        in worker processes can be sent back to the main process.
+        """
+        records = self.outputs, self.files
+        self.outputs, self.files = {}, set()
+        return records
+
+    def add_records(self, records):
+        """
+        Adds records returned by `get_records` to the current build.
+
+        Args:
+            records(tuple): the recorded outputs and files
+        """
+        outputs, files = records
+        self.outputs.update(outputs)
+        self.files.update(files)
+
+    def add_files(self, filenames):
+        """
+        Records files written by the current build.
+
+        Args:
+            filenames(list): the files written
+        """
+        self.files.update(Path(filename).name for filename in filenames)
+
+    def remove_orphans(self):
+        """
+        Removes every file of the previous build not written by this one.
+
+        Return:
+            The list of filenames removed.
+        """
+        removed = []
+
+        for name in sorted(self.previous_files - self.files):
+            filename = self.path / name
+            try:
+                filename.unlink()
+                removed.append(filename)
+            except FileNotFoundError:
+                pass
+
+        return removed
+
+    def save(self):
+        """
+        Saves the manifest of the current build in the output path.
+        """
+        data = {
+            'version': self.VERSION,
+            'atlas': self.atlas,
+            'outputs': dict(sorted(self.outputs.items())),
+            'files': sorted(self.files),
+        }
+        BuildManifest.write(
+            json.dumps(data, indent=1).encode(), self.path / self.NAME
+        )
@@ -0,0 +1,208 @@
+"""
+Persistent, content-addressed storage of rendered bloxels.
+
+Rendering the same textures in the same direction with the same settings
+always produces the same file, so a rendered file can be stored under a hash
+of everything that went into it and simply be copied back out the next time
+the same bloxel is requested.
+"""
+
+__all__ = [
+    'RenderCache',
+]
+
+
+import os # Atomic replacement, hard links and timestamps
+import shutil # Copying files in and out of the cache
+import hashlib # Content addressing
+import threading # Caches shared by writer threads
+from pathlib import Path # Cache directory handling
+
+
+class RenderCache:
+    """
+    A directory of rendered bloxel files named after the hash of their inputs.
+
+    Every hit refreshes the modification time of its entry, so once the cache
+    grows past its size limit the least recently used entries are evicted
+    first. Entries are written to a temporary file and then renamed into place
+    so that several processes and threads can share one cache directory.
+
+    Attributes:
+        path: the directory the cache is stored in.
+        max_bytes: the total size of every entry the cache is allowed to grow
+            to before evicting.
+        link: whether hits are hard linked to their destination instead of
+            copied. Only safe if the destination is never modified in place.
+        size: the current total size of every entry in bytes.
+        lock: guards `size` and eviction against writer threads.
+    """
+
+    def __init__(self, path, max_bytes=2 ** 30, link=False):
+        """
+        Opens or creates the cache stored in the given directory.
+
+        Args:
+            path(str): the directory to store the cache in
+            max_bytes(int): the size limit of the cache
+            link(bool): hard link hits instead of copying them
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.link = link
+        self.size = sum(entry.stat().st_size for entry in self.entries())
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be sent to worker processes, each gets its own
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        """
+        Returns the key for an entry rendered from the given inputs.
+
+        Args:
+            parts(tuple): every value that affects the rendered file. Their
+                `repr` must be stable across runs.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for part in parts:
+            digest.update(repr(part).encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def entry(self, key):
+        """
+        Returns the path an entry with the given key is stored at.
+
+        Args:
+            key(str): the key of the entry
+        """
+        return self.path / key[:2] / key
+
+    def entries(self):
+        """
+        Yields the path of every entry in the cache.
+        """
+        for entry in self.path.glob('??/*'):
+            if entry.suffix != '.tmp':
+                yield entry
+
+    def get(self, key):
+        """
+        Returns the path of the entry with the given key and marks it as
+        recently used.
+
+        Args:
+            key(str): the key of the entry
+
+        Return:
+            The Path of the entry or None if it is not in the cache.
+        """
+        entry = self.entry(key)
+
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+
+        return entry
+
+    def fetch(self, key, filename):
+        """
+        Copies (or links) the entry with the given key to the given filename.
+
+        Args:
+            key(str): the key of the entry
+            filename(str): where to place the file
+
+        Return:
+            True if the entry was found, False otherwise.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return False
+
+        filename = Path(filename)
+        if filename.exists():
+            filename.unlink()
+
+        if self.link:
+            try:
+                os.link(entry, filename)
+                return True
+            except OSError:
+                pass
+
+        shutil.copyfile(entry, filename)
+        return True
+
+    def put(self, key, filename):
+        """
+        Stores a copy of the given file under the given key, evicting the
+        least recently used entries if the cache grows too large.
+
+        Args:
+            key(str): the key of the entry
+            filename(str): the rendered file to store
+        """
+        entry = self.entry(key)
+        entry.parent.mkdir(exist_ok=True)
+
+        # Unique across processes and threads putting the same key at once
+        temp = entry.with_name(
+            f'{key}.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+        shutil.copyfile(filename, temp)
+
+        with self.lock:
+            replaced = entry.stat().st_size if entry.exists() else 0
+            os.replace(temp, entry)
+            self.size += entry.stat().st_size - replaced
+
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is below 90%
+        of its size limit, leaving room for new entries before evicting again.
+        The lock must be held.
+        """
+        entries = []
+        for entry in self.entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+
+        for _, size, entry in entries:
+            if self.size <= self.max_bytes * 0.9:
+                break
+
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self.lock:
+            for entry in list(self.entries()):
+                entry.unlink()
+            self.size = 0
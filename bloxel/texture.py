@@ -0,0 +1,195 @@
+"""
+Decoded textures ready to be rendered.
+
+Images can come in any mode Pillow supports (P, L, RGB, RGBA, ...). A
+`Texture` normalizes them to RGBA once and keeps the facts the renderer keeps
+asking about, such as whether it is translucent, so that they never have to be
+recomputed by scanning the image again.
+"""
+
+__all__ = [
+    'Texture',
+]
+
+
+import hashlib # Content hashes
+import numpy as np # Bulk pixel operations
+from PIL import Image
+
+
+class Texture:
+    """
+    An RGBA texture along with precomputed information about its pixels.
+
+    Attributes:
+        pixels: the (height, width, 4) uint8 RGBA array of the texture.
+        translucent: whether any pixel has an alpha value below 255.
+        coverage: the fraction (0-1) of pixels that are not fully transparent.
+        hash: a hex digest of the size and pixels of the texture that can be
+            used as a key for caching anything derived from it.
+    """
+
+    @staticmethod
+    def open(filename):
+        """
+        Loads and decodes a texture from the given filename.
+
+        Args:
+            filename(str): the filename of the texture to load
+        """
+        with Image.open(filename) as image:
+            return Texture.from_image(image)
+
+    @staticmethod
+    def from_image(image):
+        """
+        Returns a texture with the pixels of the given image.
+
+        Args:
+            image(Image): the image to convert, in any mode
+        """
+        return Texture(np.asarray(image.convert('RGBA'), dtype=np.uint8))
+
+    @staticmethod
+    def of(texture):
+        """
+        Returns the given texture, image or pixel array as a texture.
+
+        Args:
+            texture(Texture): a Texture, an Image or an RGB/RGBA array
+        """
+        if isinstance(texture, Texture):
+            return texture
+
+        elif isinstance(texture, Image.Image):
+            return Texture.from_image(texture)
+
+        return Texture(texture)
+
+    def __init__(self, pixels):
+        """
+        Initializes the texture from an array of pixels.
+
+        The array is used as is (not copied) when it already is RGBA, which
+        allows textures to be views into larger arrays.
+
+        Args:
+            pixels(ndarray): (height, width, 3) RGB or (height, width, 4) RGBA
+                uint8 array
+        """
+        pixels = np.asarray(pixels, dtype=np.uint8)
+
+        if pixels.ndim != 3 or pixels.shape[2] not in (3, 4):
+            raise Exception(
+                'Texture pixels must be RGB or RGBA, not shape '
+                f'{pixels.shape}.'
+            )
+
+        if pixels.shape[2] == 3:
+            alpha = np.full(pixels.shape[:2] + (1,), 255, dtype=np.uint8)
+            pixels = np.concatenate([pixels, alpha], axis=2)
+
+        alpha = pixels[..., 3]
+        self.pixels = pixels
+        self.translucent = bool((alpha < 255).any())
+        self.coverage = np.count_nonzero(alpha) / max(alpha.size, 1)
+
+        self._hash = None
+        self._palette = None
+
+    @property
+    def width(self):
+        """
+        The width of the texture in pixels.
+        """
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        """
+        The height of the texture in pixels.
+        """
+        return self.pixels.shape[0]
+
+    @property
+    def size(self):
+        """
+        The (width, height) of the texture in pixels.
+        """
+        return self.width, self.height
+
+    @property
+    def hash(self):
+        """
+        A hex digest of the size and pixels of the texture that can be used
+        as a key for caching anything derived from it.
+
+        Computed the first time it is requested. The pixels are hashed a row
+        at a time, so textures that are views into larger arrays are never
+        copied.
+        """
+        if self._hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.array(self.pixels.shape, dtype=np.int64))
+
+            if self.pixels.flags.c_contiguous:
+                digest.update(self.pixels)
+            else:
+                for row in self.pixels:
+                    digest.update(np.ascontiguousarray(row))
+
+            self._hash = digest.hexdigest()
+
+        return self._hash
+
+    @property
+    def palette(self):
+        """
+        Every unique color in the texture and how many pixels use it.
+
+        Computed the first time it is requested since large texture maps can
+        have a great many colors.
+
+        Return:
+            A tuple of the (N, 4) uint8 array of RGBA colors and the (N,) array
+            of pixel counts for each color.
+        """
+        if self._palette is None:
+            packed = np.ascontiguousarray(self.pixels).view(np.uint32)
+            packed, counts = np.unique(packed, return_counts=True)
+            colors = packed.view(np.uint8).reshape(-1, 4)
+            self._palette = colors, counts
+
+        return self._palette
+
+    @property
+    def image(self):
+        """
+        Returns the texture as a new RGBA Image.
+        """
+        return Image.fromarray(np.ascontiguousarray(self.pixels))
+
+    def crop(self, box):
+        """
+        Returns the given region of the texture without copying its pixels.
+
+        Args:
+            box(tuple): the (left, upper, right, lower) pixel coordinates
+        """
+        left, upper, right, lower = box
+
+        if (left, upper, right, lower) == (0, 0, self.width, self.height):
+            return self
+
+        return Texture(self.pixels[upper:lower, left:right])
+
+    def tile(self, x, y, size):
+        """
+        Returns the square tile at the given position of a texture map.
+
+        Args:
+            x(int): the column of the tile
+            y(int): the row of the tile
+            size(int): the width and height of each tile
+        """
+        return self.crop((x * size, y * size, (x + 1) * size, (y + 1) * size))
@@ -0,0 +1,319 @@
+"""
+Reading and writing the voxels of multipart bloxels.
+
+Bloxel-files are text with one voxel per line, which has to be parsed in full
+before a single voxel is drawn. Large models are better stored in the binary
+voxel format of `VoxelFile`, which is loaded through a memory map without any
+parsing and can be read a chunk of voxels at a time.
+
+The binary format starts with a 24 byte header (see `VoxelFile.HEADER`)
+followed by the RGBA palette of the model, the xyz coordinates of every voxel
+and the palette index of every voxel. Coordinates and indexes are stored with
+the fewest bytes that fit them and every section starts on an 8 byte
+boundary. Every value is little-endian.
+"""
+
+__all__ = [
+    'VoxelFile',
+]
+
+
+import struct # File header
+import numpy as np # Voxel arrays
+
+
+class VoxelFile:
+    """
+    A binary voxel file opened through a memory map.
+
+    Attributes:
+        MAGIC: the first bytes of every binary voxel file.
+        VERSION: the version of the file layout.
+        EXTENSION: the file extension of binary voxel files.
+        HEADER: the magic, version, bytes per coordinate, bytes per palette
+            index, number of voxels and number of palette colors.
+        VOXEL: the structured dtype of a voxel.
+        filename: the filename of the voxel file.
+        palette: the (colors, 4) uint8 RGBA palette.
+        xyz: the memory mapped (count, 3) coordinates of every voxel.
+        indexes: the memory mapped palette index of every voxel.
+    """
+    MAGIC = b'BLXV'
+    VERSION = 1
+    EXTENSION = '.blxv'
+    HEADER = struct.Struct('<4sHBBQI4x')
+    VOXEL = np.dtype([('xyz', np.int32, 3), ('color', np.uint8, 4)])
+
+    def __init__(self, filename):
+        """
+        Maps the voxels of a binary voxel file into memory.
+
+        Args:
+            filename(str): the binary voxel file to open
+        """
+        self.filename = filename
+
+        with open(filename, 'rb') as file:
+            header = file.read(self.HEADER.size)
+
+        if len(header) < self.HEADER.size or header[:4] != self.MAGIC:
+            raise Exception(f'"{filename}" is not a binary voxel file.')
+
+        _, version, coordinate_size, index_size, count, colors = (
+            self.HEADER.unpack(header)
+        )
+        if version != self.VERSION:
+            raise Exception(
+                f'Binary voxel file "{filename}" has version {version}. '
+                f'Expected version {self.VERSION}.'
+            )
+
+        offset = self.HEADER.size
+        self.palette, offset = self.map(
+            np.uint8, (colors, 4), offset
+        )
+        self.xyz, offset = self.map(
+            f'<i{coordinate_size}', (count, 3), offset
+        )
+        self.indexes, offset = self.map(
+            f'<u{index_size}', (count,), offset
+        )
+
+    def __len__(self):
+        return len(self.indexes)
+
+    @staticmethod
+    def align(offset):
+        """
+        Returns the offset rounded up to the next 8 byte boundary.
+
+        Args:
+            offset(int): the offset in bytes
+        """
+        return -(-offset // 8) * 8
+
+    def map(self, dtype, shape, offset):
+        """
+        Maps a section of the file into memory.
+
+        Args:
+            dtype(dtype): the type of every value in the section
+            shape(tuple): the shape of the section
+            offset(int): the offset of the section in bytes
+
+        Return:
+            The mapped array and the offset of the next section.
+        """
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        if not size:
+            return np.empty(shape, dtype), self.align(offset)
+
+        array = np.memmap(
+            self.filename, dtype, 'r', offset=offset, shape=shape
+        )
+        return array, self.align(offset + size)
+
+    @staticmethod
+    def is_voxel_file(filename):
+        """
+        Returns whether a file is a binary voxel file.
+
+        Args:
+            filename(str): the file to check
+        """
+        with open(filename, 'rb') as file:
+            return file.read(len(VoxelFile.MAGIC)) == VoxelFile.MAGIC
+
+    @staticmethod
+    def read_text(filename):
+        """
+        Parses a text bloxel-file containing one voxel per line as whitespace
+        separated x, y, z, r, g, b and a values. Blank lines are skipped.
+
+        Args:
+            filename(str): the bloxel-file to read
+
+        Return:
+            An array of VOXEL.
+        """
+        tokens = []
+        lines = []
+
+        with open(filename) as file:
+            for count, line in enumerate(file, 1):
+                values = line.split()
+                if not values:
+                    continue
+
+                if len(values) != 7:
+                    raise VoxelFile.error(
+                        filename, count, f'has {len(values)} values instead '
+                        'of x, y, z, r, g, b and a.'
+                    )
+
+                tokens.extend(values)
+                lines.append(count)
+
+        try:
+            values = np.array(tokens, dtype=np.float64).reshape(-1, 7)
+        except ValueError:
+            values = None
+
+        if values is None or not np.isfinite(values).all():
+
+            # Find the first voxel that is not made of numbers
+            for i, line in enumerate(lines):
+                try:
+                    if np.isfinite(np.array(
+                        tokens[i * 7:i * 7 + 7], dtype=np.float64
+                    )).all():
+                        continue
+                except ValueError:
+                    pass
+
+                raise VoxelFile.error(
+                    filename, line, 'contains a value that is not a number.'
+                )
+
+        # Truncate toward zero just like `int(float(value))`
+        values = np.trunc(values)
+        for bad, message in (
+            (
+                np.abs(values[:, :3]) >= 2 ** 31,
+                'has a coordinate outside of +-2 ** 31.'
+            ),
+            (
+                (values[:, 3:] < 0) | (values[:, 3:] > 255),
+                'has a color value outside of 0-255.'
+            ),
+        ):
+            bad = bad.any(axis=1)
+            if bad.any():
+                raise VoxelFile.error(
+                    filename, lines[int(np.argmax(bad))], message
+                )
+
+        values = values.astype(np.int64)
+        voxels = np.empty(len(values), dtype=VoxelFile.VOXEL)
+        voxels['xyz'] = values[:, :3]
+        voxels['color'] = values[:, 3:]
+        return voxels
+
+    @staticmethod
+    def error(filename, count, message):
+        """
+        Returns the exception for an invalid line of a bloxel-file.
+
+        Args:
+            filename(str): the bloxel-file
+            count(int): the line number of the voxel
+            message(str): what is wrong with the voxel
+        """
+        return Exception(f'Line {count} of bloxel-file "{filename}" {message}')
+
+    @staticmethod
+    def read_voxels(filename):
+        """
+        Reads every voxel of a binary voxel file or text bloxel-file.
+
+        Args:
+            filename(str): the file to read
+
+        Return:
+            An array of VOXEL.
+        """
+        if VoxelFile.is_voxel_file(filename):
+            return VoxelFile(filename).read()
+
+        return VoxelFile.read_text(filename)
+
+    def read(self, start=0, stop=None):
+        """
+        Reads a range of voxels.
+
+        Args:
+            start(int): the index of the first voxel to read
+            stop(int): the index after the last voxel to read, defaults to
+                the number of voxels
+
+        Return:
+            An array of VOXEL.
+        """
+        xyz = self.xyz[start:stop]
+        voxels = np.empty(len(xyz), dtype=self.VOXEL)
+        voxels['xyz'] = xyz
+        voxels['color'] = self.palette[self.indexes[start:stop]]
+        return voxels
+
+    def iter_chunks(self, size=2 ** 20):
+        """
+        Reads the voxels a chunk at a time, so that models larger than memory
+        can be processed.
+
+        Args:
+            size(int): the most voxels in every chunk
+
+        Return:
+            A generator of arrays of VOXEL in order.
+        """
+        for start in range(0, len(self), size):
+            yield self.read(start, start + size)
+
+    @staticmethod
+    def write(voxels, filename):
+        """
+        Saves voxels as a binary voxel file.
+
+        Args:
+            voxels(ndarray): array of VOXEL
+            filename(str): the filename to save the voxels as
+        """
+        voxels = np.asarray(voxels, dtype=VoxelFile.VOXEL)
+        colors = np.ascontiguousarray(voxels['color']).view(np.uint32)
+        palette, indexes = np.unique(colors[:, 0], return_inverse=True)
+        palette = palette.view(np.uint8).reshape(-1, 4)
+
+        xyz = voxels['xyz']
+        coordinate_size = 4
+        if not len(xyz) or (xyz.min() >= -2 ** 15 and xyz.max() < 2 ** 15):
+            coordinate_size = 2
+
+        index_size = 1 if len(palette) <= 2 ** 8 else (
+            2 if len(palette) <= 2 ** 16 else 4
+        )
+
+        header = VoxelFile.HEADER.pack(
+            VoxelFile.MAGIC,
+            VoxelFile.VERSION,
+            coordinate_size,
+            index_size,
+            len(voxels),
+            len(palette)
+        )
+
+        with open(filename, 'wb') as file:
+            for section in (
+                header,
+                palette.tobytes(),
+                xyz.astype(f'<i{coordinate_size}').tobytes(),
+                indexes.astype(f'<u{index_size}').tobytes(),
+            ):
+                file.write(section)
+                file.write(bytes(VoxelFile.align(len(section)) - len(section)))
+
+    @staticmethod
+    def convert(text_filename, filename):
+        """
+        Converts a text bloxel-file into a binary voxel file.
+
+        Args:
+            text_filename(str): the bloxel-file to convert
+            filename(str): the filename to save the binary voxel file as
+
+        Return:
+            The number of voxels converted.
+        """
+        voxels = VoxelFile.read_text(text_filename)
+        VoxelFile.write(voxels, filename)
+        return len(voxels)
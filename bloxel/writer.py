@@ -0,0 +1,127 @@
+"""
+Background writing of rendered files.
+
+Encoding a PNG and creating its file takes far longer than rendering the
+bloxel in it. Pillow releases the GIL while compressing, so handing the saves
+to a few threads lets them overlap with rendering and with each other.
+"""
+
+__all__ = [
+    'Writer',
+]
+
+
+import queue # Bounded queue of pending writes
+import threading # Writer threads
+
+
+class Writer:
+    """
+    A bounded queue of writes consumed by a pool of threads.
+
+    Submitting blocks while the queue is full, so a fast producer can never
+    get more than `max_pending` writes ahead of the disk. The first error
+    raised by a write is re-raised in the submitting thread by the next call
+    to `submit` or `close`, after which the remaining writes are skipped.
+
+    Used as a context manager, every pending write is finished when the block
+    exits.
+
+    Attributes:
+        threads: the writer threads.
+        error: the first exception raised by a write, if any.
+    """
+
+    def __init__(self, num_threads=4, max_pending=64):
+        """
+        Starts the writer threads.
+
+        Args:
+            num_threads(int): the number of threads writing at once
+            max_pending(int): the number of writes that can be queued before
+                `submit` blocks
+        """
+        self.queue = queue.Queue(max_pending)
+        self.error = None
+        self.closed = False
+        self.threads = [
+            threading.Thread(target=self.run, daemon=True)
+            for i in range(num_threads)
+        ]
+
+        for thread in self.threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        # Do not hide the exception that is already leaving the block
+        try:
+            self.close()
+        except Exception:
+            if type is None:
+                raise
+
+    def run(self):
+        """
+        Performs queued writes until the writer is closed.
+        """
+        while True:
+            write = self.queue.get()
+
+            try:
+                if write is None:
+                    return
+
+                if self.error is None:
+                    function, args = write
+                    function(*args)
+
+            except BaseException as error:
+                if self.error is None:
+                    self.error = error
+
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        """
+        Raises the first error raised by a write, if any.
+        """
+        if self.error is not None:
+            raise self.error
+
+    def submit(self, function, *args):
+        """
+        Queues a call to `function(*args)`, waiting for room in the queue.
+
+        Args:
+            function(callable): the write to perform
+            args(tuple): the arguments to call it with
+        """
+        if self.closed:
+            raise Exception('Cannot submit a write to a closed writer.')
+
+        self.check()
+        self.queue.put((function, args))
+
+    def flush(self):
+        """
+        Waits for every queued write to finish.
+        """
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        """
+        Finishes every queued write and stops the writer threads.
+        """
+        if not self.closed:
+            self.closed = True
+            for thread in self.threads:
+                self.queue.put(None)
+            for thread in self.threads:
+                thread.join()
+
+        self.check()
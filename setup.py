@@ -11,9 +11,11 @@ setup(
 	description='Isometric Voxel Generator',
 	author='Samuel Wilder',
 	packages=['bloxel'],
+	python_requires='>=3.8',
 	install_requires=[
 		'Pillow>=6.2.2',
-		'docopt==0.6.2'
+		'docopt==0.6.2',
+		'numpy>=1.17'
 	],
 	entry_points={
 		'console_scripts' : [
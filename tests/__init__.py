@@ -0,0 +1,3 @@
+"""
+Tests of the bloxel renderer, run with `python -m unittest` or `pytest`.
+"""
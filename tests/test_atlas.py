@@ -0,0 +1,175 @@
+"""
+Tests of packing sprites into atlas pages and reading their manifests back.
+"""
+
+import io
+import json
+import struct
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from bloxel.atlas import Atlas
+from bloxel.iso import CLI
+from tests.util import EXAMPLES
+
+
+def get_sprites(rng, count, size=64):
+    """
+    Returns sprites with a visible rectangle of random size and position.
+    """
+    sprites = np.zeros((count, size, size, 4), dtype=np.uint8)
+    for sprite in sprites:
+        left, upper = rng.integers(0, size // 2, 2)
+        right, lower = rng.integers(size // 2 + 1, size + 1, 2)
+        pixels = rng.integers(0, 256, (lower - upper, right - left, 4))
+        pixels[..., 3] |= 1
+        sprite[upper:lower, left:right] = pixels
+    return sprites
+
+
+def read_binary_manifest(data):
+    """
+    Unpacks a binary manifest into the form of `Atlas.get_manifest`.
+    """
+    magic, (version, pages, count) = data[:4], struct.unpack_from(
+        '<III', data, 4
+    )
+    offset = 16
+    sprites = []
+    keys = ('page', 'x', 'y', 'w', 'h', 'offset_x', 'offset_y', 'width',
+        'height')
+
+    for _ in range(count):
+        length, = struct.unpack_from('<H', data, offset)
+        name = data[offset + 2:offset + 2 + length].decode('utf-8')
+        offset += 2 + length
+        dir, *values = struct.unpack_from('<Bh8H', data, offset)
+        offset += struct.calcsize('<Bh8H')
+        sprites.append(
+            {'name': name, 'dir': 'NESW'[dir], **dict(zip(keys, values))}
+        )
+
+    return magic, version, pages, sprites, offset == len(data)
+
+
+class TestAtlas(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(4)
+
+    def unpack(self, atlas, entry):
+        """
+        Puts a packed sprite back into its untrimmed canvas.
+        """
+        sprite = np.zeros((entry['height'], entry['width'], 4), np.uint8)
+        if entry['page'] >= 0:
+            x, y, w, h = (entry[key] for key in 'xywh')
+            left, upper = entry['offset_x'], entry['offset_y']
+            sprite[upper:upper + h, left:left + w] = (
+                atlas.pages[entry['page']][y:y + h, x:x + w]
+            )
+        return sprite
+
+    def test_packs_without_overlap(self):
+        sprites = get_sprites(self.rng, 120)
+        sprites[7] = 0
+        atlas = Atlas(256, padding=2)
+        for i, sprite in enumerate(sprites):
+            atlas.add(f'block{i}', i % 4, sprite)
+
+        self.assertGreater(len(atlas.pages), 1)
+        self.assertEqual(atlas.entries[7]['page'], -1)
+
+        used = [np.zeros((256, 256), dtype=bool) for _ in atlas.pages]
+        for sprite, entry in zip(sprites, atlas.entries):
+            self.assertTrue(np.array_equal(self.unpack(atlas, entry), sprite))
+            if entry['page'] < 0:
+                continue
+
+            # Every sprite keeps its padding clear of the others
+            x, y, w, h = (entry[key] for key in 'xywh')
+            self.assertLessEqual(x + w, 256)
+            self.assertLessEqual(y + h, 256)
+            area = used[entry['page']][
+                max(y - 1, 0):y + h + 1, max(x - 1, 0):x + w + 1
+            ]
+            self.assertFalse(area.any())
+            used[entry['page']][y:y + h, x:x + w] = True
+
+    def test_sprite_too_large(self):
+        with self.assertRaises(Exception):
+            Atlas(32).add('big', 0, get_sprites(self.rng, 1)[0] | 1)
+
+    def test_manifests(self):
+        sprites = get_sprites(self.rng, 40)
+        atlas = Atlas(128)
+        for i, sprite in enumerate(sprites):
+            atlas.add(f'blöck-{i}', (i * 3) % 4, sprite)
+
+        manifest = atlas.get_manifest('Pack')
+        self.assertEqual(
+            manifest['pages'],
+            [f'Pack-{page}.png' for page in range(len(atlas.pages))]
+        )
+
+        magic, version, pages, entries, complete = read_binary_manifest(
+            atlas.get_binary_manifest()
+        )
+        self.assertEqual((magic, version), (Atlas.MAGIC, Atlas.VERSION))
+        self.assertEqual(pages, len(atlas.pages))
+        self.assertEqual(entries, manifest['sprites'])
+        self.assertTrue(complete)
+
+    def test_save(self):
+        atlas = Atlas(128)
+        for i, sprite in enumerate(get_sprites(self.rng, 12)):
+            atlas.add(str(i), 0, sprite)
+
+        with tempfile.TemporaryDirectory() as path:
+            filenames = atlas.save(path, binary=True)
+            self.assertEqual(
+                sorted(Path(filename).name for filename in filenames),
+                sorted(atlas.get_manifest()['pages'] + [
+                    'Atlas.json', 'Atlas.bin'
+                ])
+            )
+            with open(Path(path) / 'Atlas.json') as file:
+                self.assertEqual(json.load(file), atlas.get_manifest())
+
+            for page, pixels in enumerate(atlas.pages):
+                with Image.open(Path(path) / f'Atlas-{page}.png') as image:
+                    saved = np.asarray(image)
+                self.assertTrue(np.array_equal(saved, pixels[:len(saved)]))
+                self.assertFalse(pixels[len(saved):].any())
+
+    def test_batch(self):
+        with tempfile.TemporaryDirectory() as path:
+            atlas = Atlas(256)
+            with contextlib.redirect_stdout(io.StringIO()):
+                CLI.process_blockfile_batch(
+                    Path(path), [True] * 4, EXAMPLES / 'example.blockfile',
+                    EXAMPLES / 'res' / 'Texture-Map.png', 2, 2, atlas=atlas
+                )
+
+                # Nothing is saved while packing
+                self.assertEqual(list(Path(path).iterdir()), [])
+                CLI.process_blockfile_batch(
+                    Path(path), [True] * 4, EXAMPLES / 'example.blockfile',
+                    EXAMPLES / 'res' / 'Texture-Map.png', 2, 2
+                )
+
+            self.assertEqual(len(atlas.entries), 9 * 4)
+            for entry in atlas.entries:
+                filename = f'Bloxel-{entry["name"]}-{entry["dir"]}.png'
+                with Image.open(Path(path) / filename) as image:
+                    expected = np.asarray(image.convert('RGBA'))
+                self.assertTrue(
+                    np.array_equal(self.unpack(atlas, entry), expected)
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
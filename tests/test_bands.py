@@ -0,0 +1,164 @@
+"""
+Tests for decoding texture maps one band of tiles at a time.
+"""
+
+import zlib # Writing interlaced PNGs
+import struct # PNG chunks
+import tempfile # Saved texture maps
+import unittest # Test cases
+import numpy as np # Test images
+from pathlib import Path # Saved texture maps
+from PIL import Image
+
+from bloxel.bands import * # Banded decoding
+from bloxel.texture import * # Decoded textures
+
+
+def save_interlaced(filename, pixels):
+    """
+    Saves RGBA pixels as an Adam7 interlaced PNG, which Pillow cannot write.
+
+    Args:
+        filename(Path): the filename to save the PNG as
+        pixels(ndarray): the (height, width, 4) uint8 pixels to save
+    """
+    height, width = pixels.shape[:2]
+    passes = [
+        (0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4),
+        (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2),
+    ]
+    data = bytearray()
+    for x, y, step_x, step_y in passes:
+        image = pixels[y::step_y, x::step_x]
+        if image.size:
+            for row in image:
+                data += b'\0' + row.tobytes()
+
+    def chunk(kind, data):
+        crc = zlib.crc32(data, zlib.crc32(kind))
+        return struct.pack('>I', len(data)) + kind + data + struct.pack(
+            '>I', crc
+        )
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 1)
+    filename.write_bytes(
+        TextureBands.SIGNATURE + chunk(b'IHDR', header)
+        + chunk(b'IDAT', zlib.compress(bytes(data)))
+        + chunk(b'IEND', b'')
+    )
+
+
+class TestTextureBands(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp.name)
+        rng = np.random.default_rng(5)
+
+        # Smooth gradients with noise give the PNG filters something to do
+        y, x = np.mgrid[:45, :38]
+        pixels = np.stack([x * 6, y * 5, x * y, 255 - y * 3], axis=-1)
+        pixels = pixels + rng.integers(0, 4, pixels.shape)
+        self.pixels = (pixels & 255).astype(np.uint8)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def get_images(self):
+        """
+        Returns the test pixels as an image of every PNG color type.
+        """
+        image = Image.fromarray(self.pixels, 'RGBA')
+        palette = image.convert('RGB').quantize(50)
+
+        return {
+            'L': image.convert('L'),
+            'LA': image.convert('LA'),
+            'RGB': image.convert('RGB'),
+            'RGBA': image,
+            'P': palette,
+            'P-transparent': palette.copy(),
+            'P-4bit': image.convert('RGB').quantize(16),
+            '1': image.convert('1'),
+            'I;16': image.convert('I').point(lambda i: i * 200).convert(
+                'I;16'
+            ),
+        }
+
+    def check(self, filename, band_height, streamed):
+        bands = TextureBands(filename, band_height)
+        self.assertEqual(bands.streamed, streamed)
+        expected = Texture.open(filename).pixels
+        self.assertEqual((bands.width, bands.height), expected.shape[1::-1])
+
+        tops = []
+        pixels = []
+        for top, band in bands:
+            tops.append(top)
+            pixels.append(band.pixels)
+            self.assertLessEqual(len(band.pixels), band_height)
+
+        self.assertEqual(tops, list(range(0, bands.height, band_height)))
+        self.assertTrue(np.array_equal(np.concatenate(pixels), expected))
+
+    def test_color_types(self):
+        for name, image in self.get_images().items():
+            filename = self.path / f'{name}.png'
+            options = {}
+            if name == 'P-transparent':
+                options['transparency'] = bytes(range(0, 250, 5))
+            if name == 'P-4bit':
+                options['bits'] = 4
+            image.save(filename, **options)
+
+            streamed = name in ('L', 'LA', 'RGB', 'RGBA', 'P', 'P-transparent')
+            for band_height in (1, 7, 16, 45, 100):
+                with self.subTest(mode=name, band_height=band_height):
+                    self.check(filename, band_height, streamed)
+
+    def test_interlaced(self):
+        filename = self.path / 'interlaced.png'
+        save_interlaced(filename, self.pixels)
+
+        with Image.open(filename) as image:
+            self.assertTrue(image.info.get('interlace'))
+
+        for band_height in (1, 8, 13):
+            self.check(filename, band_height, False)
+
+    def test_many_chunks(self):
+        filename = self.path / 'noise.png'
+        pixels = np.random.default_rng(6).integers(
+            0, 256, (300, 200, 4), dtype=np.uint8
+        )
+        Image.fromarray(pixels, 'RGBA').save(filename)
+        self.assertGreater(filename.read_bytes().count(b'IDAT'), 1)
+
+        for band_height in (16, 64):
+            self.check(filename, band_height, True)
+
+    def test_not_png(self):
+        filename = self.path / 'texture.bmp'
+        Image.fromarray(self.pixels[..., :3], 'RGB').save(filename)
+        self.check(filename, 10, False)
+
+    def test_truncated(self):
+        filename = self.path / 'truncated.png'
+        Image.fromarray(self.pixels, 'RGBA').save(filename)
+
+        data = filename.read_bytes()
+        start = data.index(b'IDAT') - 4
+        length = struct.unpack('>I', data[start:start + 4])[0]
+        data = data[:start] + TextureBands.make_chunk(
+            b'IDAT', zlib.compress(
+                zlib.decompress(data[start + 8:start + 8 + length])[:1000]
+            )
+        ) + TextureBands.make_chunk(b'IEND', b'')
+        filename.write_bytes(data)
+
+        with self.assertRaisesRegex(Exception, 'ends after'):
+            list(TextureBands(filename, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
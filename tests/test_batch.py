@@ -0,0 +1,271 @@
+"""
+Tests of batch rendering against rendering one scalar bloxel at a time.
+"""
+
+import io
+import tempfile
+import random
+import contextlib
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from PIL import Image
+from bloxel.iso import CLI, Iso, Directions
+from bloxel.rendercache import RenderCache
+from bloxel.atlas import Atlas
+from tests.util import EXAMPLES, get_cases
+
+
+def get_sides(sides):
+    return np.stack([np.asarray(side.convert('RGBA')) for side in sides])
+
+
+class TestRenderBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.iso = Iso(4)
+        cls.cases = list(get_cases().values())
+        cls.sides = np.stack([get_sides(sides) for sides in cls.cases])
+
+    def get_expected(self, dirs):
+        return np.stack([
+            np.stack([
+                np.asarray(self.iso.get_scalar_bloxel(dir, *sides))
+                for dir in dirs
+            ])
+            for sides in self.cases
+        ])
+
+    def test_matches_scalar(self):
+        for dirs in (None, [Directions.WEST], [Directions.SOUTH, 0]):
+            expected = self.get_expected(
+                Directions.ALL if dirs is None else dirs
+            )
+            self.assertTrue(np.array_equal(
+                self.iso.render_batch(self.sides, dirs), expected
+            ))
+
+    def test_reuses_output(self):
+        dirs = [Directions.EAST, Directions.NORTH]
+        out = np.full(
+            (len(self.sides) + 3, 2, Iso.CANVAS_WIDTH, Iso.CANVAS_WIDTH, 4),
+            7, dtype=np.uint8
+        )
+        expected = self.get_expected(dirs)
+
+        # Render a few bloxels at a time into the same array
+        for start in range(0, len(self.sides), 2):
+            chunk = self.sides[start:start + 2]
+            result = self.iso.render_batch(chunk, dirs, out)
+            self.assertTrue(np.shares_memory(result, out))
+            self.assertTrue(
+                np.array_equal(result, expected[start:start + 2])
+            )
+
+        with self.assertRaises(Exception):
+            self.iso.render_batch(self.sides, dirs, out[:2])
+
+    def test_mixed_opacity(self):
+        # Opaque and translucent bloxels are rendered by separate plans
+        sides = self.sides.copy()
+        sides[1::2, ..., 3] = 255
+        batch = self.iso.render_batch(sides)
+        for sides, bloxels in zip(sides, batch):
+            images = [Image.fromarray(side) for side in sides]
+            for dir in Directions.ALL:
+                expected = self.iso.get_scalar_bloxel(dir, *images)
+                self.assertTrue(
+                    np.array_equal(bloxels[dir], np.asarray(expected))
+                )
+
+
+def read_pixels(path):
+    """
+    Returns the pixels of every image in a directory by filename.
+    """
+    pixels = {}
+    for filename in sorted(Path(path).iterdir()):
+        with Image.open(filename) as image:
+            pixels[filename.name] = np.asarray(image.convert('RGBA'))
+    return pixels
+
+
+class TestBatchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = Path(self.dir.name)
+
+    def process(self, name, cache=None):
+        out_path = self.path / name
+        out_path.mkdir()
+        with contextlib.redirect_stdout(io.StringIO()):
+            CLI.process_blockfile_batch(
+                out_path, [True] * 4, EXAMPLES / 'example.blockfile',
+                EXAMPLES / 'res' / 'Texture-Map.png', 2, 2, cache
+            )
+        return read_pixels(out_path)
+
+    def test_reuses_renders(self):
+        expected = self.process('plain')
+        cache = RenderCache(self.path / 'cache')
+        self.assertEqual(self.process('first', cache).keys(), expected.keys())
+
+        # Every bloxel of the second batch is copied out of the cache
+        with mock.patch.object(
+            Iso, 'render_batch', side_effect=AssertionError
+        ):
+            cached = self.process('second', cache)
+
+        self.assertEqual(cached.keys(), expected.keys())
+        for filename, pixels in expected.items():
+            self.assertTrue(np.array_equal(cached[filename], pixels))
+
+    def test_render_keys(self):
+        iso = Iso(4)
+        sides = get_cases()['holes']
+        keys = iso.get_render_keys(Directions.ALL, *sides)
+        self.assertEqual(len(set(keys)), 4)
+        self.assertEqual(keys, iso.get_render_keys(Directions.ALL, *sides))
+        self.assertNotEqual(
+            keys, iso.get_render_keys(Directions.ALL, *sides[::-1])
+        )
+        self.assertNotEqual(keys, Iso(8).get_render_keys(
+            Directions.ALL, *sides
+        ))
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = Path(self.dir.name)
+
+    def process(self, name, jobs, blockfile=True, atlas=None):
+        out_path = self.path / name
+        out_path.mkdir()
+        texture = EXAMPLES / 'res' / 'Texture-Map.png'
+
+        # Unnamed blocks are named the same way in both runs
+        random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if blockfile:
+                CLI.process_blockfile_batch(
+                    out_path, [True, True, False, True],
+                    EXAMPLES / 'example.blockfile', texture, 2, 2,
+                    atlas=atlas, jobs=jobs
+                )
+            else:
+                CLI.process_texture_batch(
+                    out_path, [True] * 4, texture, 2, 2, atlas=atlas,
+                    jobs=jobs
+                )
+
+        return read_pixels(out_path)
+
+    def assertSameOutput(self, a, b):
+        self.assertEqual(a.keys(), b.keys())
+        for filename, pixels in a.items():
+            self.assertTrue(np.array_equal(b[filename], pixels), filename)
+
+    def test_blockfile(self):
+        self.assertSameOutput(self.process('a', 1), self.process('b', 2))
+
+    def test_texture(self):
+        self.assertSameOutput(
+            self.process('a', 1, False), self.process('b', 3, False)
+        )
+
+    def test_atlas(self):
+        atlases = [Atlas(256), Atlas(256)]
+        self.process('a', 1, atlas=atlases[0])
+        self.process('b', 2, atlas=atlases[1])
+        self.assertEqual(atlases[0].entries, atlases[1].entries)
+        for a, b in zip(atlases[0].pages, atlases[1].pages):
+            self.assertTrue(np.array_equal(a, b))
+
+
+class TestIterBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.iso = Iso(4)
+        cls.texture = EXAMPLES / 'res' / 'Texture-Map.png'
+        with Image.open(cls.texture) as image:
+            cls.tiles = [
+                image.crop((x * 16, y * 16, x * 16 + 16, y * 16 + 16))
+                for y in range(2) for x in range(2)
+            ]
+
+    def get_expected(self, indexes, dirs):
+        sides = [self.tiles[i] for i in indexes]
+        sides += [sides[-1]] * (6 - len(sides))
+        return [
+            np.asarray(self.iso.get_scalar_bloxel(dir, *sides))
+            for dir in dirs
+        ]
+
+    def test_blockfile(self):
+        dirs = [True, False, True, True]
+        with open(EXAMPLES / 'example.blockfile') as file:
+            blocks = [
+                (name.strip(), [int(i) for i in indexes.split()])
+                for indexes, name in (line.split('#') for line in file)
+            ]
+
+        for jobs in (1, 2):
+            sprites = CLI.iter_blockfile_batch(
+                dirs, EXAMPLES / 'example.blockfile', self.texture, 2, 2,
+                jobs=jobs
+            )
+            expected = [
+                (name, dir, pixels)
+                for name, indexes in blocks
+                for dir, pixels in zip(
+                    (0, 2, 3), self.get_expected(indexes, (0, 2, 3))
+                )
+            ]
+
+            count = 0
+            for (name, dir, sprite), (
+                expected_name, expected_dir, pixels
+            ) in zip(sprites, expected):
+                count += 1
+                self.assertEqual((name, dir), (expected_name, expected_dir))
+                self.assertTrue(np.array_equal(np.asarray(sprite), pixels))
+
+            self.assertEqual(count, len(expected))
+
+    def test_texture(self):
+        sprites = list(CLI.iter_texture_batch(
+            [False, True, False, False], self.texture, 2, 2
+        ))
+        self.assertEqual(len(sprites), 4)
+        for (name, dir, sprite), i in zip(sprites, range(4)):
+            self.assertEqual(dir, 1)
+            self.assertEqual(len(name), 8)
+            self.assertTrue(np.array_equal(
+                np.asarray(sprite), self.get_expected([i], [1])[0]
+            ))
+
+    def test_saves_sprites(self):
+        with tempfile.TemporaryDirectory() as path:
+            sprites = list(CLI.iter_blockfile_batch(
+                [True] * 4, EXAMPLES / 'example.blockfile', self.texture, 2,
+                2, Path(path)
+            ))
+            saved = read_pixels(path)
+
+        self.assertEqual(len(sprites), 9 * 4)
+        self.assertEqual(len(saved), 9 * 4)
+        for name, dir, sprite in sprites:
+            pixels = saved[f'Bloxel-{name}-{"NESW"[dir]}.png']
+            self.assertTrue(np.array_equal(pixels, np.asarray(sprite)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Tests for reading blockfiles and planning their instructions.
+"""
+
+import tempfile # Blockfiles
+import unittest # Test cases
+import numpy as np # Texture maps
+from pathlib import Path # Blockfiles
+
+from bloxel.blockfile import * # Blockfiles and plans
+from tests.util import * # Example files
+
+
+class TestExecutionPlan(unittest.TestCase):
+
+    def test_dedupes_faces(self):
+        plan = ExecutionPlan([
+            ('a', [(0, 0), (1, 0), (0, 1), (1, 1), (0, 0), (1, 0)]),
+            ('b', [(1, 1), (1, 0)]),
+            ('c', [(0, 0), (1, 0), (0, 1), (1, 1), (0, 0), (1, 0)]),
+            ('d', [(1, 1), (1, 0), (1, 0), (1, 0), (1, 0), (1, 0)]),
+        ])
+
+        self.assertEqual(list(plan), [
+            (['a', 'c'], [(0, 0), (1, 0), (0, 1), (1, 1), (0, 0), (1, 0)]),
+            (['b', 'd'], [(1, 1)] + [(1, 0)] * 5),
+        ])
+
+    def test_pads_sides_left_out(self):
+        plan = ExecutionPlan([
+            ('one', [(2, 3)]),
+            ('three', [(0, 0), (1, 0), (2, 0)]),
+            ('six', [(0, 0), (1, 0), (2, 0), (2, 0), (2, 0), (2, 0)]),
+        ])
+
+        self.assertEqual(list(plan), [
+            (['one'], [(2, 3)] * 6),
+            (['three', 'six'], [(0, 0), (1, 0)] + [(2, 0)] * 4),
+        ])
+
+    def test_windows(self):
+        consumed = []
+
+        def instructions():
+            for i in range(7):
+                consumed.append(i)
+                yield f'block{i}', [(i % 2, 0)]
+
+        plan = iter(ExecutionPlan(instructions(), window=3))
+
+        # Only the first window is read before its faces are planned
+        self.assertEqual(next(plan), (['block0', 'block2'], [(0, 0)] * 6))
+        self.assertEqual(consumed, [0, 1, 2])
+
+        self.assertEqual(list(plan), [
+            (['block1'], [(1, 0)] * 6),
+            (['block3', 'block5'], [(1, 0)] * 6),
+            (['block4'], [(0, 0)] * 6),
+            (['block6'], [(0, 0)] * 6),
+        ])
+
+    def test_get_map(self):
+        rng = np.random.default_rng(7)
+        pixels = rng.integers(0, 256, (5 * 8, 3 * 8, 4), dtype=np.uint8)
+
+        # The whole map at once, or in bands of one or more rows of tiles
+        for height in (len(pixels), 8, 16, 24):
+            bands = [
+                (top, pixels[top:top + height])
+                for top in range(0, len(pixels), height)
+            ]
+            with self.subTest(height=height):
+                tiles = ExecutionPlan.get_map(bands, 8, 3, 4)
+                self.assertTrue(np.array_equal(tiles, pixels[:32]))
+
+    def test_get_map_stops_reading(self):
+        pixels = np.full((8, 16, 4), 9, dtype=np.uint8)
+
+        def bands():
+            yield 0, pixels
+            yield 8, pixels
+            raise AssertionError('Read a band below the grid')
+
+        tiles = ExecutionPlan.get_map(bands(), 8, 2, 2)
+        self.assertTrue((tiles == 9).all())
+
+    def test_get_map_outside_texture(self):
+        pixels = np.full((8, 8, 4), 9, dtype=np.uint8)
+        tiles = ExecutionPlan.get_map([(0, pixels)], 8, 2, 2)
+
+        self.assertTrue((tiles[:8, :8] == 9).all())
+        self.assertTrue((tiles[8:] == 0).all())
+        self.assertTrue((tiles[:, 8:] == 0).all())
+
+
+class TestBlockFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.filename = Path(self.temp.name) / 'blocks.blockfile'
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_example(self):
+        blockfile = BlockFile(EXAMPLES / 'example.blockfile', 2, 2)
+        plan = blockfile.compile()
+
+        self.assertEqual(blockfile.num_instructions, 9)
+        self.assertEqual(
+            sorted(name for names, face in plan for name in names),
+            [f'Bloxel{i}' for i in range(1, 10)]
+        )
+
+    def test_parse(self):
+        self.filename.write_text(
+            '0 1 2 # First\n\n5 #  Second Part \n3\n  \n'
+        )
+        blockfile = BlockFile(self.filename, 3, 2)
+        instructions = list(blockfile)
+
+        self.assertEqual(blockfile.num_instructions, 3)
+        self.assertEqual(instructions[:2], [
+            ('First', [(0, 0), (1, 0), (2, 0)]),
+            ('Second Part', [(2, 1)]),
+        ])
+
+        # Unnamed blocks get a random name
+        name, coordinates = instructions[2]
+        self.assertEqual(len(name), 8)
+        self.assertEqual(coordinates, [(0, 1)])
+
+    def test_lazy(self):
+        self.filename.write_text('0 # Good\n9 # Bad\n')
+        instructions = iter(BlockFile(self.filename, 2, 2))
+
+        self.assertEqual(next(instructions), ('Good', [(0, 0)]))
+        with self.assertRaisesRegex(Exception, 'line 2'):
+            next(instructions)
+
+    def test_duplicate_names(self):
+        self.filename.write_text('0 # Grass\n1\n1\n2 # Dirt\n3 # Grass\n')
+        instructions = iter(BlockFile(self.filename, 2, 2))
+
+        self.assertEqual(next(instructions), ('Grass', [(0, 0)]))
+        with self.assertRaisesRegex(
+            Exception, 'line 5.*reuses the block name "Grass" of line 1'
+        ):
+            list(instructions)
+
+        # Every iteration starts over
+        self.assertEqual(
+            next(iter(BlockFile(self.filename, 2, 2))), ('Grass', [(0, 0)])
+        )
+
+    def test_invalid(self):
+        lines = {
+            '1 # Bad(': 'invalid block name',
+            '0 4 # Outside': 'outside texture bounds',
+            '-1 # Negative': 'outside texture bounds',
+            '0 x # Letter': 'not a number',
+            '0 1 2 3 0 1 2 # Seven': 'between 1 and 6',
+            '# Empty': 'between 1 and 6',
+        }
+
+        for line, message in lines.items():
+            with self.subTest(line=line):
+                self.filename.write_text(f'0 1 # Good\n{line}\n')
+                with self.assertRaisesRegex(Exception, f'line 2.*{message}'):
+                    list(BlockFile(self.filename, 2, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests of the bounded caches.
+"""
+
+import unittest
+from bloxel.cache import Cache, cached
+
+
+class TestCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = Cache('test', max_size=3)
+        for key in 'abc':
+            cache.put(key, key.upper())
+
+        # Touching 'a' makes 'b' the least recently used entry
+        self.assertEqual(cache.get('a'), 'A')
+        cache.put('d', 'D')
+
+        self.assertNotIn('b', cache)
+        self.assertEqual([key for key in 'abcd' if key in cache], list('acd'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_evicts_by_bytes(self):
+        cache = Cache('test', max_size=None, max_bytes=10, sizeof=len)
+        cache.put('a', 'x' * 4)
+        cache.put('b', 'x' * 4)
+        cache.put('c', 'x' * 4)
+
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.bytes, 8)
+
+        # Replacing an entry does not count its old size twice
+        cache.put('c', 'x' * 2)
+        self.assertEqual(cache.bytes, 6)
+        self.assertEqual(len(cache), 2)
+
+    def test_counts_hits_and_misses(self):
+        cache = Cache('test')
+        self.assertIs(cache.get('a'), Cache.MISSING)
+        self.assertEqual(cache.lookup('a', str.upper, 'a'), 'A')
+        self.assertEqual(cache.lookup('a', str.upper, 'b'), 'A')
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(stats['size'], 1)
+
+    def test_clear_keeps_counters(self):
+        cache = Cache('test')
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 1)
+
+    def test_registry(self):
+        cache = Cache('test.registry')
+        self.assertIn(cache, Cache.registry)
+        self.assertIn(
+            'test.registry', [stats['name'] for stats in Cache.get_stats()]
+        )
+
+    def test_cached(self):
+        calls = []
+
+        @cached(max_size=2)
+        def square(x, offset=0):
+            calls.append(x)
+            return x * x + offset
+
+        self.assertEqual([square(2), square(2), square(3)], [4, 4, 9])
+        self.assertEqual(square(2, offset=1), 5)
+        self.assertEqual(calls, [2, 3, 2])
+
+        # The keyword call evicted the least recently used result of square(2)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(2), 4)
+        self.assertEqual(calls, [2, 3, 2, 2])
+        self.assertEqual(square.cache.max_size, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
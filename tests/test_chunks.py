@@ -0,0 +1,95 @@
+"""
+Tests of the sparse voxel index against a set of positions.
+"""
+
+import unittest
+import numpy as np
+from bloxel.chunks import VoxelIndex
+from bloxel.voxels import VoxelFile
+
+
+def get_voxels(xyz, alpha):
+    voxels = np.zeros(len(xyz), dtype=VoxelFile.VOXEL)
+    voxels['xyz'] = xyz
+    voxels['color'][:, 3] = alpha
+    return voxels
+
+
+class TestVoxelIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.xyz = rng.integers(-40, 40, (2000, 3))
+        self.alpha = rng.choice([255, 90], 2000)
+        self.index = VoxelIndex(get_voxels(self.xyz, self.alpha))
+        self.occupied = set(map(tuple, self.xyz.tolist()))
+        self.opaque = set(
+            map(tuple, self.xyz[self.alpha == 255].tolist())
+        )
+        self.queries = rng.integers(-50, 50, (5000, 3))
+
+    def assertMatches(self, index, occupied, opaque):
+        queries = self.queries.tolist()
+        self.assertEqual(len(index), len(occupied))
+        self.assertEqual(
+            index.get(self.queries).tolist(),
+            [tuple(xyz) in occupied for xyz in queries]
+        )
+        self.assertEqual(
+            index.get(self.queries, opaque=True).tolist(),
+            [tuple(xyz) in opaque for xyz in queries]
+        )
+
+    def test_get(self):
+        self.assertMatches(self.index, self.occupied, self.opaque)
+        self.assertIn(tuple(self.xyz[0]), self.index)
+
+    def test_get_neighbors(self):
+        xyz = self.queries[:200]
+        neighbors = self.index.get_neighbors(xyz)
+        expected = [
+            [tuple(position + offset) in self.occupied
+                for offset in VoxelIndex.OFFSETS]
+            for position in xyz
+        ]
+        self.assertEqual(neighbors.tolist(), expected)
+
+    def test_remove(self):
+        removed = self.xyz[::3]
+        self.index.remove(removed)
+        removed = set(map(tuple, removed.tolist()))
+        self.assertMatches(
+            self.index, self.occupied - removed, self.opaque - removed
+        )
+
+        # Removing everything releases every chunk for reuse
+        self.index.remove(self.xyz)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.slots, {})
+        self.index.add(get_voxels(self.xyz, self.alpha))
+        self.assertMatches(self.index, self.occupied, self.opaque)
+
+    def test_get_chunks(self):
+        chunks = self.index.get_chunks()
+        expected = np.unique(self.xyz // VoxelIndex.SIZE, axis=0)
+        self.assertEqual(
+            chunks.tolist(), (expected * VoxelIndex.SIZE).tolist()
+        )
+
+    def test_limit(self):
+        edge = VoxelIndex.LIMIT * VoxelIndex.SIZE
+        index = VoxelIndex(get_voxels([(-edge, 0, edge - 1)], 255))
+        self.assertEqual(index.get([(-edge, 0, edge - 1)]).tolist(), [True])
+
+        # Positions too far out are never occupied and cannot be added
+        far = [(edge, 0, 0), (0, -edge - 1, 0), (0, 0, 2 ** 31 - 1)]
+        self.assertEqual(index.get(far).tolist(), [False] * 3)
+        for xyz in far:
+            with self.assertRaises(Exception):
+                index.add(get_voxels([xyz], 255))
+
+        self.assertEqual(len(index), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Tests of the packed color table against the original cornerstone images.
+"""
+
+import unittest
+import numpy as np
+from PIL import Image, ImageOps
+from bloxel.iso import ColorTable, Directions, BloxelSides, Shade
+from bloxel.iso import Sides
+
+
+# The (left, right) side of the bloxel each side of a cornerstone shows
+FACING = {
+    Directions.NORTH: (BloxelSides.left, BloxelSides.back),
+    Directions.EAST: (BloxelSides.back, BloxelSides.right),
+    Directions.SOUTH: (BloxelSides.right, BloxelSides.front),
+    Directions.WEST: (BloxelSides.front, BloxelSides.left),
+}
+
+# The box of each side within the whole cornerstone
+BOXES = {
+    Sides.LEFT: (0, 1, 2, 4),
+    Sides.RIGHT: (2, 1, 4, 4),
+    Sides.TOP: (1, 0, 3, 2),
+    Sides.ALL: (0, 0, 4, 4),
+}
+
+
+def get_cornerstone(color, dir, side=Sides.ALL):
+    """
+    Draws a cornerstone pixel by pixel and tints it the way the renderer
+    originally did.
+    """
+    left, right = FACING[dir]
+    parts = (
+        (Sides.LEFT, left, ((0, 1), (0, 2), (1, 2), (1, 3))),
+        (Sides.RIGHT, right, ((3, 1), (3, 2), (2, 2), (2, 3))),
+        (Sides.TOP, BloxelSides.up, ((1, 0), (2, 0), (1, 1), (2, 1))),
+    )
+    img = Image.new('RGBA', (4, 4))
+    for part, bloxel_side, pixels in parts:
+        if side in (part, Sides.ALL):
+            for xy in pixels:
+                img.putpixel(xy, Shade.get_shade(bloxel_side))
+
+    _, _, _, alpha = img.split()
+    gray = ImageOps.grayscale(img)
+    result = ImageOps.colorize(gray, (0, 0, 0, 0), color[:3])
+    if len(color) > 3:
+        alpha = alpha.point(lambda value: color[3] if value > 0 else 0)
+    result.putalpha(alpha)
+    return np.asarray(result.crop(BOXES[side]))
+
+
+class TestColorTable(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.colors = [
+            tuple(color) for color in rng.integers(0, 256, (24, 4)).tolist()
+        ]
+        self.colors += [(0, 0, 0, 255), (255, 255, 255, 255), (9, 8, 7, 0)]
+
+    def test_matches_cornerstones(self):
+        for side in (Sides.LEFT, Sides.RIGHT, Sides.TOP, Sides.ALL):
+            table = ColorTable(side)
+            for dir in Directions.ALL:
+                sprites = table.get_sprites(table.pack(self.colors), dir)
+                for color, sprite in zip(self.colors, sprites):
+                    expected = get_cornerstone(color, dir, side)
+                    self.assertTrue(
+                        np.array_equal(sprite, expected),
+                        f'side {side} direction {dir} color {color}'
+                    )
+
+    def test_get_matches_get_sprites(self):
+        table = ColorTable()
+        color = self.colors[0]
+        image = table.get(color, Directions.EAST)
+        self.assertEqual(image.mode, 'RGBA')
+        self.assertTrue(np.array_equal(
+            np.asarray(image), get_cornerstone(color, Directions.EAST)
+        ))
+
+        # RGB colors are fully opaque
+        image = table.get(color[:3], Directions.EAST)
+        self.assertTrue(np.array_equal(
+            np.asarray(image),
+            get_cornerstone(color[:3] + (255,), Directions.EAST)
+        ))
+
+    def test_pack(self):
+        packed = ColorTable.pack([(1, 2, 3, 4), (5, 6, 7, 8)])
+        self.assertEqual(packed.dtype, np.uint32)
+        self.assertEqual(
+            packed.view(np.uint8).reshape(-1, 4).tolist(),
+            [[1, 2, 3, 4], [5, 6, 7, 8]]
+        )
+
+        # RGB colors are fully opaque
+        self.assertEqual(
+            ColorTable.pack((5, 6, 7)).tolist(),
+            ColorTable.pack((5, 6, 7, 255)).tolist()
+        )
+
+    def test_lookup_adds_missing_colors(self):
+        table = ColorTable()
+        colors = table.pack(self.colors[:4] + self.colors[:2])
+        values = table.lookup(colors, Directions.NORTH)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(values.shape, (6, 3))
+        self.assertTrue(np.array_equal(values[4:], values[:2]))
+
+        # Keys stay sorted as colors are added
+        table.lookup(table.pack(self.colors), Directions.NORTH)
+        keys = table.keys[Directions.NORTH]
+        self.assertEqual(len(keys), len(set(self.colors)))
+        self.assertTrue(np.all(keys[1:] > keys[:-1]))
+        self.assertTrue(np.array_equal(
+            table.lookup(colors, Directions.NORTH), values
+        ))
+
+        # Every direction has its own colors
+        table.lookup(colors[:1], Directions.WEST)
+        self.assertEqual(len(table), len(set(self.colors)) + 1)
+
+    def test_counts_hits_and_misses(self):
+        table = ColorTable()
+        colors = table.pack(self.colors[:4] + self.colors[:2])
+        table.lookup(colors, Directions.NORTH)
+        self.assertEqual((table.hits, table.misses), (0, 6))
+        self.assertEqual(len(table), 4)
+
+        table.lookup(colors, Directions.NORTH)
+        self.assertEqual((table.hits, table.misses), (6, 6))
+
+        # Every direction has its own colors
+        table.lookup(colors[:1], Directions.WEST)
+        self.assertEqual(len(table), 5)
+
+    def test_starts_over_at_limit(self):
+        table = ColorTable(max_colors=16)
+        colors = table.pack(self.colors)
+        for start in range(0, len(colors), 5):
+            chunk = colors[start:start + 5]
+            values = table.lookup(chunk, Directions.SOUTH)
+            keys = table.keys[Directions.SOUTH]
+            self.assertLessEqual(len(keys), 16)
+            self.assertTrue(np.all(np.isin(chunk, keys)))
+
+            sprites = table.get_sprites(chunk, Directions.SOUTH)
+            for color, sprite in zip(self.colors[start:start + 5], sprites):
+                self.assertTrue(np.array_equal(
+                    sprite, get_cornerstone(color, Directions.SOUTH)
+                ))
+
+            self.assertEqual(values.shape, (len(chunk), 3))
+
+        self.assertGreater(table.evictions, 0)
+        table.clear()
+        self.assertEqual(len(table), 0)
+
+    def test_limit_holds_for_large_queries(self):
+        table = ColorTable(max_colors=10)
+        colors = table.pack(self.colors * 2)
+        self.assertGreater(len(np.unique(colors)), 10)
+
+        values = table.lookup(colors, Directions.EAST)
+        self.assertLessEqual(len(table.keys[Directions.EAST]), 10)
+        self.assertTrue(np.array_equal(
+            values, ColorTable().lookup(colors, Directions.EAST)
+        ))
+
+        sprites = table.get_sprites(colors, Directions.EAST)
+        self.assertLessEqual(len(table), 10)
+        for color, sprite in zip(self.colors * 2, sprites):
+            self.assertTrue(np.array_equal(
+                sprite, get_cornerstone(color, Directions.EAST)
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests of the compositing engine against drawing one pixel at a time.
+"""
+
+import unittest
+import numpy as np
+from bloxel.composite import Blend, blend, premultiply, unpremultiply
+from bloxel.composite import layers, draw, blit, blit_many
+from bloxel.iso import blend_color
+
+
+def get_colors(rng, count):
+    colors = rng.integers(0, 256, (count, 4)).astype(np.uint8)
+    colors[::3, 3] = 255
+    colors[1::7, 3] = 0
+    return colors
+
+
+def draw_each(canvas, pixels, colors, mode=Blend.LEGACY):
+    """
+    Draws one color after the other, the way the engine must behave.
+    """
+    flat = canvas.reshape(-1, 4)
+    for pixel, color in zip(pixels, colors):
+        flat[pixel] = blend(flat[pixel][None], color[None], mode)[0]
+
+
+class TestBlend(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.dst = get_colors(self.rng, 2000)
+        self.src = get_colors(self.rng, 2000)
+
+    def test_legacy_matches_blend_color(self):
+        expected = [
+            blend_color(tuple(dst), tuple(src))
+            for dst, src in zip(self.dst.tolist(), self.src.tolist())
+        ]
+        self.assertEqual(
+            blend(self.dst, self.src, Blend.LEGACY).tolist(),
+            [list(color) for color in expected]
+        )
+
+    def test_straight(self):
+        out = blend(self.dst, self.src, Blend.STRAIGHT).astype(np.float64)
+        src, dst = self.src / 255.0, self.dst / 255.0
+        alpha = src[:, 3] + dst[:, 3] * (1 - src[:, 3])
+        color = (
+            src[:, :3] * src[:, 3:] + dst[:, :3] * dst[:, 3:]
+            * (1 - src[:, 3:])
+        ) / np.maximum(alpha, 1e-9)[:, None]
+
+        self.assertLessEqual(np.abs(out[:, 3] - alpha * 255).max(), 1)
+        shown = alpha > 0.05
+        self.assertLessEqual(
+            np.abs(out[shown, :3] - color[shown] * 255).max(), 1
+        )
+
+        # Opaque sources replace and clear sources keep what is underneath
+        opaque = self.src[:, 3] == 255
+        self.assertTrue(np.array_equal(out[opaque], self.src[opaque]))
+        clear = self.src[:, 3] == 0
+        self.assertTrue(np.array_equal(
+            out[clear, 3], self.dst[clear, 3].astype(np.float64)
+        ))
+
+    def test_premultiplied(self):
+        out = blend(
+            premultiply(self.dst), premultiply(self.src), Blend.PREMULTIPLIED
+        )
+        straight = blend(self.dst, self.src, Blend.STRAIGHT)
+        self.assertLessEqual(
+            np.abs(out[:, 3].astype(int) - straight[:, 3]).max(), 1
+        )
+        opaque = self.src[:, 3] == 255
+        self.assertTrue(np.array_equal(out[opaque], self.src[opaque]))
+
+    def test_premultiply_round_trip(self):
+        colors = self.src.copy()
+        colors[:, 3] = 255
+        self.assertTrue(
+            np.array_equal(unpremultiply(premultiply(colors)), colors)
+        )
+        self.assertFalse(premultiply(self.src)[self.src[:, 3] == 0].any())
+
+    def test_invalid_mode(self):
+        with self.assertRaises(Exception):
+            blend(self.dst, self.src, 3)
+
+
+class TestDraw(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+
+    def test_layers(self):
+        pixels = np.array([4, 2, 4, 4, 7, 2])
+        self.assertEqual(
+            [layer.tolist() for layer in layers(pixels)],
+            [[0, 1, 4], [2, 5], [3]]
+        )
+        self.assertEqual(layers([]), [])
+
+    def test_repeated_pixels_draw_in_order(self):
+        for mode in (Blend.LEGACY, Blend.STRAIGHT, Blend.PREMULTIPLIED):
+            canvas = get_colors(self.rng, 64).reshape(8, 8, 4)
+            pixels = self.rng.integers(0, 16, 500)
+            colors = get_colors(self.rng, 500)
+
+            expected = canvas.copy()
+            draw_each(expected, pixels, colors, mode)
+            draw(canvas, pixels, colors, mode)
+            self.assertTrue(np.array_equal(canvas, expected), mode)
+
+            # Precomputed layers give the same result
+            again = get_colors(np.random.default_rng(5), 64).reshape(8, 8, 4)
+            expected = again.copy()
+            draw_each(expected, pixels, colors, mode)
+            draw(again, pixels, colors, mode, layers(pixels))
+            self.assertTrue(np.array_equal(again, expected), mode)
+
+
+class TestBlit(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(2)
+        self.sprite = get_colors(self.rng, 20).reshape(4, 5, 4)
+
+    def blit_each(self, canvas, sprite, x, y, mode=Blend.LEGACY):
+        height, width = canvas.shape[:2]
+        for row in range(sprite.shape[0]):
+            for col in range(sprite.shape[1]):
+                color = sprite[row, col]
+                if (
+                    color[3] > 0 and 0 <= x + col < width
+                    and 0 <= y + row < height
+                ):
+                    draw_each(
+                        canvas, [(y + row) * width + x + col], color[None],
+                        mode
+                    )
+
+    def test_clips(self):
+        for x, y in (
+            (0, 0), (-2, -1), (6, 5), (-5, 0), (0, -4), (8, 8), (-9, 3),
+            (3, 7),
+        ):
+            for mode in (Blend.LEGACY, Blend.STRAIGHT):
+                canvas = get_colors(self.rng, 56).reshape(7, 8, 4)
+                expected = canvas.copy()
+                self.blit_each(expected, self.sprite, x, y, mode)
+                blit(canvas, self.sprite, x, y, mode)
+                self.assertTrue(
+                    np.array_equal(canvas, expected), f'({x}, {y}) {mode}'
+                )
+
+    def test_blit_many_draws_in_order(self):
+        sprites = get_colors(self.rng, 30 * 20).reshape(30, 4, 5, 4)
+        offsets = self.rng.integers(-4, 9, (30, 2))
+        canvas = np.zeros((7, 8, 4), dtype=np.uint8)
+        expected = canvas.copy()
+        for sprite, (x, y) in zip(sprites, offsets.tolist()):
+            blit(expected, sprite, x, y)
+
+        blit_many(canvas, sprites, offsets)
+        self.assertTrue(np.array_equal(canvas, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests of projecting whole coordinate arrays against one point at a time.
+"""
+
+import unittest
+import numpy as np
+from bloxel.iso import IsoCoors, Iso, Directions
+
+
+class TestIsoCoors(unittest.TestCase):
+
+    def test_project_matches_get(self):
+        axis = np.arange(-12, 13)
+        x, y, z = np.meshgrid(axis, axis, axis, indexing='ij')
+
+        for tile_size in (1, 3, 4, 7):
+            with self.subTest(tile_size=tile_size):
+                coors = IsoCoors(tile_size)
+                isox, isoy = coors.project(x, y, z)
+                expected = [
+                    coors.get(*point)
+                    for point in zip(x.ravel(), y.ravel(), z.ravel())
+                ]
+                self.assertEqual(
+                    list(zip(isox.ravel(), isoy.ravel())), expected
+                )
+
+    def test_project_broadcasts(self):
+        coors = IsoCoors(4)
+        isox, isoy = coors.project(np.arange(5), 2, [[-1], [1]])
+
+        self.assertEqual(isox.shape, (2, 5))
+        self.assertEqual(isox.dtype, np.int64)
+        self.assertEqual(
+            (isox[1, 3], isoy[1, 3]), coors.get(3, 2, 1)
+        )
+
+    def test_faces_match_get(self):
+        coors = IsoCoors(4)
+        tex = Iso.TEX_WIDTH
+
+        for face in IsoCoors.FACES:
+            for dir in Directions.ALL:
+                isox, isoy = coors.get_face(face, dir)
+                self.assertFalse(isox.flags.writeable)
+                self.assertIs(coors.get_face(face, dir)[0], isox)
+
+                for x_pixel in range(tex):
+                    for y_pixel in range(tex):
+                        point = IsoCoors.get_face_coordinates(
+                            face, dir, x_pixel, y_pixel
+                        )
+                        self.assertEqual(
+                            (isox[x_pixel, y_pixel], isoy[x_pixel, y_pixel]),
+                            coors.get(*point)
+                        )
+
+    def test_invalid_face(self):
+        with self.assertRaisesRegex(Exception, 'Invalid face'):
+            IsoCoors(4).get_face('bottom')
+
+    def test_seed_coordinates(self):
+        coors = IsoCoors(4)
+        coors.seed_coordinates(6, start=-3)
+        self.assertEqual(len(coors.coors), 6 ** 3)
+
+        expected = IsoCoors(4)
+        for point in [(-3, -3, -3), (2, 2, 2), (-1, 0, 2)]:
+            self.assertIn(point, coors.coors)
+            self.assertEqual(coors.get(*point), expected.get(*point))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Tests for the encoders bloxels are saved with.
+"""
+
+import io # Decoding encoded bytes
+import struct # QOI headers
+import tempfile # Saved files
+import unittest # Test cases
+import contextlib # Silencing progress output
+import numpy as np # Test images
+from pathlib import Path # Saved files
+from PIL import Image
+
+from bloxel.iso import * # CLI
+from bloxel.encode import * # Encoders
+from tests.util import * # Textures
+
+
+def decode_qoi(data):
+    """
+    Decodes a QOI file one operation at a time, exactly as the reference
+    decoder does.
+
+    Args:
+        data(bytes): the contents of a QOI file
+    """
+    assert data[:4] == b'qoif' and data[-8:] == QOIEncoder.END
+    width, height = struct.unpack('>II', data[4:12])
+    pixels = []
+    index = [(0, 0, 0, 0)] * 64
+    r, g, b, a = 0, 0, 0, 255
+    position = 14
+
+    while len(pixels) < width * height:
+        op = data[position]
+        position += 1
+
+        if op == QOIEncoder.RGB:
+            r, g, b = data[position:position + 3]
+            position += 3
+        elif op == QOIEncoder.RGBA:
+            r, g, b, a = data[position:position + 4]
+            position += 4
+        elif op & 0xC0 == QOIEncoder.INDEX:
+            r, g, b, a = index[op]
+        elif op & 0xC0 == QOIEncoder.DIFF:
+            r = (r + (op >> 4 & 3) - 2) & 255
+            g = (g + (op >> 2 & 3) - 2) & 255
+            b = (b + (op & 3) - 2) & 255
+        elif op & 0xC0 == QOIEncoder.LUMA:
+            dg = (op & 63) - 32
+            extra = data[position]
+            position += 1
+            r = (r + dg + (extra >> 4) - 8) & 255
+            g = (g + dg) & 255
+            b = (b + dg + (extra & 15) - 8) & 255
+        else:
+            pixels.extend([(r, g, b, a)] * (op & 63))
+
+        index[(r * 3 + g * 5 + b * 7 + a * 11) % 64] = r, g, b, a
+        pixels.append((r, g, b, a))
+
+    assert position == len(data) - 8
+    return np.array(pixels, np.uint8).reshape(height, width, 4)
+
+
+def get_images():
+    """
+    Returns images covering every case the encoders treat differently.
+    """
+    rng = np.random.default_rng(4)
+    images = {}
+
+    # Few colors, with transparent pixels of different colors
+    colors = rng.integers(0, 256, (20, 4), dtype=np.uint8)
+    colors[:5, 3] = 0
+    images['few'] = colors[rng.integers(0, 20, (33, 17))]
+
+    # Too many colors for a palette
+    images['many'] = rng.integers(0, 256, (24, 24, 4), dtype=np.uint8)
+
+    # Small and large steps between neighbours, and runs longer than 62
+    steps = rng.integers(-40, 41, (40 * 40, 4))
+    steps[:, 3] = rng.choice([0, 0, 0, 7], len(steps))
+    steps[rng.random(len(steps)) < 0.3] = 0
+    steps[200:400] = 0
+    images['steps'] = (np.cumsum(steps, axis=0) & 255).astype(
+        np.uint8
+    ).reshape(40, 40, 4)
+
+    images['blank'] = np.zeros((7, 5, 4), np.uint8)
+
+    # A real shaded bloxel
+    sides = [get_texture(rng, 'holes')] * 6
+    images['bloxel'] = np.asarray(Iso(4).get_scalar_bloxel(0, *sides))
+
+    return images
+
+
+class TestEncoders(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.images = get_images()
+
+    def check(self, encoder, decode):
+        for name, pixels in self.images.items():
+            with self.subTest(image=name):
+                data = encoder.encode(Image.fromarray(pixels, 'RGBA'))
+                decoded = np.asarray(decode(data).convert('RGBA'))
+                self.assertTrue(np.array_equal(decoded, pixels))
+
+    def test_png(self):
+        for level in (0, 6, 9):
+            self.check(PNGEncoder(level), lambda data: Image.open(
+                io.BytesIO(data)
+            ))
+
+    def test_palette(self):
+        self.check(PNGEncoder(palette=True), lambda data: Image.open(
+            io.BytesIO(data)
+        ))
+
+        encoder = PNGEncoder(palette=True)
+        for name, mode in (('few', 'P'), ('many', 'RGBA')):
+            image = Image.fromarray(self.images[name], 'RGBA')
+            data = encoder.encode(image)
+            self.assertEqual(Image.open(io.BytesIO(data)).mode, mode)
+
+    def test_raw(self):
+        self.check(RawEncoder(), RawEncoder.decode)
+
+        with self.assertRaisesRegex(Exception, 'not a raw'):
+            RawEncoder.decode(b'PNG' + bytes(20))
+
+    def test_qoi(self):
+        self.check(QOIEncoder(), lambda data: Image.fromarray(
+            decode_qoi(data), 'RGBA'
+        ))
+        self.check(QOIEncoder(), lambda data: Image.open(io.BytesIO(data)))
+
+    def test_get(self):
+        for format in Encoder.FORMATS:
+            self.assertIsInstance(Encoder.get(format), Encoder)
+
+        self.assertTrue(Encoder.get('palette').palette)
+        self.assertEqual(Encoder.get('png', 1).compress_level, 1)
+
+        with self.assertRaisesRegex(Exception, 'Invalid format'):
+            Encoder.get('gif')
+
+    def test_encode_is_required(self):
+        class Incomplete(Encoder):
+            EXTENSION = '.bin'
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_batch(self):
+        texture = EXAMPLES / 'res' / 'Texture-Map.png'
+        decoders = {
+            'png': lambda data: Image.open(io.BytesIO(data)),
+            'raw': RawEncoder.decode,
+            'qoi': lambda data: Image.open(io.BytesIO(data)),
+        }
+
+        sprites = list(CLI.iter_blockfile_batch(
+            [True] * 4, EXAMPLES / 'example.blockfile', texture, 2, 2
+        ))
+
+        for format, decode in decoders.items():
+            encoder = Encoder.get(format)
+            with tempfile.TemporaryDirectory() as path:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    CLI.process_blockfile_batch(
+                        Path(path), [True] * 4,
+                        EXAMPLES / 'example.blockfile', texture, 2, 2,
+                        encoder=encoder
+                    )
+
+                files = sorted(Path(path).iterdir())
+                self.assertEqual(len(files), len(sprites))
+
+                for name, dir, sprite in sprites:
+                    filename = Iso(4, encoder).get_filename(
+                        dir, name, Path(path)
+                    )
+                    decoded = decode(Path(filename).read_bytes())
+                    self.assertTrue(np.array_equal(
+                        np.asarray(decoded.convert('RGBA')),
+                        np.asarray(sprite)
+                    ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Pixel-equality tests of occlusion culling against drawing every part of
+every voxel.
+"""
+
+import unittest
+import numpy as np
+from bloxel.iso import Iso, Directions
+from bloxel.chunks import VoxelIndex
+
+
+def get_model(size=16, seed=0):
+    """
+    Returns a solid ball of voxels with a few colors, some of them
+    translucent, and a few stray voxels around it.
+    """
+    rng = np.random.default_rng(seed)
+    xyz = np.stack(np.mgrid[:size, :size, :size], -1).reshape(-1, 3)
+    center = (size - 1) / 2
+    ball = xyz[((xyz - center) ** 2).sum(axis=1) <= (size / 2) ** 2]
+    stray = xyz[rng.random(len(xyz)) < 0.05]
+    xyz = np.unique(np.concatenate([ball, stray]), axis=0)
+
+    palette = np.array([
+        (200, 30, 30, 255),
+        (30, 200, 30, 255),
+        (30, 30, 200, 255),
+        (250, 250, 250, 120),
+        (10, 10, 10, 40),
+    ])
+    voxels = np.empty(len(xyz), dtype=Iso.VOXEL)
+    voxels['xyz'] = xyz
+    voxels['color'] = palette[rng.choice(len(palette), len(xyz),
+        p=(0.3, 0.3, 0.3, 0.05, 0.05))]
+    return voxels
+
+
+class TestCulling(unittest.TestCase):
+
+    def setUp(self):
+        self.iso = Iso(4)
+
+    def assertPixelsEqual(self, a, b):
+        a, b = np.asarray(a), np.asarray(b)
+        self.assertEqual(a.shape, b.shape)
+        self.assertEqual(int(np.count_nonzero((a != b).any(axis=-1))), 0)
+
+    def test_culled_matches_unculled(self):
+        width = Iso.CANVAS_WIDTH
+        box = (0, 0, width, width)
+        for seed in range(3):
+            voxels = get_model(seed=seed)
+            index = VoxelIndex(voxels)
+            for dir in Directions.ALL:
+                shown, depths, hidden = self.iso.cull_voxels(
+                    dir, voxels, index
+                )
+
+                # A solid ball hides most of its voxels
+                self.assertLess(len(shown), len(voxels))
+                self.assertTrue(hidden.any())
+
+                self.assertPixelsEqual(
+                    self.iso.draw_voxels(
+                        dir, voxels[shown], box, depths[shown], hidden[shown]
+                    ),
+                    self.iso.draw_voxels(dir, voxels, box)
+                )
+                self.assertPixelsEqual(
+                    self.iso.get_multipart_bloxel(dir, voxels, index),
+                    self.iso.draw_voxels(dir, voxels, box)
+                )
+
+    def test_translucent_neighbors_never_hide(self):
+        voxels = get_model()
+        voxels['color'][:, 3] = 128
+        for dir in Directions.ALL:
+            shown, _, hidden = self.iso.cull_voxels(dir, voxels)
+            self.assertEqual(len(shown), len(voxels))
+            self.assertFalse(hidden.any())
+
+    def test_no_occluders(self):
+        iso = Iso(2)
+        voxels = get_model()
+        for dir in Directions.ALL:
+            self.assertIsNone(iso.get_occluders(dir))
+            shown, _, hidden = iso.cull_voxels(dir, voxels)
+            self.assertEqual(len(shown), len(voxels))
+            self.assertFalse(hidden.any())
+
+    def test_occluders(self):
+        for dir in Directions.ALL:
+            occluders = self.iso.get_occluders(dir)
+            self.assertEqual(len(occluders), 3)
+            for covers in occluders:
+                self.assertTrue(covers)
+                for cover in covers:
+                    self.assertLess(cover, 1 << len(VoxelIndex.OFFSETS))
+
+    def test_multipart_tiles_with_jobs(self):
+        voxels = get_model(24, seed=5)
+        index = VoxelIndex(voxels)
+        serial = list(self.iso.iter_multipart_tiles(
+            Directions.EAST, voxels, 32, index
+        ))
+        parallel = list(self.iso.iter_multipart_tiles(
+            Directions.EAST, voxels, 32, index, jobs=2
+        ))
+        self.assertEqual(
+            [tile[:3] for tile in serial], [tile[:3] for tile in parallel]
+        )
+        for a, b in zip(serial, parallel):
+            self.assertPixelsEqual(a[3], b[3])
+
+    def test_empty_model(self):
+        voxels = np.empty(0, dtype=Iso.VOXEL)
+        self.assertEqual(self.iso.get_multipart_image(0, voxels).size, (0, 0))
+        self.assertFalse(
+            np.asarray(self.iso.get_multipart_bloxel(0, voxels)).any()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests of incremental builds recorded in a Build.json manifest.
+"""
+
+import io
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import contextlib
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from PIL import Image
+from bloxel.iso import Iso, main
+from bloxel.manifest import BuildManifest
+from tests.util import EXAMPLES
+
+
+class TestIncrementalBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp.name)
+        self.out = self.path / 'out'
+        self.texture = self.path / 'Texture-Map.png'
+        self.blockfile = self.path / 'blocks.blockfile'
+        shutil.copy(EXAMPLES / 'res' / 'Texture-Map.png', self.texture)
+        shutil.copy(EXAMPLES / 'example.blockfile', self.blockfile)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def build(self, *options):
+        """
+        Runs an incremental blockfile batch and returns the number of
+        bloxels rendered along with the contents of every output file.
+        """
+        argv = [
+            'bloxel', '-o', str(self.out), '-a', '-t', str(self.texture),
+            '2', '2', str(self.blockfile), '--incremental', *options
+        ]
+        render_batch = Iso.render_batch
+        rendered = []
+
+        def count(iso, sides, directions, **kwargs):
+            rendered.extend([len(directions)] * len(sides))
+            return render_batch(iso, sides, directions, **kwargs)
+
+        with mock.patch.object(sys, 'argv', argv), \
+            mock.patch.object(Iso, 'render_batch', count), \
+            contextlib.redirect_stdout(io.StringIO()):
+            main()
+
+        files = {
+            filename.name: filename.read_bytes()
+            for filename in sorted(self.out.iterdir())
+        }
+        return sum(rendered), files
+
+    def edit_tile(self, x, y):
+        with Image.open(self.texture) as image:
+            pixels = np.array(image.convert('RGBA'))
+        pixels[y * 16:(y + 1) * 16, x * 16:(x + 1) * 16, :3] //= 2
+        Image.fromarray(pixels).save(self.texture)
+
+    def test_unchanged(self):
+        rendered, files = self.build()
+        self.assertEqual(rendered, 9 * 4)
+        self.assertIn(BuildManifest.NAME, files)
+        self.assertEqual(len(files), 9 * 4 + 1)
+
+        stamps = {
+            name: (self.out / name).stat().st_mtime_ns for name in files
+        }
+        rendered, again = self.build()
+        self.assertEqual(rendered, 0)
+        self.assertEqual(again, files)
+        self.assertEqual(stamps, {
+            name: (self.out / name).stat().st_mtime_ns for name in files
+        })
+
+    def test_changed_tile(self):
+        rendered, before = self.build()
+        self.edit_tile(1, 1)
+        rendered, after = self.build()
+
+        # Only the blocks with a side of tile 3 are rendered again
+        using = {'Bloxel4', 'Bloxel8', 'Bloxel9'}
+        self.assertEqual(rendered, len(using) * 4)
+
+        changed = {
+            name for name in before
+            if name != BuildManifest.NAME and before[name] != after[name]
+        }
+        # Some directions of a block may not show the edited side at all
+        self.assertLessEqual(changed, {
+            f'Bloxel-{name}-{dir}.png' for name in using for dir in 'NESW'
+        })
+        self.assertEqual({name.split('-')[1] for name in changed}, using)
+
+    def test_changed_instruction(self):
+        self.build()
+        lines = self.blockfile.read_text().splitlines()
+        lines[0] = '3 # Bloxel1'
+        self.blockfile.write_text('\n'.join(lines))
+
+        rendered, files = self.build()
+        self.assertEqual(rendered, 4)
+
+    def test_removes_only_previous_outputs(self):
+        self.build()
+        (self.out / 'notes.txt').write_text('Not part of the build')
+
+        lines = self.blockfile.read_text().splitlines()
+        self.blockfile.write_text('\n'.join(lines[:-1]))
+        rendered, files = self.build()
+
+        self.assertEqual(rendered, 0)
+        self.assertIn('notes.txt', files)
+        self.assertFalse(any('Bloxel9' in name for name in files))
+        self.assertEqual(len(files), 8 * 4 + 2)
+
+        data = json.loads(files[BuildManifest.NAME])
+        self.assertNotIn('Bloxel9-N', data['outputs'])
+        self.assertNotIn('notes.txt', data['files'])
+
+    def test_missing_file(self):
+        self.build()
+        (self.out / 'Bloxel-Bloxel5-E.png').unlink()
+
+        rendered, files = self.build()
+        self.assertEqual(rendered, 4)
+        self.assertIn('Bloxel-Bloxel5-E.png', files)
+
+    def test_atlas(self):
+        self.build('--atlas')
+        self.edit_tile(0, 1)
+        rendered, files = self.build('--atlas')
+
+        # Bloxel3, 6, 7, 8 and 9 use tile 2
+        self.assertEqual(rendered, 5 * 4)
+
+        # The repacked atlas matches an atlas built from scratch
+        shutil.rmtree(self.out)
+        rendered, expected = self.build('--atlas')
+        self.assertEqual(rendered, 9 * 4)
+        self.assertEqual(files.keys(), expected.keys())
+
+        for name in files:
+            if name.endswith('.png'):
+                with Image.open(io.BytesIO(files[name])) as image:
+                    pixels = np.asarray(image)
+                with Image.open(io.BytesIO(expected[name])) as image:
+                    self.assertTrue(np.array_equal(pixels, np.asarray(image)))
+            else:
+                self.assertEqual(files[name], expected[name])
+
+    def test_write(self):
+        filename = self.path / 'file.bin'
+        self.assertTrue(BuildManifest.write(b'abc', filename))
+        self.assertFalse(BuildManifest.write(b'abc', filename))
+        self.assertTrue(BuildManifest.write(b'abd', filename))
+        self.assertEqual(filename.read_bytes(), b'abd')
+        self.assertEqual(list(self.path.glob('*.tmp')), [])
+
+
+    def test_write_from_threads(self):
+        filename = self.path / 'file.bin'
+        errors = []
+
+        def worker(i):
+            try:
+                for j in range(50):
+                    BuildManifest.write(bytes([i, j]) * 100, filename)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,)) for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(filename.read_bytes()), 200)
+        self.assertEqual(list(self.path.glob('*.tmp')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
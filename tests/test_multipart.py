@@ -0,0 +1,270 @@
+"""
+Tests of rendering multipart bloxels against reference images.
+"""
+
+import io
+import sys
+import json
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+import numpy as np
+from pathlib import Path
+from PIL import Image
+from bloxel.iso import Iso, Directions, CLI, main
+from tests.util import get_models, load_reference
+
+
+class TestMultipart(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.iso = Iso(4)
+        cls.models = get_models()
+        cls.reference = load_reference('multipart')
+
+    def assertPixelsEqual(self, a, b):
+        a, b = np.asarray(a), np.asarray(b)
+        self.assertEqual(a.shape, b.shape)
+        self.assertEqual(int(np.count_nonzero((a != b).any(axis=-1))), 0)
+
+    def test_matches_reference(self):
+        for name, voxels in self.models.items():
+            for dir in Directions.ALL:
+                with self.subTest(model=name, dir=dir):
+                    self.assertPixelsEqual(
+                        self.iso.get_multipart_bloxel(dir, voxels),
+                        self.reference[f'{name}_{dir}']
+                    )
+
+    def test_input_forms(self):
+        voxels = self.models['scattered']
+        original = list(voxels)
+        array = Iso.get_voxels(voxels)
+
+        for dir in Directions.ALL:
+            expected = self.reference[f'scattered_{dir}']
+            self.assertPixelsEqual(
+                self.iso.get_multipart_bloxel(dir, array), expected
+            )
+            self.assertPixelsEqual(
+                self.iso.get_multipart_bloxel(dir, np.array(voxels)), expected
+            )
+
+        # Neither the list nor the array is sorted in place
+        self.assertEqual(voxels, original)
+        self.assertTrue(np.array_equal(array, Iso.get_voxels(original)))
+
+    def test_empty(self):
+        image = np.asarray(self.iso.get_multipart_bloxel(Directions.EAST, []))
+        self.assertEqual(image.shape, (Iso.CANVAS_WIDTH,) * 2 + (4,))
+        self.assertFalse(image.any())
+
+    def test_get_voxels(self):
+        voxels = Iso.get_voxels([
+            (1, 2, 3, 4, 5, 6, 7), (-1, 0, 9, 0, 0, 0, 0)
+        ])
+        self.assertEqual(voxels.dtype, Iso.VOXEL)
+        self.assertEqual(voxels['xyz'].tolist(), [[1, 2, 3], [-1, 0, 9]])
+        self.assertEqual(voxels['color'][0].tolist(), [4, 5, 6, 7])
+
+        # Arrays of voxels are used as they are
+        self.assertIs(Iso.get_voxels(voxels), voxels)
+
+    def test_read_voxels(self):
+        voxels = self.models['solid'][:20]
+        with tempfile.TemporaryDirectory() as path:
+            filename = Path(path) / 'model.bloxel'
+            filename.write_text('\n'.join(
+                ' '.join(map(str, voxel)) for voxel in voxels
+            ))
+            self.assertTrue(np.array_equal(
+                Iso.read_voxels(filename), Iso.get_voxels(voxels)
+            ))
+
+            filename.write_text('1 2 3 4 5 6 7\n1 2 3\n')
+            with self.assertRaisesRegex(Exception, 'Line 2 .* 3 values'):
+                Iso.read_voxels(filename)
+
+    def test_depths_are_distinct(self):
+        voxels = Iso.get_voxels(self.models['scattered'])
+        for dir in Directions.ALL:
+            depths = Iso.get_voxel_depths(dir, voxels)
+            self.assertEqual(len(np.unique(depths)), len(voxels))
+
+
+def get_ball(size=24, seed=0):
+    """
+    Returns a ball of voxels with a few translucent colors and a few stray
+    voxels around it, reaching past every side of the canvas.
+    """
+    rng = np.random.default_rng(seed)
+    xyz = np.stack(np.mgrid[:size, :size, :size], -1).reshape(-1, 3)
+    center = (size - 1) / 2
+    ball = xyz[((xyz - center) ** 2).sum(axis=1) <= (size / 2) ** 2]
+    stray = xyz[rng.random(len(xyz)) < 0.02]
+    xyz = np.unique(np.concatenate([ball, stray]), axis=0) - size // 3
+
+    palette = np.array([
+        (200, 30, 30, 255),
+        (30, 200, 30, 255),
+        (250, 250, 250, 120),
+        (10, 10, 10, 40),
+    ])
+    voxels = np.empty(len(xyz), dtype=Iso.VOXEL)
+    voxels['xyz'] = xyz
+    voxels['color'] = palette[
+        rng.choice(len(palette), len(xyz), p=(0.45, 0.45, 0.05, 0.05))
+    ]
+    return voxels
+
+
+class TestMultipartTiles(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.iso = Iso(4)
+        cls.voxels = get_ball()
+
+    def assertPixelsEqual(self, a, b):
+        a, b = np.asarray(a), np.asarray(b)
+        self.assertEqual(a.shape, b.shape)
+        self.assertEqual(int(np.count_nonzero((a != b).any(axis=-1))), 0)
+
+    def test_stitched_tiles_match_whole_draw(self):
+        for dir in Directions.ALL:
+            bounds = self.iso.get_multipart_bounds(dir, self.voxels)
+            left, upper, right, lower = bounds
+            self.assertTrue(right - left > Iso.CANVAS_WIDTH)
+
+            expected = self.iso.draw_voxels(dir, self.voxels, bounds)
+            for tile_size in (7, 64, 1000):
+                with self.subTest(dir=dir, tile_size=tile_size):
+                    self.assertPixelsEqual(
+                        self.iso.get_multipart_image(
+                            dir, self.voxels, tile_size
+                        ),
+                        expected
+                    )
+
+    def test_tiles_cover_bounds(self):
+        dir = Directions.SOUTH
+        left, upper, right, lower = self.iso.get_multipart_bounds(
+            dir, self.voxels
+        )
+        covered = np.zeros((lower - upper, right - left), dtype=int)
+
+        for column, row, box, indexes in self.iso.get_multipart_tiles(
+            dir, self.voxels, 16
+        ):
+            self.assertEqual(box[:2], (left + column * 16, upper + row * 16))
+            covered[
+                box[1] - upper:box[3] - upper, box[0] - left:box[2] - left
+            ] += 1
+
+        # Tiles never overlap, and only empty tiles are left out
+        self.assertLessEqual(covered.max(), 1)
+        image = np.asarray(
+            self.iso.get_multipart_image(dir, self.voxels, 16)
+        )
+        self.assertFalse(image[covered == 0].any())
+
+    def test_jobs(self):
+        dir = Directions.EAST
+        serial = list(self.iso.iter_multipart_tiles(dir, self.voxels, 32))
+        pooled = list(
+            self.iso.iter_multipart_tiles(dir, self.voxels, 32, jobs=2)
+        )
+        self.assertEqual(len(serial), len(pooled))
+
+        for (*a, image_a), (*b, image_b) in zip(serial, pooled):
+            self.assertEqual(a, b)
+            self.assertPixelsEqual(image_a, image_b)
+
+    def test_canvas_box(self):
+        for name, voxels in get_models().items():
+            for dir in Directions.ALL:
+                self.assertPixelsEqual(
+                    self.iso.draw_voxels(
+                        dir, Iso.get_voxels(voxels),
+                        (0, 0, Iso.CANVAS_WIDTH, Iso.CANVAS_WIDTH)
+                    ),
+                    self.iso.get_multipart_bloxel(dir, voxels)
+                )
+
+    def test_cli(self):
+        voxels = self.voxels[::3]
+        with tempfile.TemporaryDirectory() as path:
+            path = Path(path)
+            bloxfile = path / 'model.bloxel'
+            bloxfile.write_text('\n'.join(
+                ' '.join(map(str, [*voxel['xyz'], *voxel['color']]))
+                for voxel in voxels
+            ))
+
+            stitched, tiled, parallel = (
+                path / name for name in ('stitched', 'tiled', 'parallel')
+            )
+            for out in (stitched, tiled, parallel):
+                out.mkdir()
+
+            dirs = [True, False, True, False]
+            CLI.output_multipart_tiles(stitched, 'Ball', dirs, bloxfile, 32,
+                stitch=True
+            )
+            CLI.output_multipart_tiles(tiled, 'Ball', dirs, bloxfile, 32)
+            CLI.output_multipart_tiles(parallel, 'Ball', dirs, bloxfile, 32,
+                jobs=2
+            )
+
+            for dir, letter in ((0, 'N'), (2, 'S')):
+                with Image.open(stitched / f'Bloxel-Ball-{letter}.png') as im:
+                    expected = np.asarray(im)
+                self.assertPixelsEqual(
+                    expected, self.iso.get_multipart_image(dir, voxels)
+                )
+
+                # Placing every tile where its layout says gives the same
+                for out in (tiled, parallel):
+                    with open(out / f'Bloxel-Ball-{letter}.json') as file:
+                        layout = json.load(file)
+
+                    image = np.zeros_like(expected)
+                    for tile in layout['tiles']:
+                        with Image.open(out / tile['file']) as im:
+                            pixels = np.asarray(im)
+                        height, width = pixels.shape[:2]
+                        image[
+                            tile['y']:tile['y'] + height,
+                            tile['x']:tile['x'] + width
+                        ] = pixels
+
+                    self.assertEqual(
+                        (layout['width'], layout['height']),
+                        expected.shape[1::-1]
+                    )
+                    self.assertPixelsEqual(image, expected)
+
+    def test_invalid_tile_size(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = Path(path)
+            bloxfile = path / 'model.bloxel'
+            bloxfile.write_text('0 0 0 255 0 0 255')
+
+            for tile_size in ('0', '-5', 'abc'):
+                argv = [
+                    'bloxel', '-o', str(path), '-b', 'Ball', '-B',
+                    str(bloxfile), f'--tile-size={tile_size}'
+                ]
+                with self.subTest(tile_size=tile_size), \
+                        mock.patch.object(sys, 'argv', argv), \
+                        contextlib.redirect_stdout(io.StringIO()), \
+                        self.assertRaisesRegex(Exception, 'tile size'):
+                    main()
+
+            self.assertEqual(list(path.glob('Bloxel-*')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests of the on-disk cache of rendered files.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from bloxel.rendercache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = Path(self.dir.name)
+        self.cache = RenderCache(self.path / 'cache', max_bytes=1000)
+
+    def write(self, name, size):
+        filename = self.path / name
+        filename.write_bytes(name.encode().ljust(size, b'.'))
+        return filename
+
+    def put(self, name, size, mtime):
+        key = RenderCache.key(name)
+        self.cache.put(key, self.write(name, size))
+        os.utime(self.cache.entry(key), (mtime, mtime))
+        return key
+
+    def test_round_trip(self):
+        key = RenderCache.key('a', 1)
+        self.assertNotEqual(key, RenderCache.key('a', 2))
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(self.cache.fetch(key, self.path / 'out'))
+
+        self.cache.put(key, self.write('a', 100))
+        self.assertTrue(self.cache.fetch(key, self.path / 'out'))
+        self.assertEqual(
+            (self.path / 'out').read_bytes(), (self.path / 'a').read_bytes()
+        )
+        self.assertEqual(self.cache.size, 100)
+
+        # Reopening the cache finds its entries again
+        cache = RenderCache(self.path / 'cache')
+        self.assertEqual(cache.size, 100)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_evicts_least_recently_used(self):
+        keys = [self.put(name, 300, mtime) for mtime, name in enumerate('abc')]
+
+        # Using 'a' makes 'b' the least recently used entry
+        os.utime(self.cache.entry(keys[0]), (10, 10))
+        self.put('d', 300, 20)
+
+        found = [self.cache.get(key) is not None for key in keys]
+        self.assertEqual(found, [True, False, True])
+        self.assertLessEqual(self.cache.size, 900)
+        self.assertEqual(
+            self.cache.size,
+            sum(entry.stat().st_size for entry in self.cache.entries())
+        )
+
+    def test_replace_counts_once(self):
+        self.put('a', 300, 0)
+        self.put('a', 200, 1)
+        self.assertEqual(self.cache.size, 200)
+
+    def test_threads(self):
+        sources = [self.write(str(i), 50) for i in range(8)]
+        errors = []
+
+        def worker():
+            try:
+                for i in range(40):
+                    source = sources[i % len(sources)]
+                    self.cache.put(RenderCache.key(i % 12), source)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            self.cache.size,
+            sum(entry.stat().st_size for entry in self.cache.entries())
+        )
+        self.assertEqual(list(self.cache.path.glob('??/*.tmp')), [])
+
+    def test_clear(self):
+        self.put('a', 300, 0)
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+        self.assertEqual(list(self.cache.entries()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Pixel-equality tests of scalar bloxels against the per-texel renderer.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from bloxel.iso import CLI, Iso, Directions, RenderPlan
+from tests.util import EXAMPLES, get_cases, load_reference
+
+
+class TestScalarBloxel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cases = get_cases()
+        cls.reference = load_reference('scalar')
+
+    def test_matches_reference(self):
+        iso = Iso(4)
+        for name, sides in self.cases.items():
+            for dir in Directions.ALL:
+                bloxel = iso.get_scalar_bloxel(dir, *sides)
+                self.assertEqual(bloxel.mode, 'RGBA')
+                self.assertTrue(
+                    np.array_equal(
+                        np.asarray(bloxel), self.reference[f'{name}_{dir}']
+                    ),
+                    f'{name} in direction {dir}'
+                )
+
+    def test_all_directions_at_once(self):
+        iso = Iso(4)
+        dirs = [Directions.WEST, Directions.NORTH, Directions.SOUTH]
+        for name, sides in self.cases.items():
+            bloxels = iso.get_scalar_bloxels(dirs, *sides)
+            self.assertEqual(len(bloxels), len(dirs))
+            for dir, bloxel in zip(dirs, bloxels):
+                self.assertTrue(np.array_equal(
+                    np.asarray(bloxel), self.reference[f'{name}_{dir}']
+                ))
+
+    def test_cli_saves_every_direction(self):
+        with tempfile.TemporaryDirectory() as path:
+            CLI.output_scalar_bloxel_same_sides(
+                Path(path), 'Grass', [False, True, True, True],
+                str(EXAMPLES / 'res' / 'Grass.png')
+            )
+            self.assertEqual(
+                sorted(file.name for file in Path(path).iterdir()),
+                ['Bloxel-Grass-E.png', 'Bloxel-Grass-S.png',
+                    'Bloxel-Grass-W.png']
+            )
+            for dir in (Directions.EAST, Directions.SOUTH, Directions.WEST):
+                filename = Path(path) / f'Bloxel-Grass-{"NESW"[dir]}.png'
+                with Image.open(filename) as image:
+                    self.assertTrue(np.array_equal(
+                        np.asarray(image.convert('RGBA')),
+                        self.reference[f'grass_{dir}']
+                    ))
+
+    def test_plans_are_compiled_once(self):
+        plan = RenderPlan.get(Directions.EAST, True, 4)
+        self.assertIs(plan, RenderPlan.get(Directions.EAST, True, 4))
+        self.assertIsNot(plan, RenderPlan.get(Directions.EAST, False, 4))
+
+    def test_layers_never_repeat_pixels(self):
+        for draw_all_sides in (False, True):
+            plan = RenderPlan.get(Directions.SOUTH, draw_all_sides, 4)
+            covered = 0
+            for layer in plan.layers:
+                pixels = plan.pixels[layer]
+                self.assertEqual(len(np.unique(pixels)), len(pixels))
+                covered += len(pixels)
+
+            self.assertEqual(covered, len(plan.pixels))
+            if not draw_all_sides:
+                self.assertEqual(len(plan.layers), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Tests of composing scenes of blocks against blitting every block's sprite.
+"""
+
+import io
+import sys
+import json
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+import numpy as np
+from pathlib import Path
+from bloxel.iso import Iso, Scene, Directions, main
+from bloxel.composite import blit
+from bloxel.encode import Encoder
+from tests.util import get_texture
+
+
+def get_blocks(rng, count, names, low=(-20, -2, -20), high=(20, 3, 20)):
+    """
+    Returns blocks with random names at random positions spanning a few
+    chunks.
+    """
+    xyz = rng.integers(low, high, (count, 3)).tolist()
+    return {tuple(pos): names[rng.integers(len(names))] for pos in xyz}
+
+
+class TestScene(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.iso = Iso(4)
+        cls.textures = {
+            'stone': [get_texture(rng)] * 6,
+            'glass': [get_texture(rng, 'translucent')] * 6,
+            'leaves': [get_texture(rng, 'holes') for _ in range(6)],
+        }
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+        self.scene = Scene.from_textures(self.textures, self.iso)
+
+    def compose(self, blocks, dir):
+        """
+        Blits the sprite of every block one at a time from the furthest to
+        the nearest.
+        """
+        positions = sorted(blocks)
+        distances = Iso.get_distance(dir, positions).tolist()
+        width = Iso.TEX_WIDTH
+        placed = []
+        for distance, (x, y, z) in sorted(zip(distances, positions)):
+            rx, rz = ((x, z), (-z, x), (-x, -z), (z, -x))[dir]
+            ix, iy = self.iso.coors.get(rx * width, rz * width, y * width)
+            placed.append((ix, iy, blocks[x, y, z]))
+
+        left = min(ix for ix, _, _ in placed)
+        upper = min(iy for _, iy, _ in placed)
+        right = max(ix for ix, _, _ in placed) + Iso.CANVAS_WIDTH
+        lower = max(iy for _, iy, _ in placed) + Iso.CANVAS_WIDTH
+
+        canvas = np.zeros((lower - upper, right - left, 4), dtype=np.uint8)
+        for ix, iy, name in placed:
+            sprite = np.asarray(
+                self.iso.get_scalar_bloxel(dir, *self.textures[name])
+            )
+            blit(canvas, sprite, ix - left, iy - upper)
+        return canvas
+
+    def assertPixelsEqual(self, a, b):
+        a, b = np.asarray(a), np.asarray(b)
+        self.assertEqual(a.shape, b.shape)
+        self.assertEqual(int(np.count_nonzero((a != b).any(axis=-1))), 0)
+
+    def test_matches_blitting_each_block(self):
+        blocks = get_blocks(self.rng, 150, list(self.textures))
+        self.scene.update(blocks)
+        self.assertEqual(len(self.scene), len(blocks))
+
+        for dir in Directions.ALL:
+            with self.subTest(dir=dir):
+                self.assertPixelsEqual(
+                    self.scene.render(dir), self.compose(blocks, dir)
+                )
+
+    def test_sprites_load_once(self):
+        load = mock.Mock(wraps=self.scene.load)
+        self.scene.load = load
+        self.scene.update(get_blocks(self.rng, 60, list(self.textures)))
+        for dir in Directions.ALL:
+            self.scene.render(dir)
+
+        self.assertEqual(load.call_count, len(self.textures) * 4)
+
+    def test_edit_redraws_only_its_chunk(self):
+        blocks = get_blocks(self.rng, 150, list(self.textures))
+        self.scene.update(blocks)
+        for dir in Directions.ALL:
+            self.scene.render(dir)
+
+        # Replace and remove blocks inside of the bounds of the scene
+        xyz = next(iter(blocks))
+        edits = {xyz: 'glass' if blocks[xyz] != 'glass' else 'stone'}
+        edits[next(pos for pos in blocks if pos != xyz)] = None
+        blocks.update(edits)
+        blocks = {pos: name for pos, name in blocks.items() if name}
+        chunks = {Scene.get_chunk(*pos) for pos in edits}
+        self.scene.update(edits)
+
+        draw = mock.Mock(wraps=self.scene.draw)
+        with mock.patch.object(self.scene, 'draw', draw):
+            for dir in Directions.ALL:
+                with self.subTest(dir=dir):
+                    draw.reset_mock()
+                    image = self.scene.render(dir)
+                    self.assertPixelsEqual(image, self.compose(blocks, dir))
+
+                    # Only the areas of the edited chunks are drawn again
+                    self.assertIn(draw.call_count, range(1, len(chunks) + 1))
+                    bounds = self.scene.get_bounds(dir)
+                    for call in draw.call_args_list:
+                        box = call.args[1]
+                        self.assertTrue(any(
+                            Scene.is_inside(
+                                box, self.scene.get_chunk_box(dir, chunk)
+                            )
+                            for chunk in chunks
+                        ))
+                        self.assertNotEqual(box, bounds)
+
+    def test_grid(self):
+        grid = [[['stone', None], ['', 'glass']], [[None, None], [None, None]]]
+        blocks = Scene.get_grid_blocks(grid, (1, 2, 3))
+        self.assertEqual(blocks, {(1, 2, 3): 'stone', (1, 3, 4): 'glass'})
+
+        with self.assertRaises(Exception):
+            Scene.get_grid_blocks([['stone']])
+
+    def test_from_path(self):
+        blocks = get_blocks(self.rng, 40, list(self.textures))
+        with tempfile.TemporaryDirectory() as path:
+            for name, textures in self.textures.items():
+                for dir in Directions.ALL:
+                    self.iso.save(
+                        self.iso.get_scalar_bloxel(dir, *textures), dir,
+                        name, Path(path)
+                    )
+
+            scene_file = Path(path) / 'scene.json'
+            scene_file.write_text(json.dumps({
+                'blocks': [[*xyz, name] for xyz, name in blocks.items()]
+            }))
+
+            scene = Scene.from_path(path, self.iso)
+            scene.update(Scene.read_blocks(scene_file))
+            for dir in Directions.ALL:
+                self.assertPixelsEqual(
+                    scene.render(dir), self.compose(blocks, dir)
+                )
+
+    def test_cli_format(self):
+        blocks = get_blocks(self.rng, 20, list(self.textures))
+        for format in ('raw', 'qoi'):
+            iso = Iso(4, Encoder.get(format))
+            with self.subTest(format=format), \
+                    tempfile.TemporaryDirectory() as path:
+                path = Path(path)
+                for name, textures in self.textures.items():
+                    iso.save(
+                        iso.get_scalar_bloxel(Directions.EAST, *textures),
+                        Directions.EAST, name, path
+                    )
+
+                scene_file = path / 'scene.json'
+                scene_file.write_text(json.dumps({
+                    'blocks': [[*xyz, name] for xyz, name in blocks.items()]
+                }))
+
+                argv = [
+                    'bloxel', '-o', str(path / 'out'), '-e', '-b', 'House',
+                    f'--scene={scene_file}', f'--sprites={path}',
+                    f'--format={format}'
+                ]
+                with mock.patch.object(sys, 'argv', argv), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    main()
+
+                # The structure is saved in the format its sprites were read in
+                filename = iso.get_filename(
+                    Directions.EAST, 'House', path / 'out'
+                )
+                self.assertEqual(filename.suffix, iso.encoder.EXTENSION)
+                self.assertPixelsEqual(
+                    Scene.read_sprite(filename),
+                    self.compose(blocks, Directions.EAST)
+                )
+
+    def test_empty(self):
+        with self.assertRaisesRegex(Exception, 'any blocks'):
+            self.scene.render(Directions.NORTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
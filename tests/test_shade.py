@@ -0,0 +1,109 @@
+"""
+Tests of the vectorized shading against the original per-pixel tinting.
+"""
+
+import unittest
+import numpy as np
+from PIL import Image, ImageOps
+from bloxel.iso import Shade, Cornerstone, Directions, Sides, tint_image
+from tests.test_colortable import get_cornerstone
+
+
+def tint_legacy(src, color):
+    """
+    Tints an image the way the renderer originally did, one pixel at a time.
+    """
+    _, _, _, alpha = src.split()
+    gray = ImageOps.grayscale(src)
+    result = ImageOps.colorize(gray, (0, 0, 0, 0), color[:3])
+
+    if len(color) > 3:
+        for x in range(alpha.width):
+            for y in range(alpha.height):
+                apxl = color[3] if alpha.getpixel((x, y)) > 0 else 0
+                alpha.putpixel((x, y), apxl)
+
+    result.putalpha(alpha)
+    return result
+
+
+class TestShade(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.colors = rng.integers(0, 256, (40, 4)).tolist()
+        self.colors += [[0, 0, 0, 255], [255, 255, 255, 255], [9, 8, 7, 0]]
+
+        pixels = rng.integers(0, 256, (12, 9, 4), dtype=np.uint8)
+        pixels[::3, ::2, 3] = 0
+        self.image = Image.fromarray(pixels, 'RGBA')
+
+    def test_tint_image(self):
+        for rgba in self.colors[:10]:
+            for color in (tuple(rgba), tuple(rgba[:3])):
+                with self.subTest(color=color):
+                    self.assertTrue(np.array_equal(
+                        np.asarray(tint_image(self.image, color)),
+                        np.asarray(tint_legacy(self.image, color))
+                    ))
+
+    def test_shade_colors(self):
+        levels = np.arange(256)
+        gray = Image.fromarray(
+            np.stack([levels.astype(np.uint8)] * 3 + [
+                np.full(256, 255, np.uint8)
+            ], axis=-1)[None], 'RGBA'
+        )
+        shaded = Shade.shade_colors(self.colors, levels)
+        self.assertEqual(shaded.shape, (len(self.colors), 256, 4))
+
+        for color, row in zip(self.colors, shaded):
+            expected = np.asarray(tint_legacy(gray, tuple(color)))[0]
+            self.assertTrue(np.array_equal(row, expected))
+
+        # RGB colors are fully opaque
+        rgb = Shade.shade_colors([color[:3] for color in self.colors], levels)
+        self.assertTrue((rgb[..., 3] == 255).all())
+        self.assertTrue(np.array_equal(rgb[..., :3], shaded[..., :3]))
+
+    def test_shade_palette(self):
+        palette = Shade.shade_palette(self.colors)
+        self.assertEqual(palette.shape, (len(self.colors), 4, 3, 4))
+
+        for d, dir in enumerate(Directions.ALL):
+            expected = Shade.shade_colors(self.colors, Shade.get_levels(dir))
+            self.assertTrue(np.array_equal(palette[:, d], expected))
+
+    def test_cornerstones(self):
+        parts = {
+            Sides.ALL: Cornerstone.get,
+            Sides.LEFT: Cornerstone.get_left,
+            Sides.RIGHT: Cornerstone.get_right,
+            Sides.TOP: Cornerstone.get_top,
+        }
+
+        for side, get in parts.items():
+            for dir in Directions.ALL:
+                for color in self.colors:
+                    color = tuple(color)
+                    self.assertTrue(
+                        np.array_equal(
+                            np.asarray(get(color, dir)),
+                            get_cornerstone(color, dir, side)
+                        ),
+                        f'side {side} direction {dir} color {color}'
+                    )
+
+    def test_white_mask(self):
+        for dir in Directions.ALL:
+            pixels = np.asarray(Cornerstone.get(Shade.WHITE, dir))
+            mask = Cornerstone.MASKS[Sides.ALL]
+            self.assertTrue(np.array_equal(pixels[..., 3] > 0, mask >= 0))
+            levels = Shade.get_levels(dir)
+            self.assertTrue(np.array_equal(
+                pixels[mask >= 0, 0], levels[mask[mask >= 0]]
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests of the precomputed facts of textures against scanning their images.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from bloxel.texture import Texture
+from tests.util import get_texture
+
+
+class TestTexture(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+
+    def test_modes(self):
+        image = get_texture(self.rng, 'translucent', size=24)
+        for mode in ('RGBA', 'RGB', 'LA', 'L', 'P', '1'):
+            converted = image.convert(mode)
+            texture = Texture.of(converted)
+            self.assertEqual(texture.size, (24, 24))
+            self.assertTrue(np.array_equal(
+                texture.pixels, np.asarray(converted.convert('RGBA'))
+            ), mode)
+
+        rgb = image.convert('RGB')
+        self.assertTrue(np.array_equal(
+            Texture(np.asarray(rgb)).pixels, np.asarray(rgb.convert('RGBA'))
+        ))
+
+        with self.assertRaises(Exception):
+            Texture(np.zeros((4, 4, 2), dtype=np.uint8))
+
+    def test_facts(self):
+        for alpha in ('opaque', 'holes', 'translucent'):
+            image = get_texture(self.rng, alpha)
+            texture = Texture.of(image)
+            alphas = np.asarray(image)[..., 3]
+            self.assertEqual(texture.translucent, alpha != 'opaque')
+            self.assertEqual(
+                texture.coverage, np.count_nonzero(alphas) / alphas.size
+            )
+
+            colors, counts = texture.palette
+            expected = sorted(
+                (tuple(color), count)
+                for count, color in image.getcolors(256 * 256)
+            )
+            self.assertEqual(
+                sorted(zip(map(tuple, colors.tolist()), counts.tolist())),
+                expected
+            )
+
+    def test_hash(self):
+        image = get_texture(self.rng, 'holes', size=32)
+        texture = Texture.of(image)
+
+        # Views of larger arrays hash the same as copies of them
+        tile = texture.tile(1, 0, 16)
+        copy = Texture(np.array(tile.pixels))
+        self.assertTrue(np.shares_memory(tile.pixels, texture.pixels))
+        self.assertEqual(tile.hash, copy.hash)
+        self.assertNotEqual(tile.hash, texture.tile(0, 0, 16).hash)
+
+        # The shape is part of the hash
+        flat = Texture(np.array(texture.pixels).reshape(16, 64, 4))
+        self.assertNotEqual(flat.hash, texture.hash)
+
+    def test_crop_and_tile(self):
+        image = get_texture(self.rng, 'opaque', size=48)
+        texture = Texture.of(image)
+        self.assertIs(texture.crop((0, 0, 48, 48)), texture)
+        for x, y in ((0, 0), (2, 1), (1, 2)):
+            box = (x * 16, y * 16, x * 16 + 16, y * 16 + 16)
+            self.assertTrue(np.array_equal(
+                texture.tile(x, y, 16).pixels, np.asarray(image.crop(box))
+            ))
+            self.assertTrue(np.array_equal(
+                np.asarray(texture.tile(x, y, 16).image),
+                np.asarray(image.crop(box))
+            ))
+
+    def test_open(self):
+        image = get_texture(self.rng, 'holes')
+        with tempfile.TemporaryDirectory() as path:
+            filename = Path(path) / 'texture.png'
+            image.save(filename)
+            self.assertEqual(
+                Texture.open(filename).hash, Texture.of(image).hash
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Round-trip tests of binary voxel files and bloxel-files.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+import numpy as np
+from bloxel.iso import Iso, main
+from bloxel.voxels import VoxelFile
+
+
+def get_voxels(count, low=-20, high=20, colors=16, seed=0):
+    """
+    Returns random voxels with coordinates in [low, high) and the given
+    number of distinct colors.
+    """
+    rng = np.random.default_rng(seed)
+    palette = rng.integers(0, 256, (colors, 4))
+    voxels = np.empty(count, dtype=VoxelFile.VOXEL)
+    voxels['xyz'] = rng.integers(low, high, (count, 3))
+    voxels['color'] = palette[rng.integers(0, colors, count)]
+    return voxels
+
+
+class TestVoxelFile(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def get_path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def write_text(self, name, text):
+        filename = self.get_path(name)
+        with open(filename, 'w') as file:
+            file.write(text)
+        return filename
+
+    def round_trip(self, voxels):
+        filename = self.get_path('model' + VoxelFile.EXTENSION)
+        VoxelFile.write(voxels, filename)
+        self.assertTrue(VoxelFile.is_voxel_file(filename))
+        return VoxelFile(filename)
+
+    def assertVoxelsEqual(self, a, b):
+        self.assertEqual(a.dtype, VoxelFile.VOXEL)
+        self.assertEqual(a['xyz'].tolist(), b['xyz'].tolist())
+        self.assertEqual(a['color'].tolist(), b['color'].tolist())
+
+    def test_round_trip(self):
+        cases = (
+            (get_voxels(500), 2, 1),
+            (get_voxels(500, -2 ** 15, 2 ** 15), 2, 1),
+            (get_voxels(500, -2 ** 20, 2 ** 20), 4, 1),
+            (get_voxels(3000, colors=1000), 2, 2),
+        )
+        for voxels, coordinate_size, index_size in cases:
+            file = self.round_trip(voxels)
+            self.assertEqual(len(file), len(voxels))
+            self.assertEqual(file.xyz.dtype.itemsize, coordinate_size)
+            self.assertEqual(file.indexes.dtype.itemsize, index_size)
+            self.assertVoxelsEqual(file.read(), voxels)
+            self.assertVoxelsEqual(file.read(100, 200), voxels[100:200])
+
+    def test_empty(self):
+        file = self.round_trip(np.empty(0, dtype=VoxelFile.VOXEL))
+        self.assertEqual(len(file), 0)
+        self.assertEqual(len(file.read()), 0)
+        self.assertEqual(list(file.iter_chunks()), [])
+
+    def test_iter_chunks(self):
+        voxels = get_voxels(1000)
+        file = self.round_trip(voxels)
+        chunks = list(file.iter_chunks(300))
+        self.assertEqual([len(chunk) for chunk in chunks], [300] * 3 + [100])
+        self.assertVoxelsEqual(np.concatenate(chunks), voxels)
+
+    def test_convert(self):
+        voxels = get_voxels(200)
+        lines = [
+            ' '.join(map(str, xyz + color)) for xyz, color in zip(
+                voxels['xyz'].tolist(), voxels['color'].tolist()
+            )
+        ]
+
+        # Blank lines are skipped and floats truncate toward zero
+        lines[5] = lines[5].replace(' ', '.9 ', 1)
+        lines.insert(10, '')
+        text_filename = self.write_text('model.txt', '\n'.join(lines) + '\n')
+
+        filename = self.get_path('model' + VoxelFile.EXTENSION)
+        self.assertEqual(VoxelFile.convert(text_filename, filename), 200)
+        self.assertFalse(VoxelFile.is_voxel_file(text_filename))
+        self.assertVoxelsEqual(VoxelFile.read_voxels(filename), voxels)
+        self.assertVoxelsEqual(VoxelFile.read_voxels(text_filename), voxels)
+
+    def test_read_text_errors(self):
+        cases = (
+            ('1 2 3 4 5 6 7\n\n1 2 3 4 5 6\n', 'Line 3 ', '6 values'),
+            ('1 2 3 4 5 6 7\n1 2 x 4 5 6 7\n', 'Line 2 ', 'not a number'),
+            ('1 2 3 4 5 6 nan\n', 'Line 1 ', 'not a number'),
+            ('1 2 3 4 5 6 7\n1 2 3 4 5 256 7\n', 'Line 2 ', '0-255'),
+            ('1 2 3 -1 5 6 7\n', 'Line 1 ', '0-255'),
+            (f'1 {2 ** 31} 3 4 5 6 7\n', 'Line 1 ', 'coordinate'),
+        )
+        for text, line, message in cases:
+            filename = self.write_text('bad.txt', text)
+            with self.assertRaises(Exception) as context:
+                VoxelFile.read_text(filename)
+
+            self.assertIn(line, str(context.exception))
+            self.assertIn(message, str(context.exception))
+
+    def test_cli(self):
+        voxels = get_voxels(300, -8, 8)
+        text_filename = self.write_text('model.txt', '\n'.join(
+            ' '.join(map(str, xyz + color)) for xyz, color in zip(
+                voxels['xyz'].tolist(), voxels['color'].tolist()
+            )
+        ))
+        filename = self.get_path('model' + VoxelFile.EXTENSION)
+
+        argv = ['bloxel', '-B', text_filename, f'--convert={filename}']
+        with mock.patch.object(sys, 'argv', argv), \
+                contextlib.redirect_stdout(io.StringIO()) as out:
+            main()
+
+        self.assertIn('Converted 300 voxels', out.getvalue())
+        self.assertVoxelsEqual(Iso.read_voxels(filename), voxels)
+
+        # Both formats render the same
+        iso = Iso(4)
+        for dir in range(4):
+            self.assertEqual(
+                iso.get_multipart_bloxel(
+                    dir, Iso.read_voxels(filename)
+                ).tobytes(),
+                iso.get_multipart_bloxel(
+                    dir, Iso.read_voxels(text_filename)
+                ).tobytes()
+            )
+
+    def test_invalid_header(self):
+        filename = self.write_text('bad' + VoxelFile.EXTENSION, 'BLX')
+        with self.assertRaises(Exception):
+            VoxelFile(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
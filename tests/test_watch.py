@@ -0,0 +1,202 @@
+"""
+Tests of rebuilding batches when their inputs change.
+"""
+
+import io
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from PIL import Image
+from bloxel.iso import CLI, main
+from bloxel.encode import Encoder
+from tests.util import EXAMPLES
+
+
+def read_pixels(path):
+    """
+    Returns the pixels of every PNG in a directory by filename.
+    """
+    pixels = {}
+    for filename in sorted(Path(path).glob('*.png')):
+        with Image.open(filename) as image:
+            pixels[filename.name] = np.asarray(image.convert('RGBA'))
+    return pixels
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp.name)
+        self.out = self.path / 'out'
+        self.texture = self.path / 'Texture-Map.png'
+        self.blockfile = self.path / 'blocks.blockfile'
+        shutil.copy(EXAMPLES / 'res' / 'Texture-Map.png', self.texture)
+        shutil.copy(EXAMPLES / 'example.blockfile', self.blockfile)
+        self.out.mkdir()
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def watch(self, sleeps, build):
+        """
+        Watches the inputs, running the next step of `sleeps` on every sleep
+        and stopping when they run out.
+        """
+        sleeps = iter(sleeps)
+
+        def sleep(seconds):
+            step = next(sleeps, None)
+            if step is None:
+                raise KeyboardInterrupt
+            step()
+
+        output = io.StringIO()
+        with mock.patch.object(time, 'sleep', sleep), \
+            contextlib.redirect_stdout(output):
+            CLI.watch([self.texture, self.blockfile], build, 0)
+        return output.getvalue()
+
+    def test_process_batch(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            CLI.process_batch(self.out, [True] * 4, self.texture, 2, 2,
+                self.blockfile
+            )
+            expected = self.path / 'expected'
+            expected.mkdir()
+            CLI.process_blockfile_batch(expected, [True] * 4, self.blockfile,
+                self.texture, 2, 2
+            )
+
+        pixels = read_pixels(self.out)
+        self.assertEqual(len(pixels), 9 * 4)
+        self.assertEqual(pixels.keys(), read_pixels(expected).keys())
+        for name, image in read_pixels(expected).items():
+            self.assertTrue(np.array_equal(pixels[name], image))
+
+    def test_get_stamps(self):
+        stamps = CLI.get_stamps([self.texture, self.path / 'missing'])
+        self.assertEqual(stamps[1], None)
+        self.assertEqual(stamps[0][1], self.texture.stat().st_size)
+
+    def test_get_iso(self):
+        self.assertIs(CLI.get_iso(), CLI.get_iso())
+        self.assertIs(CLI.get_iso(Encoder.get('qoi')), CLI.get_iso(
+            Encoder.get('qoi')
+        ))
+        self.assertIsNot(CLI.get_iso(), CLI.get_iso(Encoder.get('raw')))
+
+    def test_rebuilds_on_change(self):
+        builds = []
+        output = self.watch([
+            lambda: None,
+            lambda: self.blockfile.write_text('0 # Changed\n'),
+            lambda: None,
+            lambda: None,
+        ], lambda: builds.append(self.blockfile.read_text()))
+
+        self.assertEqual(builds, ['0 # Changed\n'])
+        self.assertIn('Rebuilt', output)
+
+    def test_waits_for_saves(self):
+        builds = []
+        self.watch([
+            lambda: self.blockfile.write_text('0 # Half'),
+            lambda: self.blockfile.write_text('0 # Half saved\n'),
+            lambda: None,
+        ], lambda: builds.append(self.blockfile.read_text()))
+
+        self.assertEqual(builds, ['0 # Half saved\n'])
+
+    def test_reports_failed_builds(self):
+        def build():
+            raise Exception('Invalid blockfile')
+
+        output = self.watch([
+            lambda: self.blockfile.write_text('x\n'),
+            lambda: None,
+            lambda: None,
+        ], build)
+
+        self.assertIn('Build failed: Invalid blockfile', output)
+
+    def poll(self, stamps, build):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            stamps = CLI.poll([self.texture, self.blockfile], stamps, build, 0)
+        return stamps, output.getvalue()
+
+    def test_poll_unchanged(self):
+        stamps = CLI.get_stamps([self.texture, self.blockfile])
+        result, output = self.poll(stamps, self.fail)
+
+        self.assertIs(result, stamps)
+        self.assertEqual(output, '')
+
+    def test_poll_changed(self):
+        stamps = CLI.get_stamps([self.texture, self.blockfile])
+        self.blockfile.write_text('0 # Changed\n')
+        builds = []
+
+        result, output = self.poll(stamps, lambda: builds.append(1))
+        self.assertEqual(builds, [1])
+        self.assertIn('Rebuilt', output)
+        self.assertEqual(
+            result, CLI.get_stamps([self.texture, self.blockfile])
+        )
+
+        # The next pass compares against the rebuilt stamps
+        self.assertIs(self.poll(result, self.fail)[0], result)
+
+    def test_poll_missing(self):
+        stamps = CLI.get_stamps([self.texture, self.blockfile])
+        self.blockfile.unlink()
+
+        result, output = self.poll(stamps, self.fail)
+        self.assertEqual(result[1], None)
+        self.assertEqual(output, '')
+
+        # Builds once the file is saved again
+        self.blockfile.write_text('0 # Back\n')
+        builds = []
+        self.poll(result, lambda: builds.append(1))
+        self.assertEqual(builds, [1])
+
+    def test_poll_failed_build(self):
+        stamps = CLI.get_stamps([self.texture, self.blockfile])
+        self.blockfile.write_text('x\n')
+
+        def build():
+            raise Exception('Invalid blockfile')
+
+        result, output = self.poll(stamps, build)
+        self.assertIn('Build failed: Invalid blockfile', output)
+        self.assertNotEqual(result, stamps)
+
+    def test_main(self):
+        argv = [
+            'bloxel', '-o', str(self.out), '-a', '-t', str(self.texture),
+            '2', '2', str(self.blockfile), '--watch', '--interval=0'
+        ]
+
+        def sleep(seconds):
+            raise KeyboardInterrupt
+
+        with mock.patch.object(sys, 'argv', argv), \
+            mock.patch.object(time, 'sleep', sleep), \
+            contextlib.redirect_stdout(io.StringIO()):
+            main()
+
+        # The first build is always incremental
+        self.assertEqual(len(read_pixels(self.out)), 9 * 4)
+        self.assertTrue((self.out / 'Build.json').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
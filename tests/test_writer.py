@@ -0,0 +1,84 @@
+"""
+Tests for saving files on background writer threads.
+"""
+
+import threading # Blocking writes until the test releases them
+import unittest # Test cases
+
+from bloxel.writer import Writer # Background writes
+
+
+class TestWriter(unittest.TestCase):
+
+    def test_close_waits_for_pending_writes(self):
+        release = threading.Event()
+        done = []
+
+        def write(i):
+            release.wait()
+            done.append(i)
+
+        writer = Writer(num_threads=2)
+        for i in range(10):
+            writer.submit(write, i)
+
+        self.assertEqual(done, [])
+        release.set()
+        writer.close()
+        self.assertEqual(sorted(done), list(range(10)))
+
+    def test_flush_waits_for_pending_writes(self):
+        done = []
+
+        with Writer(num_threads=3, max_pending=2) as writer:
+            for i in range(20):
+                writer.submit(done.append, i)
+
+            writer.flush()
+            self.assertEqual(sorted(done), list(range(20)))
+
+    def test_errors_reach_the_caller(self):
+        def fail():
+            raise ValueError('disk full')
+
+        writer = Writer(num_threads=2)
+        writer.submit(fail)
+
+        with self.assertRaisesRegex(ValueError, 'disk full'):
+            writer.flush()
+
+        # The error stops later writes and is raised again on close
+        done = []
+        with self.assertRaisesRegex(ValueError, 'disk full'):
+            writer.submit(done.append, 1)
+        with self.assertRaisesRegex(ValueError, 'disk full'):
+            writer.close()
+        self.assertEqual(done, [])
+
+    def test_context_raises_write_errors(self):
+        def fail():
+            raise ValueError('disk full')
+
+        with self.assertRaisesRegex(ValueError, 'disk full'):
+            with Writer(num_threads=1) as writer:
+                writer.submit(fail)
+
+    def test_context_keeps_the_original_error(self):
+        def fail():
+            raise ValueError('disk full')
+
+        with self.assertRaisesRegex(KeyError, 'block'):
+            with Writer(num_threads=1) as writer:
+                writer.submit(fail)
+                raise KeyError('block')
+
+    def test_closed_writer_rejects_writes(self):
+        writer = Writer(num_threads=1)
+        writer.close()
+
+        with self.assertRaisesRegex(Exception, 'closed writer'):
+            writer.submit(print)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Inputs shared by the tests and the reference images rendered from them.
+
+The reference images in `data` were rendered from these inputs by the
+original per-texel renderer, so every faster path can be checked against
+it pixel for pixel.
+"""
+
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+
+DATA = Path(__file__).parent / 'data'
+EXAMPLES = Path(__file__).parent.parent / 'examples'
+
+
+def get_texture(rng, alpha='opaque', colors=12, size=16):
+    """
+    Returns a random RGBA texture with a few colors.
+
+    Args:
+        rng(Generator): the random number generator to use
+        alpha(str): 'opaque', 'holes' for some clear texels or 'translucent'
+            for texels of any opacity
+        colors(int): the number of colors in the texture
+        size(int): the width and height of the texture
+    """
+    palette = rng.integers(0, 256, (colors, 3))
+    pixels = np.empty((size, size, 4), dtype=np.uint8)
+    pixels[..., :3] = palette[rng.integers(0, colors, (size, size))]
+
+    levels = {
+        'opaque': [255],
+        'holes': [0, 255, 255, 255],
+        'translucent': [0, 40, 128, 200, 255],
+    }[alpha]
+    pixels[..., 3] = rng.choice(levels, (size, size))
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def get_cases():
+    """
+    Returns the six sides of every scalar bloxel case by name.
+    """
+    rng = np.random.default_rng(1)
+    grass = Image.open(EXAMPLES / 'res' / 'Grass.png')
+    grass.load()
+
+    cases = {'grass': [grass] * 6}
+    for alpha in ('opaque', 'holes', 'translucent'):
+        cases[alpha] = [get_texture(rng, alpha) for _ in range(6)]
+
+    cases['mixed'] = [grass] * 3 + [get_texture(rng, 'translucent')] * 3
+    return cases
+
+
+def get_models():
+    """
+    Returns the voxels of every multipart bloxel case by name, as tuples of
+    x, y, z, r, g, b and a values.
+    """
+    rng = np.random.default_rng(2)
+    solid = [
+        (x, y, z, 100 + x * 8, 50 + y * 10, 200 - z * 5, 255)
+        for x in range(8) for y in range(8) for z in range(8)
+    ]
+    scattered = np.concatenate([
+        rng.integers(0, 16, (300, 3)),
+        rng.integers(0, 256, (300, 3)),
+        rng.choice([0, 90, 255], (300, 1)),
+    ], axis=1)
+    return {
+        'solid': solid,
+        'scattered': [tuple(voxel) for voxel in scattered.tolist()],
+    }
+
+
+def load_reference(name):
+    """
+    Returns the reference images of a kind of bloxel, by case and direction.
+
+    Args:
+        name(str): 'scalar' or 'multipart'
+    """
+    with np.load(DATA / f'{name}.npz') as data:
+        return {key: data[key] for key in data.files}